@@ -0,0 +1,409 @@
+"""Benchmark the quiz workflow against a synthetic school.
+
+Seeds a scratch SQLite database (built from the Alembic migrations) with
+modules, students, question banks and quiz results, then drives the app
+through login -> dashboard -> module -> start_quiz GET/POST for students and
+the leaderboard for teachers. Requests go through the Flask test client, or
+with --server through a local threaded WSGI server over HTTP. Each step's
+p50/p95/p99 latency and SQL statements per request are printed, and can be
+saved as a JSON baseline that later runs are compared against:
+
+    python benchmark.py --save-baseline bench_baseline.json
+    python benchmark.py --baseline bench_baseline.json
+
+With --startup N it instead boots N fresh interpreters and times importing
+the app, create_app() and the first request, i.e. a cold worker start:
+
+    python benchmark.py --startup 20 --save-baseline startup_baseline.json
+
+Comparing exits with status 1 when a step's p95 grew by more than
+--tolerance or it now runs more statements per request.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import platform
+import random
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from datetime import datetime, timedelta
+
+STEPS = ('login', 'dashboard', 'module', 'quiz_get', 'quiz_post', 'leaderboard')
+STARTUP_STEPS = ('startup_import', 'startup_create_app', 'startup_first_request', 'startup_process')
+
+# The endpoint each step hits, for reading statement counts from the metrics
+STEP_ENDPOINTS = {
+    'login': ('auth.student_login', 'auth.teacher_login'),
+    'dashboard': ('student.student_dashboard_view',),
+    'module': ('student.view_module',),
+    'quiz_get': ('student.start_quiz',),
+    'quiz_post': ('student.start_quiz',),
+    'leaderboard': ('teacher.leaderboard',),
+    **{step: () for step in STARTUP_STEPS},
+}
+
+# Run in a fresh interpreter by --startup; prints its timings as JSON
+STARTUP_PROBE = '''
+import json, time
+started = time.perf_counter()
+from quizapp import create_app
+imported = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+app.test_client().get('/')
+served = time.perf_counter()
+print(json.dumps({'startup_import': imported - started, 'startup_create_app': created - imported,
+                  'startup_first_request': served - created}))
+'''
+
+ATTEMPT_ID = re.compile(r'name="attempt_id" value="(\d+)"')
+QUESTION_FIELD = re.compile(r'name="(question_\d+)"[^>]*value="(\d+)"')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--modules', type=int, default=20)
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--questions', type=int, default=20, help='questions per quiz')
+    parser.add_argument('--choices', type=int, default=4)
+    parser.add_argument('--results', type=int, default=200000, help='historical quiz_result rows to seed')
+    parser.add_argument('--users', type=int, default=200, help='student sessions to run')
+    parser.add_argument('--leaderboards', type=int, default=100, help='teacher leaderboard requests')
+    parser.add_argument('--workers', type=int, default=4, help='concurrent sessions')
+    parser.add_argument('--server', action='store_true', help='drive a local WSGI server instead of the test client')
+    parser.add_argument('--startup', type=int, metavar='RUNS', help='time RUNS cold app starts instead of the workload')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--save-baseline', metavar='PATH')
+    parser.add_argument('--baseline', metavar='PATH')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed p95 growth, as a fraction')
+    return parser.parse_args(argv)
+
+
+def configure_environment(workdir):
+    os.environ.update({
+        'QUIZAPP_SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'bench.db')}",
+        'QUIZAPP_RESULT_JOURNAL_DIR': os.path.join(workdir, 'result-journal'),
+        'QUIZAPP_WTF_CSRF_ENABLED': 'false',
+        'QUIZAPP_INSTRUMENTATION_ENABLED': 'true',
+        'QUIZAPP_SLOW_REQUEST_SECONDS': '3600',
+        'QUIZAPP_REPEATED_QUERY_THRESHOLD': '1000000',
+        'QUIZAPP_LOG_LEVEL': 'WARNING',
+        # Every session logs in from the same address, teachers to one account
+        'QUIZAPP_LOGIN_IP_BURST': '1000000000',
+        'QUIZAPP_LOGIN_USERNAME_BURST': '1000000000',
+    })
+
+
+def seed(args, chunk_size=50000):
+    from werkzeug.security import generate_password_hash
+
+    from quizapp import services
+    from quizapp.answer_log import encode_answers
+    from quizapp.extensions import db
+    from quizapp.models import User, Module, Quiz, Question, QuizResult, student_module
+
+    rng = random.Random(args.seed)
+    password = generate_password_hash('password')  # Hashed once, shared by every account
+
+    def insert(table, rows):
+        for start in range(0, len(rows), chunk_size):
+            db.session.execute(table.insert(), rows[start:start + chunk_size])
+
+    insert(User.__table__, [{'username': 'teacher', 'password': password, 'role': 'teacher'}] + [
+        {'username': f'student{n:06d}', 'password': password, 'role': 'student'} for n in range(args.students)
+    ])
+    insert(Module.__table__, [
+        {'title': f'Module {n}', 'terms_conditions': 'Work alone.'} for n in range(1, args.modules + 1)
+    ])
+    insert(Quiz.__table__, [
+        {'title': f'Module {n} Quiz', 'module_id': n, 'time_limit': 3600, 'version': 1}
+        for n in range(1, args.modules + 1)
+    ])
+    choices = [f'Choice {n}' for n in range(args.choices)]
+    insert(Question.__table__, [
+        {'question_text': f'Question {n} of quiz {quiz_id}', 'choices': choices,
+         'correct_answer': choices[rng.randrange(args.choices)], 'quiz_id': quiz_id}
+        for quiz_id in range(1, args.modules + 1) for n in range(args.questions)
+    ])
+
+    # Student ids start at 2, after the teacher; everyone takes one or two modules
+    enrollments = {}
+    for student_id in range(2, args.students + 2):
+        enrollments[student_id] = rng.sample(range(1, args.modules + 1), min(args.modules, rng.choice((1, 2))))
+    insert(student_module, [
+        {'student_id': student_id, 'module_id': module_id}
+        for student_id, module_ids in enrollments.items() for module_id in module_ids
+    ])
+
+    # A small pool of answer sheets, reused so packing does not dominate seeding
+    sheets = [
+        encode_answers([rng.randrange(args.choices) for _ in range(args.questions)]) for _ in range(64)
+    ]
+    started = datetime(2024, 1, 1)
+    student_ids = list(enrollments)
+    for start in range(0, args.results, chunk_size):
+        rows = []
+        for _ in range(min(chunk_size, args.results - start)):
+            student_id = rng.choice(student_ids)
+            rows.append({
+                'student_id': student_id,
+                'quiz_id': rng.choice(enrollments[student_id]),
+                'score': rng.randrange(args.questions + 1),
+                'answers': rng.choice(sheets),
+                'submitted_at': started + timedelta(seconds=rng.randrange(10_000_000)),
+            })
+        db.session.execute(QuizResult.__table__.insert(), rows)
+    db.session.commit()
+    services.rebuild_module_scores()
+    db.session.commit()
+    return enrollments
+
+
+class TestClientSession:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, data=None):
+        response = self.client.open(path, method=method, data=data)
+        return response.status_code, response.get_data(as_text=True)
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class HttpSession:
+    def __init__(self, base_url):
+        self.base_url = base_url
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()), _NoRedirect,
+        )
+
+    def request(self, method, path, data=None):
+        body = urllib.parse.urlencode(data).encode() if data is not None else None
+        try:
+            with self.opener.open(urllib.request.Request(self.base_url + path, data=body, method=method)) as response:
+                return response.status, response.read().decode()
+        except urllib.error.HTTPError as error:
+            return error.code, error.read().decode()
+
+
+def timed(timings, step, session, method, path, data=None):
+    started = time.perf_counter()
+    status, body = session.request(method, path, data)
+    timings[step].append(time.perf_counter() - started)
+    if status >= 400:
+        raise RuntimeError(f'{method} {path} returned {status}')
+    return body
+
+
+def student_session(session, username, module_id, timings):
+    timed(timings, 'login', session, 'POST', '/student_login', {'username': username, 'password': 'password'})
+    timed(timings, 'dashboard', session, 'GET', '/student_dashboard')
+    timed(timings, 'module', session, 'GET', f'/student/module/{module_id}')
+    page = timed(timings, 'quiz_get', session, 'GET', f'/student/quiz/{module_id}')
+    answers = {'attempt_id': ATTEMPT_ID.search(page).group(1)}
+    for field, value in QUESTION_FIELD.findall(page):
+        answers.setdefault(field, value)
+    timed(timings, 'quiz_post', session, 'POST', f'/student/quiz/{module_id}', answers)
+
+
+def teacher_session(session, module_ids, timings):
+    timed(timings, 'login', session, 'POST', '/teacher_login', {'username': 'teacher', 'password': 'password'})
+    for module_id in module_ids:
+        timed(timings, 'leaderboard', session, 'GET', f'/teacher/module/{module_id}/leaderboard')
+
+
+def measure_startup(runs):
+    # Each run is a new process, so nothing is warm but the OS file cache
+    timings = {step: [] for step in STARTUP_STEPS}
+    for _ in range(runs):
+        started = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', STARTUP_PROBE], capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        timings['startup_process'].append(time.perf_counter() - started)
+        for step, seconds in json.loads(output.splitlines()[-1]).items():
+            timings[step].append(seconds)
+    return timings
+
+
+def run_workload(args, make_session, enrollments):
+    rng = random.Random(args.seed + 1)
+    tasks = [('student', student_id) for student_id in rng.sample(list(enrollments), min(args.users, len(enrollments)))]
+    per_teacher = 10
+    for start in range(0, args.leaderboards, per_teacher):
+        tasks.append(('teacher', [rng.randint(1, args.modules) for _ in range(min(per_teacher, args.leaderboards - start))]))
+    rng.shuffle(tasks)
+
+    timings = {step: [] for step in STEPS}
+    errors = []
+    lock = threading.Lock()
+
+    def worker():
+        local = {step: [] for step in STEPS}
+        while True:
+            with lock:
+                if not tasks:
+                    break
+                kind, target = tasks.pop()
+            try:
+                if kind == 'student':
+                    student_session(make_session(), f'student{target - 2:06d}', enrollments[target][0], local)
+                else:
+                    teacher_session(make_session(), target, local)
+            except Exception as error:
+                with lock:
+                    errors.append(repr(error))
+        with lock:
+            for step, values in local.items():
+                timings[step].extend(values)
+
+    threads = [threading.Thread(target=worker) for _ in range(args.workers)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return timings, errors, time.perf_counter() - started
+
+
+def summarize(timings, metrics):
+    import numpy as np
+
+    statements = {}
+    for (endpoint, requests, sql_statements) in metrics:
+        statements[endpoint] = (requests, sql_statements)
+    report = {}
+    for step, values in timings.items():
+        if not values:
+            continue
+        p50, p95, p99 = np.percentile(np.array(values) * 1000, [50, 95, 99])
+        requests = sum(statements.get(endpoint, (0, 0))[0] for endpoint in STEP_ENDPOINTS[step])
+        sql_statements = sum(statements.get(endpoint, (0, 0))[1] for endpoint in STEP_ENDPOINTS[step])
+        report[step] = {
+            'count': len(values),
+            'p50_ms': round(float(p50), 3),
+            'p95_ms': round(float(p95), 3),
+            'p99_ms': round(float(p99), 3),
+            # Per endpoint, so quiz_get and quiz_post share start_quiz's figure
+            'queries_per_request': round(sql_statements / requests, 2) if requests else None,
+        }
+    return report
+
+
+def endpoint_statement_counts(endpoint_metrics):
+    # (endpoint, requests, statements) from the app's instrumentation totals
+    counts = []
+    for line in endpoint_metrics.render().splitlines():
+        match = re.match(r'quizapp_(requests_total|sql_statements_total)\{endpoint="([\w.]+)"\} (\d+)', line)
+        if match:
+            counts.append((match.group(2), match.group(1), int(match.group(3))))
+    requests = {endpoint: value for endpoint, name, value in counts if name == 'requests_total'}
+    statements = {endpoint: value for endpoint, name, value in counts if name == 'sql_statements_total'}
+    return [(endpoint, requests[endpoint], statements.get(endpoint, 0)) for endpoint in requests]
+
+
+def compare(report, baseline, tolerance):
+    regressions = []
+    for step, current in report.items():
+        previous = baseline['steps'].get(step)
+        if previous is None:
+            continue
+        if current['p95_ms'] > previous['p95_ms'] * (1 + tolerance):
+            regressions.append(f"{step}: p95 {previous['p95_ms']:.1f} ms -> {current['p95_ms']:.1f} ms")
+        if (current['queries_per_request'] or 0) > (previous['queries_per_request'] or 0):
+            regressions.append(f"{step}: queries/request {previous['queries_per_request']} -> {current['queries_per_request']}")
+    return regressions
+
+
+def run_benchmark(args):
+    from flask_migrate import upgrade
+
+    from quizapp import create_app
+    from quizapp.extensions import init_migrate
+
+    app = create_app()
+    init_migrate(app)
+    with app.app_context():
+        upgrade()
+        started = time.perf_counter()
+        enrollments = seed(args)
+        print(f'Seeded {args.modules} modules, {args.students} students, {args.modules * args.questions} questions '
+              f'and {args.results} results in {time.perf_counter() - started:.1f}s.')
+
+    server = None
+    if args.server:
+        from werkzeug.serving import make_server
+
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{server.server_port}'
+        make_session = lambda: HttpSession(base_url)
+    else:
+        make_session = lambda: TestClientSession(app)
+
+    timings, errors, elapsed = run_workload(args, make_session, enrollments)
+    if server is not None:
+        server.shutdown()
+    app.extensions['quizapp'].result_queue.drain()
+
+    report = summarize(timings, endpoint_statement_counts(app.extensions['quizapp'].endpoint_metrics))
+    total = sum(len(values) for values in timings.values())
+    print(f"{total} requests in {elapsed:.1f}s ({total / elapsed:.0f}/s) with {args.workers} workers"
+          f"{' over HTTP' if args.server else ''}, {len(errors)} failed session(s).")
+    return report, errors
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix='quizapp-bench-')
+    configure_environment(workdir)
+
+    if args.startup:
+        errors = []
+        report = summarize(measure_startup(args.startup), [])
+        print(f'{args.startup} cold start(s).')
+    else:
+        report, errors = run_benchmark(args)
+    print(f"{'step':<12} {'count':>6} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'queries':>8}")
+    for step, figures in report.items():
+        print(f"{step:<12} {figures['count']:>6} {figures['p50_ms']:>9.2f} {figures['p95_ms']:>9.2f} "
+              f"{figures['p99_ms']:>9.2f} {figures['queries_per_request'] if figures['queries_per_request'] is not None else '-':>8}")
+    for error in errors[:5]:
+        print(f'  {error}')
+
+    result = {
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'parameters': {key: value for key, value in vars(args).items() if key not in ('save_baseline', 'baseline')},
+        'steps': report,
+    }
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as baseline_file:
+            json.dump(result, baseline_file, indent=2)
+        print(f'Baseline saved to {args.save_baseline}.')
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        if baseline.get('parameters') != result['parameters']:
+            print('Warning: the baseline was recorded with different parameters.')
+        regressions = compare(report, baseline, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if regressions:
+            return 1
+        print('No regressions against the baseline.')
+    return 1 if errors else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
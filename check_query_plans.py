@@ -0,0 +1,177 @@
+"""Fail when a route's SQL falls back to a full table scan.
+
+Builds a scratch SQLite database from the Alembic migrations, drives every
+route through the Flask test client while recording the statements they run,
+then asks SQLite for the EXPLAIN QUERY PLAN of each one. Any plain
+``SCAN <table>`` step that is not explicitly allowed below is reported and
+the script exits with status 1.
+
+    python check_query_plans.py
+"""
+import io
+import json
+import os
+import re
+import sys
+import tempfile
+from urllib.parse import parse_qs, urlsplit
+
+# (endpoint, table) pairs where reading the whole table is the point
+ALLOWED_SCANS = set()
+
+FULL_SCAN = re.compile(r'^SCAN (\w+)$')
+
+
+def environment(workdir):
+    return {
+        'QUIZAPP_SQLALCHEMY_DATABASE_URI': f"sqlite:///{os.path.join(workdir, 'check.db')}",
+        'QUIZAPP_RESULT_JOURNAL_DIR': os.path.join(workdir, 'result-journal'),
+        'QUIZAPP_RESULT_WRITE_BEHIND': 'false',
+        'QUIZAPP_WTF_CSRF_ENABLED': 'false',
+    }
+
+
+def seed(db, User):
+    from werkzeug.security import generate_password_hash
+
+    password = generate_password_hash('password')
+    db.session.add_all([
+        User(username='teacher', password=password, role='teacher'),
+        User(username='student', password=password, role='student'),
+        User(username='other', password=password, role='student'),
+    ])
+    db.session.commit()
+
+
+class CheckedClient:
+    # A route that errors, or sends the client off to log in, runs little of
+    # its SQL; either fails the check rather than letting it pass on less
+    def __init__(self, client):
+        self.client = client
+
+    def get(self, path, status=None, **kwargs):
+        return self.check('GET', path, status, self.client.get(path, **kwargs))
+
+    def post(self, path, status=None, **kwargs):
+        return self.check('POST', path, status, self.client.post(path, **kwargs))
+
+    def check(self, method, path, status, response):
+        location = response.location or ''
+        if (response.status_code != status if status else
+                response.status_code >= 400 or 'next' in parse_qs(urlsplit(location).query)):
+            response.close()
+            raise AssertionError(f'{method} {path} returned {response.status} {location}'.rstrip())
+        return response
+
+
+def drive_routes(client):
+    # Every route, in an order that leaves data for the next one to read
+    client = CheckedClient(client)
+    client.get('/')
+    client.post('/teacher_login', data={'username': 'teacher', 'password': 'password'}, status=302)
+    client.get('/teacher_dashboard')
+    client.post('/teacher/add-module', data={'module_title': 'Algebra', 'terms_conditions': 'No calculators.'})
+    client.get('/teacher_dashboard?q=alg')
+    client.get('/teacher_dashboard?after_title=Aa&after_id=0')
+    client.get('/teacher/module/1')
+    client.post('/teacher/module/1/set-terms-conditions', data={'terms_conditions': 'Calculators allowed.'})
+    client.post('/teacher/module/1/add-question', data={
+        'question_text': '2 + 2?', 'choices[]': ['3', '4'], 'correct_answer': '4',
+    })
+    client.post('/teacher/module/1', data={
+        'add_question': '1', 'question_text': '3 + 3?', 'choices': ['6', '7'], 'correct_answer': '6',
+    })
+    bank = json.dumps({'question_text': '1 + 1?', 'choices': ['2', '3'], 'correct_answer': '2'}) + '\n'
+    client.post('/teacher/module/1/questions/import', data={'question_bank': (io.BytesIO(bank.encode()), 'bank.jsonl')},
+                content_type='multipart/form-data')
+    client.get('/teacher/module/1/questions/export')
+    client.get('/teacher/module/1/questions/export?format=csv')
+    client.post('/teacher/module/1/set-timer', data={'time_limit': '600'})
+    client.post('/teacher/module/1', data={'set_timer': '1', 'time_limit': '600'})
+    client.get('/teacher/module/1/unassigned-students?q=stu')
+    client.post('/teacher/module/1/assign-students', data={'student_id': '2'})
+    client.post('/teacher/module/1/enroll', json={'usernames': ['other'], 'student_ids': [2]})
+    client.post('/teacher/module/1/assign-quiz', data={'quiz_id': '1'})
+    # Loaded standings make quiz submissions publish leaderboard updates
+    client.get('/teacher/module/1/leaderboard')
+    client.get('/teacher/module/1/leaderboard/stream').close()
+    client.get('/debug_identity_cache')
+    client.get('/logout')
+
+    client.post('/student_login', data={'username': 'student', 'password': 'password'}, status=302)
+    client.get('/student_dashboard')
+    client.get('/student/module/1')
+    client.get('/student/quiz/1')
+    client.post('/student/quiz/1/autosave', json={'answers': {'0': 1}})
+    client.get('/student/quiz/1')
+    client.post('/student/quiz/1')
+    client.post('/student/quiz/1', data={'attempt_id': '1', 'question_0': '1', 'question_1': '0', 'question_2': '0'})
+    client.get('/logout')
+
+    client.post('/teacher_login', data={'username': 'teacher', 'password': 'password'}, status=302)
+    client.get('/teacher/module/1/leaderboard')
+    client.get('/teacher/module/1/analytics')
+    client.get('/teacher/module/1/analytics.json')
+    client.get('/teacher/module/1/gradebook.csv').get_data()
+    client.get('/teacher/module/1/quiz/1/attempts.csv').get_data()
+    client.post('/teacher/module/1', data={'remove_student': '1', 'student_id': '3'})
+    client.post('/teacher/module/1/student/2/remove')
+    client.post('/teacher/module/1/delete')
+    client.get('/logout')
+
+
+def find_violations():
+    # Runs the check in the environment() already set up; returns the
+    # statements seen, keyed by (endpoint, statement), and the violations
+    # as (endpoint, plan step, statement)
+    from flask import has_request_context, request
+    from flask_migrate import upgrade
+    from sqlalchemy import event
+
+    from quizapp import create_app
+    from quizapp.extensions import db, init_migrate
+    from quizapp.models import User
+
+    app = create_app()
+    init_migrate(app)
+
+    statements = {}
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith(('PRAGMA', 'EXPLAIN')):
+            return
+        endpoint = request.endpoint if has_request_context() else '<background>'
+        if executemany:
+            parameters = parameters[0] if parameters else ()
+        statements.setdefault((endpoint, statement), parameters)
+
+    with app.app_context():
+        upgrade()
+        seed(db, User)
+        event.listen(db.engine, 'before_cursor_execute', record)
+        drive_routes(app.test_client())
+        event.remove(db.engine, 'before_cursor_execute', record)
+
+        tables = set(db.metadata.tables)
+        violations = []
+        with db.engine.connect() as connection:
+            for (endpoint, statement), parameters in statements.items():
+                plan = connection.exec_driver_sql('EXPLAIN QUERY PLAN ' + statement, parameters).all()
+                for row in plan:
+                    match = FULL_SCAN.match(row[-1])
+                    if match and match.group(1) in tables and (endpoint, match.group(1)) not in ALLOWED_SCANS:
+                        violations.append((endpoint, row[-1], ' '.join(statement.split())))
+    return statements, violations
+
+
+def main():
+    os.environ.update(environment(tempfile.mkdtemp(prefix='quizapp-plans-')))
+    statements, violations = find_violations()
+    print(f'Checked {len(statements)} statement(s) across {len({endpoint for endpoint, _ in statements})} endpoint(s).')
+    for endpoint, step, statement in violations:
+        print(f'{endpoint}: {step}\n    {statement}')
+    return 1 if violations else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
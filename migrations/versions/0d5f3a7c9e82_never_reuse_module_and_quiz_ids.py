@@ -0,0 +1,31 @@
+"""Never reuse module and quiz ids.
+
+Revision ID: 0d5f3a7c9e82
+Revises: 6e2d4b8a1f53
+Create Date: 2026-10-18 23:41:07.218634
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0d5f3a7c9e82'
+down_revision = '6e2d4b8a1f53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The copied rows seed sqlite_sequence with each table's highest id
+    for table in ('module', 'quiz'):
+        with op.batch_alter_table(table, schema=None, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': True}):
+            pass
+
+
+def downgrade():
+    for table in ('quiz', 'module'):
+        with op.batch_alter_table(table, schema=None, recreate='always',
+                                  table_kwargs={'sqlite_autoincrement': False}):
+            pass
@@ -0,0 +1,28 @@
+"""Index module titles and quiz attempts by quiz.
+
+Revision ID: 2d8f5a1c9b47
+Revises: 9e1b7d3a5c24
+Create Date: 2026-10-18 20:03:52.771904
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d8f5a1c9b47'
+down_revision = '9e1b7d3a5c24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Teacher dashboard pages in (title, id) order
+    op.create_index('ix_module_title', 'module', ['title'])
+    # Set-based module deletion
+    op.create_index('ix_quiz_attempt_quiz_id', 'quiz_attempt', ['quiz_id'])
+
+
+def downgrade():
+    op.drop_index('ix_quiz_attempt_quiz_id', table_name='quiz_attempt')
+    op.drop_index('ix_module_title', table_name='module')
@@ -0,0 +1,28 @@
+"""Add quiz question pool and shuffle settings.
+
+Revision ID: 3c7e9a2f5d16
+Revises: 2d8f5a1c9b47
+Create Date: 2026-10-18 21:14:06.318442
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c7e9a2f5d16'
+down_revision = '2d8f5a1c9b47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('pool_size', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('shuffle', sa.Boolean(), nullable=False, server_default=sa.false()))
+
+
+def downgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.drop_column('shuffle')
+        batch_op.drop_column('pool_size')
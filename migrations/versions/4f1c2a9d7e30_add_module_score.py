@@ -0,0 +1,44 @@
+"""Add module_score summary table.
+
+Revision ID: 4f1c2a9d7e30
+Revises: b36421c834f4
+Create Date: 2026-10-18 09:12:05.118342
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f1c2a9d7e30'
+down_revision = 'b36421c834f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('module_score',
+    sa.Column('module_id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('total_score', sa.Integer(), nullable=False),
+    sa.Column('quizzes_completed', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['module_id'], ['module.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('module_id', 'student_id')
+    )
+    # Backfill from existing results, counting each student's first attempt per quiz
+    op.execute("""
+        INSERT INTO module_score (module_id, student_id, total_score, quizzes_completed)
+        SELECT quiz.module_id, quiz_result.student_id, SUM(quiz_result.score), COUNT(quiz_result.id)
+        FROM quiz_result
+        JOIN quiz ON quiz.id = quiz_result.quiz_id
+        JOIN (
+            SELECT MIN(id) AS id FROM quiz_result GROUP BY student_id, quiz_id
+        ) AS first_attempt ON first_attempt.id = quiz_result.id
+        WHERE quiz_result.student_id IS NOT NULL
+        GROUP BY quiz.module_id, quiz_result.student_id
+    """)
+
+
+def downgrade():
+    op.drop_table('module_score')
@@ -0,0 +1,65 @@
+"""Repack quiz_result answers into the answer log format.
+
+Revision ID: 5b9f03c2d8e1
+Revises: d27a9e4c61b8
+Create Date: 2026-10-18 12:41:37.026635
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5b9f03c2d8e1'
+down_revision = 'd27a9e4c61b8'
+branch_labels = None
+depends_on = None
+
+FORMAT_NIBBLE = 1
+FORMAT_INT8 = 2
+
+quiz_result = sa.table('quiz_result',
+    sa.column('id', sa.Integer()),
+    sa.column('answers', sa.LargeBinary()),
+)
+
+
+def _rewrite(convert):
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(quiz_result.c.id, quiz_result.c.answers).where(quiz_result.c.answers.isnot(None))).fetchall()
+    updates = [{'result_id': row.id, 'packed': convert(bytes(row.answers))} for row in rows]
+    if updates:
+        connection.execute(
+            quiz_result.update().where(quiz_result.c.id == sa.bindparam('result_id')).values(answers=sa.bindparam('packed')),
+            updates,
+        )
+
+
+def _pack(raw):
+    # Raw blobs hold one signed byte per answer
+    indices = [value - 256 if value > 127 else value for value in raw]
+    if any(index > 14 for index in indices):
+        return bytes([FORMAT_INT8]) + raw
+    shifted = [index + 1 for index in indices]
+    if len(shifted) % 2:
+        shifted.append(0)
+    return bytes([FORMAT_NIBBLE]) + bytes(low | (high << 4) for low, high in zip(shifted[0::2], shifted[1::2]))
+
+
+def _unpack(packed):
+    if packed[0] == FORMAT_INT8:
+        return packed[1:]
+    # A trailing padding nibble cannot be told apart from an unanswered
+    # question, so it comes back as one extra -1 answer
+    indices = []
+    for byte in packed[1:]:
+        indices.extend(((byte & 0x0F) - 1, (byte >> 4) - 1))
+    return bytes(index & 0xFF for index in indices)
+
+
+def upgrade():
+    _rewrite(_pack)
+
+
+def downgrade():
+    _rewrite(_unpack)
@@ -0,0 +1,34 @@
+"""Snapshot the question pool settings on quiz_attempt.
+
+Revision ID: 6e2d4b8a1f53
+Revises: 3c7e9a2f5d16
+Create Date: 2026-10-18 23:02:41.508913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6e2d4b8a1f53'
+down_revision = '3c7e9a2f5d16'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz_attempt', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('pool_size', sa.Integer(), nullable=True))
+        batch_op.add_column(sa.Column('shuffle', sa.Boolean(), nullable=False, server_default=sa.false()))
+    # Existing attempts were drawn with their quiz's current settings
+    op.execute("""
+        UPDATE quiz_attempt
+        SET pool_size = (SELECT quiz.pool_size FROM quiz WHERE quiz.id = quiz_attempt.quiz_id),
+            shuffle = coalesce((SELECT quiz.shuffle FROM quiz WHERE quiz.id = quiz_attempt.quiz_id), shuffle)
+    """)
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_attempt', schema=None) as batch_op:
+        batch_op.drop_column('shuffle')
+        batch_op.drop_column('pool_size')
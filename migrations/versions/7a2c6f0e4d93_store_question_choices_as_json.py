@@ -0,0 +1,46 @@
+"""Store question choices as a JSON list.
+
+Revision ID: 7a2c6f0e4d93
+Revises: e3b7c1d95f26
+Create Date: 2026-10-18 15:57:09.481125
+
+"""
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7a2c6f0e4d93'
+down_revision = 'e3b7c1d95f26'
+branch_labels = None
+depends_on = None
+
+question = sa.table('question',
+    sa.column('id', sa.Integer()),
+    sa.column('choices', sa.Text()),
+)
+
+
+def _rewrite(convert):
+    connection = op.get_bind()
+    rows = connection.execute(sa.select(question.c.id, question.c.choices)).fetchall()
+    updates = [{'question_id': row.id, 'new_choices': convert(row.choices)} for row in rows]
+    if updates:
+        connection.execute(
+            question.update().where(question.c.id == sa.bindparam('question_id')).values(choices=sa.bindparam('new_choices')),
+            updates,
+        )
+
+
+def upgrade():
+    _rewrite(lambda choices: json.dumps(choices.split(',')))
+    with op.batch_alter_table('question', schema=None) as batch_op:
+        batch_op.alter_column('choices', existing_type=sa.String(length=255), type_=sa.JSON(), existing_nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('question', schema=None) as batch_op:
+        batch_op.alter_column('choices', existing_type=sa.JSON(), type_=sa.String(length=255), existing_nullable=False)
+    _rewrite(lambda choices: ','.join(json.loads(choices)))
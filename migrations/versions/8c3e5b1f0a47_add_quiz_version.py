@@ -0,0 +1,26 @@
+"""Add quiz version stamp.
+
+Revision ID: 8c3e5b1f0a47
+Revises: 4f1c2a9d7e30
+Create Date: 2026-10-18 10:02:41.550917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c3e5b1f0a47'
+down_revision = '4f1c2a9d7e30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('version', sa.Integer(), nullable=False, server_default='1'))
+
+
+def downgrade():
+    with op.batch_alter_table('quiz', schema=None) as batch_op:
+        batch_op.drop_column('version')
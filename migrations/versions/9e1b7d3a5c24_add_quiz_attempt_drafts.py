@@ -0,0 +1,28 @@
+"""Add autosaved draft answers to quiz attempts.
+
+Revision ID: 9e1b7d3a5c24
+Revises: f4a9d2c7b318
+Create Date: 2026-10-18 18:47:31.208416
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9e1b7d3a5c24'
+down_revision = 'f4a9d2c7b318'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz_attempt', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('draft_answers', sa.LargeBinary(), nullable=True))
+        batch_op.add_column(sa.Column('saved_at', sa.DateTime(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_attempt', schema=None) as batch_op:
+        batch_op.drop_column('saved_at')
+        batch_op.drop_column('draft_answers')
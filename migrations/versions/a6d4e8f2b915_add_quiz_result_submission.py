@@ -0,0 +1,30 @@
+"""Add submission id and timestamp to quiz_result.
+
+Revision ID: a6d4e8f2b915
+Revises: 5b9f03c2d8e1
+Create Date: 2026-10-18 13:35:58.672104
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a6d4e8f2b915'
+down_revision = '5b9f03c2d8e1'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz_result', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('submission_id', sa.String(length=32), nullable=True))
+        batch_op.add_column(sa.Column('submitted_at', sa.DateTime(), nullable=True))
+        batch_op.create_index(batch_op.f('ix_quiz_result_submission_id'), ['submission_id'], unique=True)
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_result', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_quiz_result_submission_id'))
+        batch_op.drop_column('submitted_at')
+        batch_op.drop_column('submission_id')
@@ -0,0 +1,40 @@
+"""Add indexes for hot lookup paths.
+
+Revision ID: c81f4a7b2e05
+Revises: 7a2c6f0e4d93
+Create Date: 2026-10-18 17:06:44.215839
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c81f4a7b2e05'
+down_revision = '7a2c6f0e4d93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Quizzes of a module
+    op.create_index('ix_quiz_module_id', 'quiz', ['module_id'])
+    # Questions of a quiz, in id order (the rowid is part of every index)
+    op.create_index('ix_question_quiz_id', 'question', ['quiz_id'])
+    # Results of a quiz in id order, for regrading and streaming readers
+    op.create_index('ix_quiz_result_quiz_id', 'quiz_result', ['quiz_id'])
+    # First-attempt checks and per-student aggregation
+    op.create_index('ix_quiz_result_student_id_quiz_id', 'quiz_result', ['student_id', 'quiz_id'])
+    # Students ordered by username, for the unassigned-students listing
+    op.create_index('ix_user_role_username', 'user', ['role', 'username'])
+    # Enrollments of a module; the primary key covers lookups by student
+    op.create_index('ix_student_module_module_id_student_id', 'student_module', ['module_id', 'student_id'])
+
+
+def downgrade():
+    op.drop_index('ix_student_module_module_id_student_id', table_name='student_module')
+    op.drop_index('ix_user_role_username', table_name='user')
+    op.drop_index('ix_quiz_result_student_id_quiz_id', table_name='quiz_result')
+    op.drop_index('ix_quiz_result_quiz_id', table_name='quiz_result')
+    op.drop_index('ix_question_quiz_id', table_name='question')
+    op.drop_index('ix_quiz_module_id', table_name='quiz')
@@ -0,0 +1,26 @@
+"""Store submitted answers on quiz_result.
+
+Revision ID: d27a9e4c61b8
+Revises: 8c3e5b1f0a47
+Create Date: 2026-10-18 11:20:13.904266
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd27a9e4c61b8'
+down_revision = '8c3e5b1f0a47'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('quiz_result', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('answers', sa.LargeBinary(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_result', schema=None) as batch_op:
+        batch_op.drop_column('answers')
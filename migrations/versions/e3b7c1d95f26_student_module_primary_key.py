@@ -0,0 +1,37 @@
+"""Give student_module a composite primary key.
+
+Revision ID: e3b7c1d95f26
+Revises: a6d4e8f2b915
+Create Date: 2026-10-18 14:48:20.331790
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3b7c1d95f26'
+down_revision = 'a6d4e8f2b915'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Drop incomplete rows and duplicate enrollments before adding the key
+    op.execute("""
+        DELETE FROM student_module
+        WHERE student_id IS NULL OR module_id IS NULL OR rowid NOT IN (
+            SELECT MIN(rowid) FROM student_module GROUP BY student_id, module_id
+        )
+    """)
+    with op.batch_alter_table('student_module', schema=None, recreate='always') as batch_op:
+        batch_op.alter_column('student_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('module_id', existing_type=sa.Integer(), nullable=False)
+        batch_op.create_primary_key('pk_student_module', ['student_id', 'module_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('student_module', schema=None, recreate='always') as batch_op:
+        batch_op.drop_constraint('pk_student_module', type_='primary')
+        batch_op.alter_column('module_id', existing_type=sa.Integer(), nullable=True)
+        batch_op.alter_column('student_id', existing_type=sa.Integer(), nullable=True)
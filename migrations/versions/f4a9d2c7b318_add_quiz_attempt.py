@@ -0,0 +1,49 @@
+"""Add quiz attempts for server-side deadlines.
+
+Revision ID: f4a9d2c7b318
+Revises: c81f4a7b2e05
+Create Date: 2026-10-18 18:12:09.640127
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f4a9d2c7b318'
+down_revision = 'c81f4a7b2e05'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('quiz_attempt',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('quiz_id', sa.Integer(), nullable=False),
+    sa.Column('started_at', sa.DateTime(), nullable=False),
+    sa.Column('deadline', sa.DateTime(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.ForeignKeyConstraint(['quiz_id'], ['quiz.id'], ),
+    sa.ForeignKeyConstraint(['student_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    # The open attempt of a student on a quiz
+    op.create_index('ix_quiz_attempt_student_id_quiz_id_status', 'quiz_attempt', ['student_id', 'quiz_id', 'status'])
+    # Open attempts past their deadline, for the sweeper
+    op.create_index('ix_quiz_attempt_status_deadline', 'quiz_attempt', ['status', 'deadline'])
+
+    with op.batch_alter_table('quiz_result', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('attempt_id', sa.Integer(), nullable=True))
+        batch_op.create_foreign_key('fk_quiz_result_attempt_id', 'quiz_attempt', ['attempt_id'], ['id'])
+
+
+def downgrade():
+    with op.batch_alter_table('quiz_result', schema=None) as batch_op:
+        batch_op.drop_constraint('fk_quiz_result_attempt_id', type_='foreignkey')
+        batch_op.drop_column('attempt_id')
+
+    op.drop_index('ix_quiz_attempt_status_deadline', table_name='quiz_attempt')
+    op.drop_index('ix_quiz_attempt_student_id_quiz_id_status', table_name='quiz_attempt')
+    op.drop_table('quiz_attempt')
@@ -0,0 +1,44 @@
+import logging
+import os
+
+from flask import Flask
+
+from . import services
+from .assets import init_assets
+from .auth import bp as auth_bp
+from .cli import register_commands
+from .config import load_config
+from .database import configure_engines
+from .extensions import db, login_manager, MigrateCommands
+from .instrumentation import init_instrumentation
+from .student import bp as student_bp
+from .teacher import bp as teacher_bp
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def create_app():
+    # Templates, static files and the instance folder stay at the top of the
+    # repository; Flask-Migrate is only set up when a db command runs
+    app = Flask(__name__, template_folder=os.path.join(ROOT, 'templates'),
+                static_folder=os.path.join(ROOT, 'static'), instance_path=os.path.join(ROOT, 'instance'))
+    load_config(app)
+    logging.basicConfig(level=app.config['LOG_LEVEL'], format='%(asctime)s %(levelname)s %(name)s %(message)s')
+
+    db.init_app(app)
+    configure_engines(app, db)
+    login_manager.init_app(app)
+    login_manager.login_view = 'auth.home'
+    app.cli.add_command(MigrateCommands(app))
+
+    services.init_app(app)
+    if app.config['INSTRUMENTATION_ENABLED']:
+        init_instrumentation(app, db, app.extensions['quizapp'].endpoint_metrics)
+    # Fingerprinted, precompressed static files; see the build-assets command
+    init_assets(app)
+
+    app.register_blueprint(auth_bp)
+    app.register_blueprint(teacher_bp)
+    app.register_blueprint(student_bp)
+    register_commands(app)
+    return app
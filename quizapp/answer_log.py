@@ -0,0 +1,102 @@
+from collections import namedtuple
+
+import numpy as np
+from sqlalchemy import select
+
+from .grading import UNANSWERED, responses_array
+
+# quiz_result.answers holds one packed blob per result. The first byte names
+# the format, the rest are the chosen choice indices in question order:
+#   NIBBLE - two answers per byte, low nibble first, stored as index + 1 so
+#            that 0 means unanswered (fits quizzes with up to 15 choices)
+#   INT8   - one signed byte per answer, for anything larger and for
+#            answers holding NOT_PRESENTED
+FORMAT_NIBBLE = 1
+FORMAT_INT8 = 2
+NIBBLE_MAX = 14
+
+# One chunk of a quiz's stored answers, rows aligned across all fields
+AnswerBatch = namedtuple('AnswerBatch', ['result_ids', 'student_ids', 'scores', 'responses'])
+
+
+def encode_answers(choice_indices):
+    indices = np.asarray(choice_indices, dtype=np.int8)
+    if indices.size and (indices.max() > NIBBLE_MAX or indices.min() < UNANSWERED):
+        return bytes([FORMAT_INT8]) + indices.tobytes()
+    shifted = (indices + 1).astype(np.uint8)
+    if shifted.size % 2:
+        shifted = np.append(shifted, np.uint8(0))
+    packed = shifted[0::2] | (shifted[1::2] << 4)
+    return bytes([FORMAT_NIBBLE]) + packed.tobytes()
+
+
+def _unpack_nibbles(packed, question_count):
+    # packed is a (rows x bytes) uint8 matrix without the format byte
+    unpacked = np.empty((packed.shape[0], packed.shape[1] * 2), dtype=np.int8)
+    unpacked[:, 0::2] = packed & 0x0F
+    unpacked[:, 1::2] = packed >> 4
+    return unpacked[:, :question_count] - 1
+
+
+def decode_answer(blob, question_count):
+    if blob[0] == FORMAT_INT8:
+        answers = np.frombuffer(blob, dtype=np.int8, offset=1)
+    else:
+        packed = np.frombuffer(blob, dtype=np.uint8, offset=1)
+        answers = _unpack_nibbles(packed.reshape(1, -1), packed.size * 2)[0]
+    return responses_array([answers], question_count)[0]
+
+
+def stored_count(blob):
+    # Answers held in a blob; a nibble blob of odd length has one extra
+    # UNANSWERED slot of padding
+    return (len(blob) - 1) * (1 if blob[0] == FORMAT_INT8 else 2)
+
+
+def merge_answers(blob, changes):
+    # Applies {question index: choice index} to a packed blob, or to an
+    # empty answer list when blob is None, and returns the repacked blob
+    size = max(stored_count(blob) if blob else 0, max(changes, default=-1) + 1)
+    answers = decode_answer(blob, size) if blob else np.full(size, UNANSWERED, dtype=np.int8)
+    for index, choice in changes.items():
+        answers[index] = choice
+    return encode_answers(answers)
+
+
+def decode_answers(blobs, question_count):
+    # Fast paths: a uniform chunk of nibble or int8 blobs unpacks as one matrix
+    width = 1 + (question_count + 1) // 2
+    if all(len(blob) == width and blob[0] == FORMAT_NIBBLE for blob in blobs):
+        packed = np.frombuffer(b''.join(blobs), dtype=np.uint8).reshape(-1, width)
+        return _unpack_nibbles(packed[:, 1:], question_count)
+    if blobs and all(len(blob) == question_count + 1 and blob[0] == FORMAT_INT8 for blob in blobs):
+        return np.frombuffer(b''.join(blobs), dtype=np.int8).reshape(-1, question_count + 1)[:, 1:].copy()
+    if not blobs:
+        return np.full((0, question_count), UNANSWERED, dtype=np.int8)
+    return np.stack([decode_answer(blob, question_count) for blob in blobs])
+
+
+def iter_answer_batches(session, results, quiz_id, question_count, batch_size=10000, after_id=None):
+    # Stream a quiz's answers from the quiz_result table in id order without
+    # loading the whole result set; after_id resumes from a previous read
+    query = (
+        select(results.c.id, results.c.student_id, results.c.score, results.c.answers)
+        .where(results.c.quiz_id == quiz_id, results.c.answers.isnot(None))
+        .order_by(results.c.id)
+    )
+    if after_id is not None:
+        query = query.where(results.c.id > after_id)
+    rows = session.execute(query.execution_options(yield_per=batch_size))
+    for chunk in rows.partitions():
+        result_ids, student_ids, scores, blobs = zip(*chunk)
+        yield AnswerBatch(
+            np.asarray(result_ids, dtype=np.int64),
+            np.asarray(student_ids, dtype=np.int64),
+            np.asarray(scores, dtype=np.int32),
+            decode_answers(blobs, question_count),
+        )
+
+
+def iter_answers(session, results, quiz_id, question_count, batch_size=10000):
+    for batch in iter_answer_batches(session, results, quiz_id, question_count, batch_size):
+        yield from zip(batch.result_ids.tolist(), batch.student_ids.tolist(), batch.responses)
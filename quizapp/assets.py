@@ -0,0 +1,169 @@
+import base64
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+
+from flask import request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # Optional; without it only gzip copies are built
+    brotli = None
+
+# Third-party files vendored under static/, with the release they are
+# fetched from and its published Subresource Integrity hash
+VENDOR_ASSETS = {
+    'vendor/bootstrap.min.css': (
+        'https://stackpath.bootstrapcdn.com/bootstrap/4.5.2/css/bootstrap.min.css',
+        'sha384-JcKb8q3iqJ61gNV9KGb8thSsNjpSL0n8PARn9HuZOnIxN0hoP+VmmDGMN5t9UJ0Z',
+    ),
+    'vendor/bootstrap.bundle.min.js': (
+        'https://cdn.jsdelivr.net/npm/bootstrap@4.5.2/dist/js/bootstrap.bundle.min.js',
+        'sha384-LtrjvnR4Twt/qOuYxE721u19sVFLVSA4hf/rRt6PrZTmiPltdZcI7q7PXQBYTKyf',
+    ),
+    'vendor/jquery.slim.min.js': (
+        'https://code.jquery.com/jquery-3.5.1.slim.min.js',
+        'sha384-DfXdz2htPH0lsSSs5nCTpuj/zy4C+OGpamoFVy38MVBnE+IbbVYUew+OrCXaRkfj',
+    ),
+}
+
+# Build output, relative to the static folder
+BUILD_DIR = 'dist'
+MANIFEST = 'manifest.json'
+COMPRESSIBLE = ('.css', '.js', '.json', '.svg', '.txt', '.map')
+# Precompressed copies, in order of preference
+ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class AssetError(Exception):
+    pass
+
+
+def integrity(data):
+    return 'sha384-' + base64.b64encode(hashlib.sha384(data).digest()).decode()
+
+
+def vendor_assets(static_dir, fetch=None):
+    # Downloads the vendored files that are missing; returns their names
+    if fetch is None:
+        import urllib.request
+        fetch = urllib.request.urlopen
+    fetched = []
+    for name, (url, expected) in VENDOR_ASSETS.items():
+        path = os.path.join(static_dir, name)
+        if os.path.exists(path):
+            continue
+        with fetch(url, timeout=30) as response:
+            data = response.read()
+        if integrity(data) != expected:
+            raise AssetError(f'{url} does not match its integrity hash {expected}')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(data)
+        fetched.append(name)
+    return fetched
+
+
+def _write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as file:
+        file.write(data)
+
+
+def build_assets(static_dir):
+    # Copies every static file into BUILD_DIR under a name carrying its
+    # content hash, next to gzip/brotli copies where those are smaller, and
+    # writes the manifest mapping each original name to its built one.
+    # Earlier builds are left in place for pages still referring to them.
+    manifest = {}
+    for root, dirs, files in os.walk(static_dir):
+        if root == static_dir:
+            dirs[:] = [name for name in dirs if name != BUILD_DIR]
+        for filename in files:
+            source = os.path.join(root, filename)
+            name = os.path.relpath(source, static_dir).replace(os.sep, '/')
+            with open(source, 'rb') as file:
+                data = file.read()
+            stem, extension = posixpath.splitext(name)
+            built = f'{BUILD_DIR}/{stem}.{hashlib.sha256(data).hexdigest()[:12]}{extension}'
+            path = os.path.join(static_dir, built)
+            _write(path, data)
+            if extension in COMPRESSIBLE:
+                compressed = {'.gz': gzip.compress(data, compresslevel=9, mtime=0)}
+                if brotli is not None:
+                    compressed['.br'] = brotli.compress(data, quality=11)
+                for suffix, body in compressed.items():
+                    if len(body) < len(data):
+                        _write(path + suffix, body)
+            manifest[name] = built
+    _write(os.path.join(static_dir, BUILD_DIR, MANIFEST),
+           json.dumps(dict(sorted(manifest.items())), indent=2).encode())
+    return manifest
+
+
+# The manifest of the last build, loaded once per process
+class StaticAssets:
+    def __init__(self, static_dir):
+        self.static_dir = static_dir
+        self.load()
+
+    def load(self):
+        try:
+            with open(os.path.join(self.static_dir, BUILD_DIR, MANIFEST), encoding='utf-8') as file:
+                self.manifest = json.load(file)
+        except FileNotFoundError:
+            self.manifest = {}
+        # Encodings available for each built file
+        self.encodings = {
+            built: tuple((encoding, suffix) for encoding, suffix in ENCODINGS
+                         if os.path.exists(os.path.join(self.static_dir, built + suffix)))
+            for built in self.manifest.values()
+        }
+
+    def negotiate(self, filename, accept_encodings):
+        for encoding, suffix in self.encodings.get(filename, ()):
+            if accept_encodings.quality(encoding) > 0:
+                return encoding, suffix
+        return None, ''
+
+
+def init_assets(app):
+    # url_for('static', filename=...) resolves to the fingerprinted file once
+    # the assets are built, and those files are served precompressed with
+    # far-future immutable caching; anything unbuilt is served as before
+    assets = StaticAssets(app.static_folder)
+    max_age = app.config['ASSET_MAX_AGE']
+
+    @app.url_defaults
+    def fingerprint_static(endpoint, values):
+        if endpoint == 'static' and values.get('filename') in assets.manifest:
+            values['filename'] = assets.manifest[values['filename']]
+
+    def static_view(filename):
+        if filename not in assets.encodings:
+            return app.send_static_file(filename)
+        encoding, suffix = assets.negotiate(filename, request.accept_encodings)
+        response = send_from_directory(app.static_folder, filename + suffix,
+                                       mimetype=mimetypes.guess_type(filename)[0], max_age=max_age)
+        if encoding:
+            response.content_encoding = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    app.view_functions['static'] = static_view
+    app.extensions['static_assets'] = assets
+
+    @app.template_global()
+    def asset_url(filename):
+        # Vendored files come from their CDN until they have been fetched
+        if (filename in VENDOR_ASSETS and filename not in assets.manifest
+                and not os.path.exists(os.path.join(app.static_folder, filename))):
+            return VENDOR_ASSETS[filename][0]
+        return url_for('static', filename=filename)
+
+    return assets
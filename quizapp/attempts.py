@@ -0,0 +1,123 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# An open quiz attempt as seen by the submit path; deadline is a Unix
+# timestamp, pool_size and shuffle the quiz's settings when it started
+OpenAttempt = namedtuple('OpenAttempt', ['id', 'started_at', 'deadline', 'pool_size', 'shuffle'])
+
+
+# Open attempts keyed by (student_id, quiz_id). quiz_attempt in the database
+# is the backing store; this index lets start_quiz check a deadline without
+# a query, and is refilled from the database on a miss. A submitted attempt
+# stays open in the database until its result is written behind, so it is
+# remembered as closed until then and not refilled.
+class AttemptIndex:
+    def __init__(self):
+        self._attempts = {}
+        self._closed = {}  # attempt id -> Unix timestamp it is remembered until
+        self._expiries = []  # heap of (timestamp, attempt id)
+        self._lock = threading.Lock()
+
+    def get(self, student_id, quiz_id):
+        return self._attempts.get((student_id, quiz_id))
+
+    def put(self, student_id, quiz_id, attempt):
+        with self._lock:
+            self._attempts[(student_id, quiz_id)] = attempt
+
+    def discard(self, student_id, quiz_id, attempt_id=None):
+        with self._lock:
+            attempt = self._attempts.get((student_id, quiz_id))
+            if attempt is not None and attempt_id in (None, attempt.id):
+                del self._attempts[(student_id, quiz_id)]
+
+    def close(self, student_id, quiz_id, attempt_id, until):
+        self.discard(student_id, quiz_id, attempt_id)
+        now = time.time()
+        with self._lock:
+            self._closed[attempt_id] = until
+            heapq.heappush(self._expiries, (until, attempt_id))
+            while self._expiries and self._expiries[0][0] < now:
+                expiry, expired_id = heapq.heappop(self._expiries)
+                if self._closed.get(expired_id) == expiry:
+                    del self._closed[expired_id]
+
+    def is_closed(self, attempt_id):
+        until = self._closed.get(attempt_id)
+        return until is not None and time.time() <= until
+
+    def __len__(self):
+        return len(self._attempts)
+
+
+# Runs sweep() every `interval` seconds on a daemon thread, one per process
+class PeriodicSweeper:
+    def __init__(self, interval, sweep, name='attempt-sweeper'):
+        self.interval = interval
+        self.sweep = sweep
+        self.name = name
+        self._lock = threading.Lock()
+        self._pid = None
+
+    def start(self):
+        with self._lock:
+            if self._pid != os.getpid():
+                self._pid = os.getpid()
+                threading.Thread(target=self._run, name=self.name, daemon=True).start()
+
+    def _run(self):
+        stop = threading.Event()
+        while not stop.wait(self.interval):
+            if self._pid != os.getpid():
+                return
+            try:
+                self.sweep()
+            except Exception:
+                logger.exception('Periodic task %s failed', self.name)
+
+
+# Autosaved answers waiting to be written, keyed by attempt id. Each save
+# only merges its deltas ({question index: choice index or UNANSWERED}) into
+# a dict; a periodic flush takes everything pending at once, so an attempt
+# saved many times between flushes costs a single row update.
+class AutosaveBuffer:
+    def __init__(self):
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def update(self, attempt_id, deltas):
+        with self._lock:
+            self._pending.setdefault(attempt_id, {}).update(deltas)
+
+    def pending(self, attempt_id):
+        with self._lock:
+            return dict(self._pending.get(attempt_id, ()))
+
+    def discard(self, attempt_id):
+        with self._lock:
+            self._pending.pop(attempt_id, None)
+
+    def take(self, limit=None):
+        with self._lock:
+            if limit is None or len(self._pending) <= limit:
+                taken, self._pending = self._pending, {}
+            else:
+                taken = {}
+                for attempt_id in list(self._pending)[:limit]:
+                    taken[attempt_id] = self._pending.pop(attempt_id)
+            return taken
+
+    def restore(self, taken):
+        # Put back a batch whose flush failed, without overwriting newer saves
+        with self._lock:
+            for attempt_id, deltas in taken.items():
+                self._pending[attempt_id] = {**deltas, **self._pending.get(attempt_id, {})}
+
+    def __len__(self):
+        return len(self._pending)
@@ -0,0 +1,78 @@
+import math
+
+from flask import Blueprint, render_template, redirect, url_for, request, make_response
+from flask_login import login_user, login_required, logout_user
+from sqlalchemy import select
+
+from . import services
+from .extensions import db, login_manager
+from .identity import CachedIdentity
+from .models import student_module, User
+from .passwords import HasherBusy
+
+bp = Blueprint('auth', __name__)
+
+# User loader for Flask-Login
+@login_manager.user_loader
+def load_user(user_id):
+    user_id = int(user_id)
+    identity = services.state().identity_cache.get(user_id)
+    if identity is None:
+        user = db.session.execute(select(User.id, User.username, User.role).where(User.id == user_id)).first()
+        if user is None:
+            return None
+        module_ids = db.session.scalars(
+            select(student_module.c.module_id).where(student_module.c.student_id == user_id)
+        ).all()
+        identity = CachedIdentity(user.id, user.username, user.role, module_ids)
+        services.state().identity_cache.put(identity)
+    return identity
+
+@bp.route('/')
+def home():
+    return render_template('home.html')
+
+def refuse_login(template, error, status, retry_after):
+    response = make_response(render_template(template, error=error), status)
+    response.headers['Retry-After'] = str(math.ceil(retry_after))
+    return response
+
+def log_in(role, template, next_endpoint):
+    if request.method != 'POST':
+        return render_template(template)
+    username = request.form['username']
+    password = request.form['password']
+    # Throttled before the user is loaded or anything is hashed
+    state = services.state()
+    retry_after = max(state.login_ip_buckets.take(request.remote_addr),
+                      state.login_username_buckets.take(username))
+    if retry_after:
+        return refuse_login(template, 'Too many login attempts. Please wait and try again.', 429, retry_after)
+    user = User.query.filter_by(username=username, role=role).first()
+    try:
+        if user and state.password_hasher.verify(user.password, password):
+            if state.password_hasher.needs_rehash(user.password):
+                user.password = state.password_hasher.hash(password)
+                db.session.commit()
+            login_user(user)
+            return redirect(url_for(next_endpoint))
+    except HasherBusy:
+        return refuse_login(template, 'The server is busy. Please try again in a moment.', 503, 1)
+    return render_template(template, error='Invalid username or password')
+
+# Student Login Route
+@bp.route('/student_login', methods=['GET', 'POST'])
+def student_login():
+    return log_in('student', 'student_login.html', 'student.student_dashboard_view')
+
+# Teacher Login Route
+@bp.route('/teacher_login', methods=['GET', 'POST'])
+def teacher_login():
+    return log_in('teacher', 'teacher_login.html', 'teacher.teacher_dashboard')
+
+# Logout Route
+@bp.route('/logout')
+@login_required
+def logout():
+    logout_user()
+    return redirect(url_for('auth.home'))
@@ -0,0 +1,112 @@
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from sqlalchemy import select
+
+from . import services
+from .assets import build_assets, vendor_assets
+from .extensions import db
+from .models import Module, Quiz, User
+from .question_bank import iter_questions
+from .roster import RosterError, parse_roster
+
+# Maintenance commands; register_commands adds each one to `flask` directly
+commands = AppGroup('quizapp')
+
+@commands.command('flush-results')
+def flush_results_command():
+    services.state().result_queue.drain()
+    click.echo('Journaled quiz results flushed.')
+
+
+@commands.command('build-assets')
+@click.option('--offline', is_flag=True, help='Do not download missing vendored files.')
+def build_assets_command(offline):
+    if not offline:
+        for name in vendor_assets(current_app.static_folder):
+            click.echo(f'Fetched {name}')
+    manifest = build_assets(current_app.static_folder)
+    current_app.extensions['static_assets'].load()
+    click.echo(f'Built {len(manifest)} asset(s) into {current_app.static_folder}/dist.')
+
+
+@commands.command('sweep-attempts')
+def sweep_attempts_command():
+    click.echo(f'Finalized {services.sweep_expired_attempts()} expired attempt(s).')
+
+
+@commands.command('regrade-quiz')
+@click.argument('quiz_id', type=int)
+def regrade_quiz_command(quiz_id):
+    if db.session.get(Quiz, quiz_id) is None:
+        raise click.ClickException(f'Quiz {quiz_id} not found.')
+    changed = services.regrade_quiz(quiz_id)
+    click.echo(f'Regraded quiz {quiz_id}: {changed} result(s) changed.')
+
+
+@commands.command('rebuild-module-scores')
+def rebuild_module_scores_command():
+    services.rebuild_module_scores()
+    db.session.commit()
+    services.reset_leaderboards(*db.session.scalars(select(Module.id)))
+    click.echo('Module scores rebuilt.')
+
+
+@commands.command('create-user')
+@click.argument('username')
+@click.option('--role', type=click.Choice(['student', 'teacher']), default='student', show_default=True)
+@click.password_option()
+def create_user_command(username, role, password):
+    if db.session.scalar(select(User.id).where(User.username == username)) is not None:
+        raise click.ClickException(f'User {username} already exists.')
+    db.session.add(User(username=username, password=services.state().password_hasher.hash(password), role=role))
+    db.session.commit()
+    click.echo(f'Created {role} {username}.')
+
+
+@commands.command('import-roster')
+@click.argument('module_id', type=int)
+@click.argument('roster', type=click.Path(exists=True, dir_okay=False))
+def import_roster_command(module_id, roster):
+    if db.session.get(Module, module_id) is None:
+        raise click.ClickException(f'Module {module_id} not found.')
+    try:
+        with open(roster, 'rb') as stream:
+            usernames, student_ids = parse_roster(stream, roster)
+    except RosterError as error:
+        raise click.ClickException(str(error))
+    summary = services.enroll_students(module_id, usernames, student_ids)
+    click.echo(f"Enrolled {summary['enrolled']} student(s), {summary['already_enrolled']} already enrolled.")
+    for name in summary['unknown_usernames']:
+        click.echo(f'Unknown student username: {name}')
+    for student_id in summary['unknown_ids']:
+        click.echo(f'Unknown student id: {student_id}')
+
+
+@commands.command('import-questions')
+@click.argument('quiz_id', type=int)
+@click.argument('bank', type=click.Path(exists=True, dir_okay=False))
+def import_questions_command(quiz_id, bank):
+    quiz = db.session.get(Quiz, quiz_id)
+    if quiz is None:
+        raise click.ClickException(f'Quiz {quiz_id} not found.')
+    with open(bank, 'rb') as stream:
+        imported, errors = services.import_questions(quiz, iter_questions(stream, bank))
+    for error in errors:
+        click.echo(f'Skipped {error}')
+    click.echo(f'Imported {imported} question(s) into quiz {quiz_id}.')
+
+
+@commands.command('export-questions')
+@click.argument('quiz_id', type=int)
+@click.option('--format', 'export_format', type=click.Choice(['jsonl', 'csv']), default='jsonl')
+@click.option('--output', type=click.File('w', encoding='utf-8'), default='-')
+def export_questions_command(quiz_id, export_format, output):
+    if db.session.get(Quiz, quiz_id) is None:
+        raise click.ClickException(f'Quiz {quiz_id} not found.')
+    output.writelines(services.export_questions(quiz_id, export_format))
+
+
+def register_commands(app):
+    for command in commands.commands.values():
+        app.cli.add_command(command)
@@ -0,0 +1,142 @@
+import os
+
+# Configuration profiles, selected with QUIZAPP_CONFIG (development or
+# production). Any setting can be overridden with a QUIZAPP_ prefixed
+# environment variable, e.g. QUIZAPP_SQLALCHEMY_DATABASE_URI.
+
+class Config:
+    SQLALCHEMY_DATABASE_URI = 'sqlite:///quizapp.db'
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+    SQLALCHEMY_ENGINE_OPTIONS = {}
+    SECRET_KEY = 'supersecretkey'
+    WTF_CSRF_ENABLED = True
+
+    # Optional read-only database for dashboards and leaderboards, e.g.
+    # 'sqlite:///file:/srv/quizapp/quizapp.db?mode=ro&uri=true'
+    READ_DATABASE_URI = None
+
+    # PRAGMAs run on every new SQLite connection. journal_mode is persistent
+    # in the database file, so it is only applied to the write engine.
+    SQLITE_PRAGMAS = {'busy_timeout': 5000}  # In milliseconds
+
+    # werkzeug hashing method for passwords, e.g. 'scrypt' or
+    # 'pbkdf2:sha256:600000'. Hashes made differently are replaced when
+    # their user next logs in.
+    PASSWORD_HASH_METHOD = 'scrypt'
+    PASSWORD_HASH_CONCURRENCY = 2  # Hashes running at once, per process
+    PASSWORD_HASH_TIMEOUT = 5  # Seconds a login waits for a turn before being turned away
+
+    # Login attempts allowed per client address and per username: a burst,
+    # then a steady rate per second (0 turns the limit off). Kept in memory,
+    # per process.
+    LOGIN_IP_BURST = 100
+    LOGIN_IP_RATE = 5
+    LOGIN_USERNAME_BURST = 5
+    LOGIN_USERNAME_RATE = 0.1
+
+    LOG_LEVEL = 'INFO'
+    # Fraction of routine events (e.g. module_viewed) that are logged
+    LOG_SAMPLE_RATE = 0.01
+
+    # Opt-in request profiling: per-endpoint wall time, SQL statements, SQL
+    # time and ORM rows, served in Prometheus text format at METRICS_PATH
+    INSTRUMENTATION_ENABLED = False
+    METRICS_PATH = '/metrics'
+    SLOW_REQUEST_SECONDS = 0.5  # Requests slower than this are logged with their queries
+    REPEATED_QUERY_THRESHOLD = 10  # Same statement this often in one request is logged as a likely N+1
+
+    # Fingerprinted static files (flask build-assets) are cached this long
+    ASSET_MAX_AGE = 365 * 24 * 3600  # In seconds
+
+    DASHBOARD_PAGE_SIZE = 50  # Modules per teacher dashboard page
+
+    QUIZ_CACHE_SIZE = 256
+    ITEM_STATS_CACHE_SIZE = 256  # Quizzes whose item analysis is kept in memory
+
+    # Logged-in user identities kept in memory by load_user
+    IDENTITY_CACHE_SIZE = 4096
+    IDENTITY_CACHE_TTL = 300  # In seconds
+
+    # Rendered student pages; eviction is by total body size
+    RESPONSE_CACHE_MAX_BYTES = 16 * 1024 * 1024
+    RESPONSE_CACHE_MAX_ENTRY_BYTES = 256 * 1024
+
+    # Live leaderboard streams: keepalive interval, and how many undelivered
+    # updates a watcher may fall behind before it is dropped
+    LEADERBOARD_HEARTBEAT = 15  # In seconds
+    LEADERBOARD_QUEUE_SIZE = 256
+    # Loaded standings are reloaded from module_score after this long, for
+    # writes made by processes that do not share COORDINATION_BACKEND
+    LEADERBOARD_TTL = 30  # In seconds
+
+    # Quiz results are journaled and committed in batches by a background writer
+    RESULT_WRITE_BEHIND = True
+    RESULT_JOURNAL_DIR = None  # Defaults to <instance>/result-journal
+    RESULT_FLUSH_INTERVAL = 0.5  # In seconds
+    RESULT_FLUSH_BATCH_SIZE = 500
+
+    # Quiz deadlines are enforced on the server. Submissions arriving up to
+    # the grace period late are accepted; attempts left open are finalized
+    # by a sweeper once the sweep delay has also passed.
+    ATTEMPT_GRACE_PERIOD = 10  # In seconds
+    ATTEMPT_SWEEP_DELAY = 60  # In seconds
+    ATTEMPT_SWEEP_INTERVAL = 30  # In seconds
+    ATTEMPT_SWEEP_BATCH_SIZE = 500
+
+    # Cache invalidations and leaderboard updates reach the other worker
+    # processes through this backend: 'local' when there is only one, or
+    # 'sqlite' for workers on one host (serve.py defaults to it)
+    COORDINATION_BACKEND = 'local'
+    COORDINATION_PATH = None  # Defaults to <instance>/coordination.db
+    COORDINATION_POLL_INTERVAL = 0.005  # In seconds
+
+    # The quiz page sends answer changes every AUTOSAVE_INTERVAL seconds;
+    # the server buffers them and writes them every AUTOSAVE_FLUSH_INTERVAL
+    AUTOSAVE_INTERVAL = 5  # In seconds
+    AUTOSAVE_FLUSH_INTERVAL = 2  # In seconds
+    AUTOSAVE_FLUSH_BATCH_SIZE = 1000
+
+
+class DevelopmentConfig(Config):
+    pass
+
+
+class ProductionConfig(Config):
+    SECRET_KEY = None  # Must come from QUIZAPP_SECRET_KEY; sessions are forgeable with a known key
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_size': 10,
+        'max_overflow': 20,
+        'pool_recycle': 3600,
+        # sqlite3's own lock wait, in seconds, used while connecting
+        'connect_args': {'timeout': 30},
+    }
+    # WAL lets readers run alongside the writer; NORMAL synchronous is safe
+    # with WAL and avoids an fsync per commit
+    SQLITE_PRAGMAS = {
+        'journal_mode': 'WAL',
+        'synchronous': 'NORMAL',
+        'busy_timeout': 30000,
+        'cache_size': -65536,  # 64 MiB
+        'mmap_size': 268435456,  # 256 MiB
+        'temp_store': 'MEMORY',
+    }
+
+
+profiles = {
+    'development': DevelopmentConfig,
+    'production': ProductionConfig,
+}
+
+
+def load_config(app):
+    profile = profiles[os.environ.get('QUIZAPP_CONFIG', 'development')]
+    app.config.from_object(profile)
+    app.config.from_prefixed_env('QUIZAPP')
+    if profile.SECRET_KEY is None and app.config['SECRET_KEY'] in (None, '', Config.SECRET_KEY):
+        raise RuntimeError('Set QUIZAPP_SECRET_KEY to a long random value; the production profile has no default.')
+    if app.config['RESULT_JOURNAL_DIR'] is None:
+        app.config['RESULT_JOURNAL_DIR'] = os.path.join(app.instance_path, 'result-journal')
+    if app.config['COORDINATION_PATH'] is None:
+        app.config['COORDINATION_PATH'] = os.path.join(app.instance_path, 'coordination.db')
+    if app.config['READ_DATABASE_URI']:
+        app.config.setdefault('SQLALCHEMY_BINDS', {})['read'] = app.config['READ_DATABASE_URI']
@@ -0,0 +1,123 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+
+# Carries cache invalidations and leaderboard events between the worker
+# processes serving one deployment. A message is any JSON-serializable value
+# published on a named channel; listen() hands every message published by
+# another process to handler(channel, message) on a daemon thread. The
+# publisher applies its own changes directly, so it never receives them back.
+#
+# A Redis backend would map publish to PUBLISH and listen to a SUBSCRIBE
+# loop; nothing else is needed from the store.
+class Backend:
+    # True when other processes receive what is published
+    shared = True
+
+    def publish(self, channel, message):
+        raise NotImplementedError
+
+    def listen(self, handler):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+# A single process has nobody to tell
+class LocalBackend(Backend):
+    shared = False
+
+    def publish(self, channel, message):
+        pass
+
+    def listen(self, handler):
+        pass
+
+
+# Processes on one host share a small SQLite database used as a message log:
+# publish() appends a row and each process polls for rows past the last one
+# it has seen, every `poll_interval` seconds. Rows are never needed once
+# delivered, so they are pruned after `retention` seconds and nothing is
+# synced to disk.
+class SQLiteBackend(Backend):
+    def __init__(self, path, poll_interval=0.005, retention=60):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self._lock = threading.Lock()
+        self._pid = None
+        self._listening = None
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=OFF')
+        connection.execute(
+            'CREATE TABLE IF NOT EXISTS message (id INTEGER PRIMARY KEY AUTOINCREMENT, '
+            'origin TEXT NOT NULL, channel TEXT NOT NULL, payload TEXT NOT NULL, created REAL NOT NULL)'
+        )
+        return connection
+
+    def _ensure_connected(self):
+        # A forked child gets its own connection and origin; SQLite
+        # connections must not be carried across fork()
+        if self._pid != os.getpid():
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            self._connection = self._connect()
+            self._origin = f'{os.getpid()}-{uuid.uuid4().hex}'
+            self._pid = os.getpid()
+
+    def publish(self, channel, message):
+        payload = json.dumps(message, separators=(',', ':'))
+        with self._lock:
+            self._ensure_connected()
+            self._connection.execute(
+                'INSERT INTO message (origin, channel, payload, created) VALUES (?, ?, ?, ?)',
+                (self._origin, channel, payload, time.time()),
+            )
+
+    def listen(self, handler):
+        with self._lock:
+            self._ensure_connected()
+            if self._listening == os.getpid():
+                return
+            self._listening = os.getpid()
+            # Only messages published from now on are delivered
+            after = self._connection.execute('SELECT coalesce(max(id), 0) FROM message').fetchone()[0]
+        threading.Thread(target=self._run, args=(handler, after), name='coordination', daemon=True).start()
+
+    def _run(self, handler, after):
+        connection = self._connect()
+        origin = self._origin
+        pruned = time.monotonic()
+        while self._listening == os.getpid():
+            try:
+                rows = connection.execute(
+                    'SELECT id, origin, channel, payload FROM message WHERE id > ? ORDER BY id', (after,)
+                ).fetchall()
+                for message_id, message_origin, channel, payload in rows:
+                    after = message_id
+                    if message_origin != origin:
+                        handler(channel, json.loads(payload))
+                if time.monotonic() - pruned > self.retention:
+                    pruned = time.monotonic()
+                    connection.execute('DELETE FROM message WHERE created < ?', (time.time() - self.retention,))
+            except Exception:
+                logger.exception('Handling coordination messages failed')
+            time.sleep(self.poll_interval)
+        connection.close()
+
+    def close(self):
+        with self._lock:
+            if self._pid == os.getpid():
+                self._listening = None
+                self._connection.close()
+                self._pid = None
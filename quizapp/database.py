@@ -0,0 +1,35 @@
+import sqlite3
+
+from flask import current_app
+from sqlalchemy import event
+
+# PRAGMAs that persist in the database file and need write access
+PERSISTENT_PRAGMAS = {'journal_mode'}
+
+
+def _pragma_listener(pragmas):
+    def set_pragmas(dbapi_connection, connection_record):
+        if not isinstance(dbapi_connection, sqlite3.Connection):
+            return
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+        cursor.close()
+    return set_pragmas
+
+
+def configure_engines(app, db):
+    pragmas = app.config['SQLITE_PRAGMAS']
+    read_pragmas = {name: value for name, value in pragmas.items() if name not in PERSISTENT_PRAGMAS}
+    with app.app_context():
+        for bind, engine in db.engines.items():
+            if engine.dialect.name == 'sqlite':
+                event.listen(engine, 'connect', _pragma_listener(read_pragmas if bind == 'read' else pragmas))
+
+
+def read_execute(db, statement):
+    # Run a read-only statement on the read engine when one is configured;
+    # ORM entities it returns still belong to the regular session
+    if 'read' in current_app.config.get('SQLALCHEMY_BINDS', {}):
+        return db.session.execute(statement, bind_arguments={'bind': db.engines['read']})
+    return db.session.execute(statement)
@@ -0,0 +1,32 @@
+import click
+from flask_login import LoginManager
+from flask_sqlalchemy import SQLAlchemy
+
+db = SQLAlchemy()
+login_manager = LoginManager()
+
+
+def init_migrate(app):
+    # Flask-Migrate pulls in Alembic, which serving never needs; it is set
+    # up only for the db commands and scripts that build a database
+    if 'migrate' not in app.extensions:
+        from flask_migrate import Migrate
+        Migrate(app, db)
+
+
+# `flask db ...`, resolved to Flask-Migrate's command group on first use
+class MigrateCommands(click.Group):
+    def __init__(self, app, name='db'):
+        super().__init__(name, help='Perform database migrations.')
+        self.app = app
+
+    def _commands(self):
+        init_migrate(self.app)
+        from flask_migrate.cli import db as commands
+        return commands
+
+    def list_commands(self, ctx):
+        return self._commands().list_commands(ctx)
+
+    def get_command(self, ctx, name):
+        return self._commands().get_command(ctx, name)
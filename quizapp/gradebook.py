@@ -0,0 +1,83 @@
+import csv
+import io
+from datetime import datetime
+from itertools import groupby
+
+# Gradebooks are CSV that Excel opens as UTF-8: a byte order mark first and
+# CRLF line endings. Times are UTC. Rows are written as they are read and
+# sent in chunks of about `chunk_size` characters, so memory stays flat
+# however many results there are.
+BOM = '\ufeff'
+QUIZ_COLUMNS = ('score', 'attempts', 'first submitted', 'last submitted')
+
+
+def _cell(value):
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    # Excel would evaluate text starting with these as a formula
+    if isinstance(value, str) and value.startswith(('=', '+', '-', '@', '\t', '\r')):
+        return "'" + value
+    return value
+
+
+def _stream(header, rows, chunk_size=64 * 1024):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    buffer.write(BOM)
+    writer.writerow([_cell(value) for value in header])
+    # The header goes out at once so the download starts before any row is read
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for row in rows:
+        writer.writerow([_cell(value) for value in row])
+        if buffer.tell() >= chunk_size:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
+
+
+def module_gradebook(quizzes, results):
+    # quizzes: (quiz_id, title) in column order. results: (student_id,
+    # username, quiz_id, score, submitted_at) ordered by student, then by
+    # result id within each quiz; quiz_id is None for a student with no
+    # results. A quiz's score is that of the first attempt, as on the
+    # leaderboard.
+    positions = {quiz_id: position * len(QUIZ_COLUMNS) for position, (quiz_id, _) in enumerate(quizzes)}
+    header = ['student_id', 'username', 'total_score']
+    for _, title in quizzes:
+        header.extend(f'{title} {column}' + (' (UTC)' if 'submitted' in column else '') for column in QUIZ_COLUMNS)
+
+    def rows():
+        for (student_id, username), student_results in groupby(results, key=lambda result: result[:2]):
+            cells = [None, 0, None, None] * len(quizzes)
+            total = 0
+            for _, _, quiz_id, score, submitted_at in student_results:
+                offset = positions.get(quiz_id)
+                if offset is None:
+                    continue
+                if cells[offset + 1] == 0:
+                    cells[offset] = score
+                    cells[offset + 2] = submitted_at
+                    total += score
+                cells[offset + 1] += 1
+                cells[offset + 3] = submitted_at
+            yield [student_id, username, total] + cells
+
+    return _stream(header, rows())
+
+
+def quiz_attempts(results):
+    # results: (student_id, username, score, started_at, submitted_at,
+    # status) ordered by student, then in submission order; one row per
+    # result, numbered per student
+    header = ['student_id', 'username', 'attempt', 'score', 'started (UTC)', 'submitted (UTC)', 'status']
+
+    def rows():
+        for _, student_results in groupby(results, key=lambda result: result[0]):
+            for attempt, (student_id, username, score, started_at, submitted_at, status) in enumerate(
+                    student_results, start=1):
+                yield [student_id, username, attempt, score, started_at, submitted_at, status]
+
+    return _stream(header, rows())
@@ -0,0 +1,32 @@
+from collections import namedtuple
+
+import numpy as np
+
+# Marker for a question that was left unanswered
+UNANSWERED = -1
+# Marker for a question an attempt was never shown (drawn out of its pool);
+# graded like an unanswered one, but left out of item statistics
+NOT_PRESENTED = -2
+
+# correct is a (submissions x questions) boolean matrix, scores the row totals
+GradedBatch = namedtuple('GradedBatch', ['correct', 'scores'])
+
+
+def responses_array(responses, question_count):
+    # Rows of choice indices; short rows (stored before questions were added)
+    # are padded with UNANSWERED and long ones truncated
+    rows = np.full((len(responses), question_count), UNANSWERED, dtype=np.int8)
+    for row, response in zip(rows, responses):
+        response = response[:question_count]
+        row[:len(response)] = response
+    return rows
+
+
+def grade_batch(answer_key, responses):
+    key = np.asarray(answer_key, dtype=np.int8)
+    responses = np.asarray(responses, dtype=np.int8).reshape(-1, key.size)
+    # A key of -1 means the stored correct answer matches no choice, so
+    # nothing (including an unanswered question) can be marked correct
+    correct = (responses == key) & (key != UNANSWERED)
+    return GradedBatch(correct, correct.sum(axis=1, dtype=np.int32))
+
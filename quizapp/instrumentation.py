@@ -0,0 +1,164 @@
+import logging
+import random
+import threading
+import time
+from collections import Counter
+
+from flask import Response, g, has_request_context, request
+from sqlalchemy import event
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the request duration histogram, in seconds
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def log_event(log, name, rate=1.0, **fields):
+    # One logfmt line per event, e.g. "quiz_created quiz_id=3 module_id=1";
+    # rate < 1 keeps only that fraction of events
+    if rate < 1.0 and random.random() >= rate:
+        return
+    log.info(' '.join([name] + [f'{key}={value!r}' if isinstance(value, str) else f'{key}={value}'
+                                for key, value in fields.items()]))
+
+
+# SQL and timing figures for the request being handled, kept on flask.g
+class RequestProfile:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.statements = []  # (statement, seconds)
+        self.sql_time = 0.0
+        self.rows = 0
+
+
+class _EndpointTotals:
+    def __init__(self):
+        self.requests = 0
+        self.duration = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+        self.statements = 0
+        self.sql_time = 0.0
+        self.rows = 0
+
+
+# Per-endpoint totals since the process started, rendered in the Prometheus
+# text exposition format. Each worker process keeps its own.
+class EndpointMetrics:
+    def __init__(self):
+        self._totals = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint, duration, profile):
+        with self._lock:
+            totals = self._totals.get(endpoint)
+            if totals is None:
+                totals = self._totals[endpoint] = _EndpointTotals()
+            totals.requests += 1
+            totals.duration += duration
+            for index, bound in enumerate(DURATION_BUCKETS):
+                if duration <= bound:
+                    totals.buckets[index] += 1
+            totals.statements += len(profile.statements)
+            totals.sql_time += profile.sql_time
+            totals.rows += profile.rows
+
+    def render(self, prefix='quizapp'):
+        with self._lock:
+            totals = sorted(self._totals.items())
+            lines = [
+                f'# HELP {prefix}_requests_total Requests handled.',
+                f'# TYPE {prefix}_requests_total counter',
+            ]
+            lines += [f'{prefix}_requests_total{{endpoint="{endpoint}"}} {t.requests}' for endpoint, t in totals]
+            lines += [
+                f'# HELP {prefix}_request_duration_seconds Wall time per request.',
+                f'# TYPE {prefix}_request_duration_seconds histogram',
+            ]
+            for endpoint, t in totals:
+                for bound, count in zip(DURATION_BUCKETS, t.buckets):
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {count}')
+                lines.append(f'{prefix}_request_duration_seconds_bucket{{endpoint="{endpoint}",le="+Inf"}} {t.requests}')
+                lines.append(f'{prefix}_request_duration_seconds_sum{{endpoint="{endpoint}"}} {t.duration:.6f}')
+                lines.append(f'{prefix}_request_duration_seconds_count{{endpoint="{endpoint}"}} {t.requests}')
+            for name, help_text, attribute, fmt in (
+                ('sql_statements_total', 'SQL statements executed.', 'statements', '{}'),
+                ('sql_duration_seconds_total', 'Time spent executing SQL.', 'sql_time', '{:.6f}'),
+                ('orm_rows_loaded_total', 'ORM objects loaded from result rows.', 'rows', '{}'),
+            ):
+                lines += [f'# HELP {prefix}_{name} {help_text}', f'# TYPE {prefix}_{name} counter']
+                lines += [f'{prefix}_{name}{{endpoint="{endpoint}"}} ' + fmt.format(getattr(t, attribute))
+                          for endpoint, t in totals]
+        return '\n'.join(lines) + '\n'
+
+
+def _current_profile():
+    return g.get('profile') if has_request_context() else None
+
+
+# The start time rides on the statement's execution context, which is
+# discarded with it when the statement fails; a stack kept on the connection
+# would keep the failed statement's entry and mistime every later one
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._query_started = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = getattr(context, '_query_started', None)
+    profile = _current_profile()
+    if profile is not None and started is not None:
+        elapsed = time.perf_counter() - started
+        profile.statements.append((statement, elapsed))
+        profile.sql_time += elapsed
+
+
+def _instance_loaded(target, context):
+    profile = _current_profile()
+    if profile is not None:
+        profile.rows += 1
+
+
+def init_instrumentation(app, db, metrics):
+    # Opt-in: records wall time, SQL statements, SQL time and ORM rows per
+    # endpoint, serves them at METRICS_PATH, and logs slow requests and
+    # statements repeated within one request (the usual sign of an N+1)
+    slow_seconds = app.config['SLOW_REQUEST_SECONDS']
+    repeat_threshold = app.config['REPEATED_QUERY_THRESHOLD']
+
+    with app.app_context():
+        for engine in db.engines.values():
+            event.listen(engine, 'before_cursor_execute', _before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', _after_cursor_execute)
+    event.listen(db.Model, 'load', _instance_loaded, propagate=True)
+
+    @app.before_request
+    def start_profile():
+        g.profile = RequestProfile()
+
+    @app.after_request
+    def record_profile(response):
+        profile = g.pop('profile', None)
+        if profile is None or request.endpoint == 'metrics':
+            return response
+        endpoint = request.endpoint or 'unknown'
+        duration = time.perf_counter() - profile.started
+        metrics.record(endpoint, duration, profile)
+
+        repeated = Counter(statement for statement, _ in profile.statements)
+        for statement, count in repeated.most_common():
+            if count < repeat_threshold:
+                break
+            logger.warning('repeated_query endpoint=%s count=%d statement=%r',
+                           endpoint, count, ' '.join(statement.split()))
+        if duration >= slow_seconds:
+            logger.warning('slow_request endpoint=%s method=%s path=%s duration=%.3f sql_count=%d sql_time=%.3f rows=%d',
+                           endpoint, request.method, request.path, duration, len(profile.statements),
+                           profile.sql_time, profile.rows)
+            for statement, elapsed in profile.statements:
+                logger.warning('  %.4fs %s', elapsed, ' '.join(statement.split()))
+        return response
+
+    def metrics_view():
+        return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
+    app.add_url_rule(app.config['METRICS_PATH'], 'metrics', metrics_view)
@@ -0,0 +1,149 @@
+import threading
+
+import numpy as np
+
+from .grading import NOT_PRESENTED, UNANSWERED, grade_batch
+
+# Share of attempts in the upper and lower groups of the discrimination index
+GROUP_FRACTION = 0.27
+PERCENTILES = (10, 25, 50, 75, 90)
+
+
+# Running item statistics for one version of a quiz.
+#
+# Only sufficient statistics are kept, so each new batch of results is
+# folded in with a few bincounts and nothing is ever re-read:
+#   score_counts     - attempts per total score (0..questions)
+#   correct_by_score - per total score, how many of those attempts got each
+#                      question right; gives difficulty, the upper/lower
+#                      group discrimination index and the point-biserial
+#   presented_by_score - per total score, how many of those attempts were
+#                      shown each question; the denominators of the above,
+#                      since a question pool leaves some questions out
+#   choice_counts    - per question, picks of each choice (column 0 counts
+#                      not presented, column 1 unanswered), i.e. the
+#                      distractor frequencies
+# Scores are recomputed from the answers with the current answer key, so
+# they match what a regrade would store.
+class ItemStats:
+    def __init__(self, quiz_id, version, answer_key, choice_counts):
+        self.quiz_id = quiz_id
+        self.version = version
+        self.answer_key = np.asarray(answer_key, dtype=np.int8)
+        self.question_count = len(answer_key)
+        self.choice_limits = np.asarray(choice_counts, dtype=np.int16)
+        self.width = max(choice_counts, default=0) + 2
+        self.last_result_id = None
+        self.lock = threading.Lock()
+        self.score_counts = np.zeros(self.question_count + 1, dtype=np.int64)
+        self.correct_by_score = np.zeros((self.question_count + 1, self.question_count), dtype=np.int64)
+        self.presented_by_score = np.zeros((self.question_count + 1, self.question_count), dtype=np.int64)
+        self.choice_counts = np.zeros((self.question_count, self.width), dtype=np.int64)
+
+    @property
+    def attempts(self):
+        return int(self.score_counts.sum())
+
+    def add(self, result_ids, responses):
+        if not len(result_ids):
+            return
+        questions = self.question_count
+        responses = np.asarray(responses, dtype=np.int8)
+        # Choices outside a question's range count as unanswered
+        responses = np.where(responses < self.choice_limits, responses, UNANSWERED)
+        graded = grade_batch(self.answer_key, responses)
+        scores = graded.scores
+
+        self.score_counts += np.bincount(scores, minlength=questions + 1)
+        cells = scores[:, None] * questions + np.arange(questions)
+        size = (questions + 1) * questions
+        self.correct_by_score += np.bincount(cells[graded.correct], minlength=size).reshape(questions + 1, questions)
+        presented = np.bincount(cells[responses != NOT_PRESENTED], minlength=size)
+        self.presented_by_score += presented.reshape(questions + 1, questions)
+        picks = (np.arange(questions) * self.width + (responses.astype(np.int64) - NOT_PRESENTED)).ravel()
+        self.choice_counts += np.bincount(picks, minlength=questions * self.width).reshape(questions, self.width)
+        self.last_result_id = int(result_ids[-1])
+
+    def _group_correct(self, levels):
+        # Correct answers and presentations per question among the
+        # GROUP_FRACTION of attempts taken from the given score levels in
+        # order; the boundary level contributes proportionally
+        wanted = self.attempts * GROUP_FRACTION
+        taken = 0.0
+        correct = np.zeros(self.question_count)
+        presented = np.zeros(self.question_count)
+        for level in levels:
+            count = self.score_counts[level]
+            if not count:
+                continue
+            share = min(count, wanted - taken)
+            correct += self.correct_by_score[level] * (share / count)
+            presented += self.presented_by_score[level] * (share / count)
+            taken += share
+            if taken >= wanted:
+                break
+        return correct, presented
+
+    def summary(self, questions):
+        # questions: the compiled questions, for texts and choice labels
+        attempts = self.attempts
+        levels = np.arange(self.question_count + 1)
+        zeros = np.zeros(self.question_count)
+        correct = self.correct_by_score.sum(axis=0).astype(float)
+        presented = self.presented_by_score.sum(axis=0).astype(float)
+        difficulty = np.divide(correct, presented, out=zeros.copy(), where=presented > 0)
+
+        upper, upper_presented = self._group_correct(levels[::-1])
+        lower, lower_presented = self._group_correct(levels)
+        both = (upper_presented > 0) & (lower_presented > 0)
+        discrimination = (np.divide(upper, upper_presented, out=zeros.copy(), where=both)
+                          - np.divide(lower, lower_presented, out=zeros.copy(), where=both))
+
+        # Point-biserial correlation of each question with the total score,
+        # over the attempts the question was presented in
+        total = float((levels * self.score_counts).sum())
+        total_squares = float((levels ** 2 * self.score_counts).sum())
+        presented_total = (levels[:, None] * self.presented_by_score).sum(axis=0).astype(float)
+        presented_squares = (levels[:, None] ** 2 * self.presented_by_score).sum(axis=0).astype(float)
+        cross = (levels[:, None] * self.correct_by_score).sum(axis=0).astype(float)
+        numerator = presented * cross - correct * presented_total
+        denominator = np.sqrt(np.maximum(presented * correct - correct ** 2, 0)
+                              * np.maximum(presented * presented_squares - presented_total ** 2, 0))
+        point_biserial = np.divide(numerator, denominator, out=zeros.copy(), where=denominator > 0)
+
+        cumulative = np.cumsum(self.score_counts)
+        below = cumulative - self.score_counts
+        percentile_ranks = (below + self.score_counts / 2) / attempts * 100 if attempts else np.zeros(levels.size)
+        mean = total / attempts if attempts else 0.0
+
+        items = []
+        for index, question in enumerate(questions):
+            picks = self.choice_counts[index]
+            shown = int(presented[index])
+            items.append({
+                'id': question.id,
+                'question': question.text,
+                'presented': shown,
+                'difficulty': round(float(difficulty[index]), 4),
+                'discrimination': round(float(discrimination[index]), 4),
+                'point_biserial': round(float(point_biserial[index]), 4),
+                'unanswered': int(picks[1]),
+                'choices': [
+                    {'choice': choice, 'count': int(picks[position + 2]), 'correct': position == question.correct_index,
+                     'fraction': round(float(picks[position + 2]) / shown, 4) if shown else 0.0}
+                    for position, choice in enumerate(question.choices)
+                ],
+            })
+        return {
+            'quiz_id': self.quiz_id,
+            'version': self.version,
+            'attempts': attempts,
+            'mean_score': round(mean, 4),
+            'std_score': round(float(np.sqrt(max(total_squares / attempts - mean ** 2, 0))), 4) if attempts else 0.0,
+            'score_histogram': [int(count) for count in self.score_counts],
+            'percentile_ranks': [round(float(rank), 2) for rank in percentile_ranks],
+            'percentiles': {
+                f'p{q}': int(np.searchsorted(cumulative, attempts * q / 100)) if attempts else None for q in PERCENTILES
+            },
+            'questions': items,
+        }
@@ -0,0 +1,231 @@
+import json
+import queue
+import random
+import threading
+import time
+from collections import namedtuple
+
+# One row of a module leaderboard
+Standing = namedtuple('Standing', ['student_id', 'username', 'total_score', 'quizzes_completed'])
+
+MAX_LEVEL = 32
+
+
+class _Node:
+    __slots__ = ('key', 'next', 'width')
+
+    def __init__(self, key, level):
+        self.key = key
+        self.next = [None] * level
+        self.width = [1] * level
+
+
+# Sorted keys with O(log n) expected insert, remove, rank and select: a
+# skip list whose links record how many keys they jump over.
+class RankedList:
+    def __init__(self):
+        self._head = _Node(None, MAX_LEVEL)
+        self._level = 1
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def _path(self, key):
+        # Last node before key on each level, and the rank of that node
+        update = [self._head] * MAX_LEVEL
+        ranks = [0] * MAX_LEVEL
+        node, rank = self._head, 0
+        for level in reversed(range(self._level)):
+            while node.next[level] is not None and node.next[level].key < key:
+                rank += node.width[level]
+                node = node.next[level]
+            update[level], ranks[level] = node, rank
+        return update, ranks
+
+    def insert(self, key):
+        update, ranks = self._path(key)
+        level = 1
+        while level < MAX_LEVEL and random.random() < 0.5:
+            level += 1
+        for new_level in range(self._level, level):
+            update[new_level], ranks[new_level] = self._head, 0
+            self._head.width[new_level] = self._size + 1
+        self._level = max(self._level, level)
+
+        node = _Node(key, level)
+        position = ranks[0] + 1
+        for index in range(level):
+            before = update[index]
+            node.next[index] = before.next[index]
+            before.next[index] = node
+            # Split the jump: before -> node -> what before used to reach
+            skipped = position - ranks[index]
+            node.width[index] = before.width[index] - skipped + 1
+            before.width[index] = skipped
+        for index in range(level, self._level):
+            update[index].width[index] += 1
+        self._size += 1
+        return position - 1
+
+    def remove(self, key):
+        update, _ = self._path(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        for index in range(self._level):
+            before = update[index]
+            if before.next[index] is node:
+                before.width[index] += node.width[index] - 1
+                before.next[index] = node.next[index]
+            else:
+                before.width[index] -= 1
+        self._size -= 1
+
+    def rank(self, key):
+        # Zero-based position of key
+        update, ranks = self._path(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        return ranks[0]
+
+    def __iter__(self):
+        node = self._head.next[0]
+        while node is not None:
+            yield node.key
+            node = node.next[0]
+
+    def head(self, count):
+        keys = []
+        node = self._head.next[0]
+        while node is not None and len(keys) < count:
+            keys.append(node.key)
+            node = node.next[0]
+        return keys
+
+
+# The standings of one module, ordered by total score (then username) and
+# kept in memory so a new result moves a single entry.
+class ModuleStandings:
+    def __init__(self, standings=()):
+        self._by_student = {}
+        self._ranked = RankedList()
+        for standing in standings:
+            self.update(standing)
+
+    @staticmethod
+    def _key(standing):
+        return (-standing.total_score, standing.username, standing.student_id)
+
+    def __len__(self):
+        return len(self._ranked)
+
+    def __contains__(self, student_id):
+        return student_id in self._by_student
+
+    def update(self, standing):
+        # Returns the student's new zero-based rank
+        previous = self._by_student.get(standing.student_id)
+        if previous is not None:
+            self._ranked.remove(self._key(previous))
+        self._by_student[standing.student_id] = standing
+        return self._ranked.insert(self._key(standing))
+
+    def top(self, count=None):
+        keys = self._ranked.head(count if count is not None else len(self._ranked))
+        return [self._by_student[key[2]] for key in keys]
+
+
+class _Subscriber:
+    def __init__(self, maxsize):
+        self.events = queue.Queue(maxsize)
+        self.dropped = False
+
+
+# Live standings per module plus the SSE connections watching them. Each
+# change is serialized once and handed to every watcher's queue; a watcher
+# that falls too far behind is dropped and reconnects. A board is reloaded
+# once it is `ttl` seconds old, so results written by processes this one
+# never hears from (CLI commands, other servers) still show up.
+class LeaderboardHub:
+    def __init__(self, load, queue_size=256, ttl=None):
+        self.load = load  # module_id -> iterable of Standing
+        self.queue_size = queue_size
+        self.ttl = ttl
+        self._boards = {}  # module_id -> (ModuleStandings, monotonic load time)
+        self._subscribers = {}
+        self._lock = threading.Lock()
+
+    def board(self, module_id):
+        with self._lock:
+            entry = self._boards.get(module_id)
+        if entry is not None and (self.ttl is None or time.monotonic() - entry[1] < self.ttl):
+            return entry[0]
+        loaded = (ModuleStandings(self.load(module_id)), time.monotonic())
+        with self._lock:
+            # Another request may have reloaded it meanwhile
+            current = self._boards.get(module_id)
+            if current is entry or current is None:
+                self._boards[module_id] = current = loaded
+            return current[0]
+
+    def standings(self, module_id, count=None):
+        board = self.board(module_id)
+        with self._lock:
+            return board.top(count)
+
+    def loaded(self, module_id):
+        return module_id in self._boards
+
+    def apply(self, module_id, standings):
+        # Standings changed by newly committed results
+        with self._lock:
+            entry = self._boards.get(module_id)
+            if entry is None:
+                return
+            board = entry[0]
+            events = []
+            for standing in standings:
+                rank = board.update(standing)
+                events.append({**standing._asdict(), 'rank': rank + 1})
+        self._publish(module_id, {'type': 'update', 'standings': events})
+
+    def reset(self, *module_ids):
+        # Standings rebuilt wholesale (quiz moved, regrade, enrollment
+        # change); they are reloaded on next use and watchers start over
+        with self._lock:
+            for module_id in module_ids:
+                self._boards.pop(module_id, None)
+        for module_id in module_ids:
+            self._publish(module_id, {'type': 'reset'})
+
+    def subscribe(self, module_id):
+        subscriber = _Subscriber(self.queue_size)
+        with self._lock:
+            self._subscribers.setdefault(module_id, set()).add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, module_id, subscriber):
+        with self._lock:
+            watchers = self._subscribers.get(module_id)
+            if watchers is not None:
+                watchers.discard(subscriber)
+                if not watchers:
+                    del self._subscribers[module_id]
+
+    def watchers(self, module_id):
+        return len(self._subscribers.get(module_id, ()))
+
+    def _publish(self, module_id, event):
+        with self._lock:
+            watchers = list(self._subscribers.get(module_id, ()))
+        if not watchers:
+            return
+        message = f"event: {event['type']}\ndata: {json.dumps(event, separators=(',', ':'))}\n\n"
+        for subscriber in watchers:
+            try:
+                subscriber.events.put_nowait(message)
+            except queue.Full:
+                subscriber.dropped = True
+                self.unsubscribe(module_id, subscriber)
@@ -0,0 +1,93 @@
+from flask_login import UserMixin
+
+from .extensions import db
+
+# Define the student_module table
+student_module = db.Table('student_module',
+    db.Column('student_id', db.Integer, db.ForeignKey('user.id'), primary_key=True),
+    db.Column('module_id', db.Integer, db.ForeignKey('module.id'), primary_key=True),
+    # The primary key serves lookups by student; this one serves lookups by module
+    db.Index('ix_student_module_module_id_student_id', 'module_id', 'student_id'),
+    extend_existing=True
+)
+
+# Models
+class User(db.Model, UserMixin):
+    id = db.Column(db.Integer, primary_key=True)
+    username = db.Column(db.String(80), unique=True, nullable=False)
+    password = db.Column(db.String(200), nullable=False)
+    role = db.Column(db.String(20), nullable=False)
+    __table_args__ = (db.Index('ix_user_role_username', 'role', 'username'),)
+    modules = db.relationship('Module', secondary=student_module, backref='students')
+
+    @property
+    def module_ids(self):
+        return [module.id for module in self.modules]
+
+class Module(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(100), nullable=False, index=True)  # Also orders the dashboard by (title, id)
+    terms_conditions = db.Column(db.Text, nullable=False)
+    quizzes = db.relationship('Quiz', backref='module', lazy=True, cascade="all, delete-orphan")
+    # Ids are never reused, so nothing still keyed by a deleted module's id
+    # can attach itself to a new one
+    __table_args__ = {'sqlite_autoincrement': True}
+
+class Quiz(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    title = db.Column(db.String(100), nullable=False)
+    time_limit = db.Column(db.Integer, default=300)  # In seconds (5 minutes by default)
+    version = db.Column(db.Integer, nullable=False, default=1)  # Bumped whenever the questions change
+    pool_size = db.Column(db.Integer)  # Questions drawn per attempt; all of them when null
+    shuffle = db.Column(db.Boolean, nullable=False, default=False)  # Shuffle question and choice order per attempt
+    questions = db.relationship('Question', backref='quiz', lazy=True, cascade= "all, delete-orphan")
+    module_id = db.Column(db.Integer, db.ForeignKey('module.id'), nullable=False, index=True)
+    __table_args__ = {'sqlite_autoincrement': True}  # Results journaled for a deleted quiz never match a new one
+
+class Question(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    question_text = db.Column(db.String(255), nullable=False)
+    choices = db.Column(db.JSON, nullable=False)  # List of choice strings
+    correct_answer = db.Column(db.String(100), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False, index=True)
+
+class QuizResult(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id'))
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), index=True)  # Also yields results in id order
+    score = db.Column(db.Integer, nullable=False)
+    answers = db.Column(db.LargeBinary)  # Packed choice index per question, see answer_log
+    attempt_id = db.Column(db.Integer, db.ForeignKey('quiz_attempt.id'))
+    submission_id = db.Column(db.String(32), unique=True, index=True)  # Makes journal replays idempotent
+    submitted_at = db.Column(db.DateTime)
+    __table_args__ = (db.Index('ix_quiz_result_student_id_quiz_id', 'student_id', 'quiz_id'),)
+    student = db.relationship('User', backref='quiz_results')
+    quiz = db.relationship('Quiz', backref='results')
+
+# A student's timed sitting of a quiz, opened when the quiz page is served
+class QuizAttempt(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    quiz_id = db.Column(db.Integer, db.ForeignKey('quiz.id'), nullable=False, index=True)
+    started_at = db.Column(db.DateTime, nullable=False)
+    deadline = db.Column(db.DateTime, nullable=False)
+    finished_at = db.Column(db.DateTime)
+    status = db.Column(db.String(20), nullable=False, default='open')  # open, submitted or expired
+    draft_answers = db.Column(db.LargeBinary)  # Autosaved answers, packed like QuizResult.answers
+    saved_at = db.Column(db.DateTime)
+    # The quiz's pool_size and shuffle when the attempt started, so changing
+    # them does not change the questions of attempts already open
+    pool_size = db.Column(db.Integer)
+    shuffle = db.Column(db.Boolean, nullable=False, default=False)
+    __table_args__ = (
+        db.Index('ix_quiz_attempt_student_id_quiz_id_status', 'student_id', 'quiz_id', 'status'),
+        db.Index('ix_quiz_attempt_status_deadline', 'status', 'deadline'),
+    )
+
+# Per-module running totals, maintained on every quiz submission so the
+# leaderboard never has to aggregate quiz_result at read time.
+class ModuleScore(db.Model):
+    module_id = db.Column(db.Integer, db.ForeignKey('module.id'), primary_key=True)
+    student_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    total_score = db.Column(db.Integer, nullable=False, default=0)
+    quizzes_completed = db.Column(db.Integer, nullable=False, default=0)
@@ -0,0 +1,41 @@
+import threading
+
+from werkzeug.security import check_password_hash, generate_password_hash
+
+
+class HasherBusy(Exception):
+    pass
+
+
+# Password hashing with a cap on how many hashes run at once, so a burst of
+# logins leaves cores free for everything else. Callers wait up to `timeout`
+# seconds for a turn, then get HasherBusy. hashlib releases the GIL while
+# hashing, so up to `max_concurrent` hashes do run in parallel.
+class PasswordHasher:
+    def __init__(self, method='scrypt', max_concurrent=2, timeout=5):
+        self.method = method
+        self.timeout = timeout
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._prefix = None
+
+    def _run(self, hash_function, *args, **kwargs):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise HasherBusy()
+        try:
+            return hash_function(*args, **kwargs)
+        finally:
+            self._slots.release()
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, method=self.method)
+
+    def verify(self, stored, password):
+        return self._run(check_password_hash, stored, password)
+
+    def needs_rehash(self, stored):
+        # True when the stored hash was made with another method or other
+        # parameters; 'scrypt' alone stands for werkzeug's current defaults,
+        # so the configured ones are read off a hash made with them
+        if self._prefix is None:
+            self._prefix = self.hash('').split('$', 1)[0]
+        return stored.split('$', 1)[0] != self._prefix
@@ -0,0 +1,121 @@
+import codecs
+import csv
+import io
+import json
+
+# Question banks are exchanged as JSONL, one object per line:
+#   {"question_text": "...", "choices": ["...", "..."], "correct_answer": "..."}
+# or as CSV with question_text, correct_answer and choice_1..choice_N columns.
+
+MAX_QUESTION_LENGTH = 255
+MAX_ANSWER_LENGTH = 100
+# Stored answers pack each choice index into a signed byte (see answer_log)
+MAX_CHOICES = 128
+
+
+class QuestionBankError(ValueError):
+    def __init__(self, line, message):
+        super().__init__(f'line {line}: {message}')
+        self.line = line
+        self.message = message
+
+
+def validate_question(raw, line):
+    if not isinstance(raw, dict):
+        raise QuestionBankError(line, 'expected an object')
+    question_text = str(raw.get('question_text') or '').strip()
+    correct_answer = str(raw.get('correct_answer') or '').strip()
+    choices = raw.get('choices')
+    if not question_text:
+        raise QuestionBankError(line, 'question_text is required')
+    if len(question_text) > MAX_QUESTION_LENGTH:
+        raise QuestionBankError(line, f'question_text is longer than {MAX_QUESTION_LENGTH} characters')
+    if not isinstance(choices, list) or len(choices) < 2:
+        raise QuestionBankError(line, 'at least two choices are required')
+    if len(choices) > MAX_CHOICES:
+        raise QuestionBankError(line, f'more than {MAX_CHOICES} choices')
+    choices = [str(choice).strip() for choice in choices]
+    if not all(choices):
+        raise QuestionBankError(line, 'choices cannot be empty')
+    if len(correct_answer) > MAX_ANSWER_LENGTH:
+        raise QuestionBankError(line, f'correct_answer is longer than {MAX_ANSWER_LENGTH} characters')
+    if correct_answer not in choices:
+        raise QuestionBankError(line, 'correct_answer must be one of the choices')
+    return {'question_text': question_text, 'choices': choices, 'correct_answer': correct_answer}
+
+
+def iter_jsonl(lines):
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            raw = json.loads(line)
+        except ValueError as error:
+            yield QuestionBankError(line_number, f'invalid JSON ({error})')
+            continue
+        yield line_number, raw
+
+
+def iter_csv(lines):
+    reader = csv.DictReader(lines)
+    try:
+        choice_columns = sorted(
+            (column for column in reader.fieldnames or [] if column.startswith('choice_')),
+            key=lambda column: int(column[len('choice_'):]) if column[len('choice_'):].isdigit() else 0,
+        )
+        for row in reader:
+            yield reader.line_num, {
+                'question_text': row.get('question_text'),
+                'correct_answer': row.get('correct_answer'),
+                'choices': [row[column] for column in choice_columns if row.get(column)],
+            }
+    except csv.Error as error:
+        # DictReader.line_num stops at the last good row; the underlying
+        # reader's count includes the line that could not be parsed
+        yield QuestionBankError(reader.reader.line_num, f'invalid CSV ({error})')
+
+
+def iter_questions(stream, filename):
+    # Yields validated question dicts, or QuestionBankError for rows that
+    # failed validation, reading the byte stream incrementally. A file that
+    # is not UTF-8 or not valid CSV ends with an error at the line where
+    # reading stopped.
+    lines = codecs.iterdecode(stream, 'utf-8-sig')
+    rows = iter_csv(lines) if filename.lower().endswith('.csv') else iter_jsonl(lines)
+    line_number = 0
+    while True:
+        try:
+            row = next(rows)
+        except StopIteration:
+            return
+        except UnicodeDecodeError:
+            yield QuestionBankError(line_number + 1, 'the file is not UTF-8 text')
+            return
+        if isinstance(row, QuestionBankError):
+            line_number = row.line
+            yield row
+            continue
+        line_number, raw = row
+        try:
+            yield validate_question(raw, line_number)
+        except QuestionBankError as error:
+            yield error
+
+
+def export_jsonl(questions):
+    for question in questions:
+        yield json.dumps(question, ensure_ascii=False) + '\n'
+
+
+def export_csv(questions, choice_count):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(['question_text', 'correct_answer'] + [f'choice_{n}' for n in range(1, choice_count + 1)])
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    for question in questions:
+        writer.writerow([question['question_text'], question['correct_answer']] + list(question['choices']))
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
@@ -0,0 +1,77 @@
+from collections import OrderedDict, namedtuple
+from threading import Lock
+
+from wtforms import RadioField
+from wtforms.validators import DataRequired
+
+# Everything start_quiz needs for one version of a quiz, built once and shared
+# between requests so the questions are not reloaded and reparsed every time.
+CompiledQuestion = namedtuple('CompiledQuestion', ['id', 'text', 'choices', 'correct_index'])
+
+
+class CompiledQuiz:
+    def __init__(self, quiz_id, version, questions, form_class):
+        self.quiz_id = quiz_id
+        self.version = version
+        self.questions = questions
+        self.form_class = form_class
+        # Index of the correct choice for each question, -1 if the stored
+        # correct answer does not match any of the choices
+        self.answer_key = tuple(question.correct_index for question in questions)
+        self.question_block = None
+        self.fragments = None  # Per-question markup for shuffled variants
+
+    def __len__(self):
+        return len(self.questions)
+
+
+def parse_choices(choices):
+    return tuple(str(choice).strip() for choice in choices)
+
+
+def compile_quiz(quiz, questions, form_base):
+    compiled_questions = []
+    fields = {}
+    for index, question in enumerate(questions):
+        choices = parse_choices(question.choices)
+        correct_answer = question.correct_answer.strip()
+        correct_index = choices.index(correct_answer) if correct_answer in choices else -1
+        compiled_questions.append(CompiledQuestion(question.id, question.question_text, choices, correct_index))
+        # Choices are submitted by position so grading can work on indices
+        fields[f'question_{index}'] = RadioField(
+            question.question_text,
+            choices=[(str(position), choice) for position, choice in enumerate(choices)],
+            validators=[DataRequired()],
+        )
+    form_class = type(f'QuizForm{quiz.id}v{quiz.version}', (form_base,), fields)
+    return CompiledQuiz(quiz.id, quiz.version, tuple(compiled_questions), form_class)
+
+
+class QuizCache:
+    def __init__(self, maxsize=256):
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, quiz_id, version):
+        with self._lock:
+            compiled = self._entries.get(quiz_id)
+            if compiled is None or compiled.version != version:
+                return None
+            self._entries.move_to_end(quiz_id)
+            return compiled
+
+    def put(self, compiled):
+        with self._lock:
+            self._entries[compiled.quiz_id] = compiled
+            self._entries.move_to_end(compiled.quiz_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, quiz_id):
+        with self._lock:
+            self._entries.pop(quiz_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,87 @@
+import hashlib
+import random
+from collections import namedtuple
+
+from markupsafe import Markup, escape
+
+from .grading import NOT_PRESENTED, UNANSWERED
+
+# What one attempt is shown: the compiled question indices in the order they
+# are presented and, for each of them, the choice indices in display order.
+# Inputs keep the compiled question index in their name and the compiled
+# choice index in their value, so answers need no mapping back to the key.
+QuizVariant = namedtuple('QuizVariant', ['questions', 'choice_orders'])
+
+
+def variant_seed(secret, student_id, quiz_id, attempt_id):
+    # Keyed with the app secret so students cannot work out each other's
+    # variants; the same attempt always gets the same seed
+    key = hashlib.sha256(secret.encode() if isinstance(secret, str) else secret).digest()
+    digest = hashlib.blake2b(f'{student_id}:{quiz_id}:{attempt_id}'.encode(), key=key, digest_size=8).digest()
+    return int.from_bytes(digest, 'big')
+
+
+def build_variant(compiled, pool_size, shuffle, seed):
+    rng = random.Random(seed)
+    count = len(compiled)
+    if pool_size and pool_size < count:
+        questions = rng.sample(range(count), pool_size)
+        if not shuffle:
+            questions.sort()
+    else:
+        questions = list(range(count))
+        if shuffle:
+            rng.shuffle(questions)
+    choice_orders = []
+    for index in questions:
+        choices = len(compiled.questions[index].choices)
+        choice_orders.append(tuple(rng.sample(range(choices), choices)) if shuffle else tuple(range(choices)))
+    return QuizVariant(tuple(questions), tuple(choice_orders))
+
+
+def _fragments(compiled):
+    # Escaped markup per question, built once per compiled quiz; matches what
+    # the RadioFields of compiled.form_class render
+    if compiled.fragments is None:
+        fragments = []
+        for index, question in enumerate(compiled.questions):
+            name = f'question_{index}'
+            fragments.append((escape(question.text), tuple(
+                f'<li><input id="{name}-{position}" name="{name}" required type="radio" value="{position}"> '
+                f'<label for="{name}-{position}">{escape(choice)}</label></li>'
+                for position, choice in enumerate(question.choices)
+            )))
+        compiled.fragments = tuple(fragments)
+    return compiled.fragments
+
+
+def render_variant(compiled, variant):
+    # Joins the cached fragments in the variant's order; no template is rendered
+    fragments = _fragments(compiled)
+    parts = []
+    for number, (index, order) in enumerate(zip(variant.questions, variant.choice_orders), 1):
+        text, choices = fragments[index]
+        parts.append(f'<div class="form-group"><label for="question_{index}">{number}. {text}</label>'
+                     f'<div><ul id="question_{index}">')
+        parts.extend(choices[position] for position in order)
+        parts.append('</ul></div></div>')
+    return Markup(''.join(parts))
+
+
+def read_answers(compiled, formdata, questions=None):
+    # Chosen index per compiled question: UNANSWERED for anything missing or
+    # invalid, NOT_PRESENTED for questions outside the presented ones
+    answers = [UNANSWERED] * len(compiled)
+    for index in range(len(compiled)) if questions is None else questions:
+        try:
+            choice = int(formdata.get(f'question_{index}', ''))
+        except ValueError:
+            continue
+        if 0 <= choice < len(compiled.questions[index].choices):
+            answers[index] = choice
+    return answers if questions is None else mark_unpresented(answers, questions)
+
+
+def mark_unpresented(answers, questions):
+    presented = set(questions)
+    return [answer if index in presented else NOT_PRESENTED for index, answer in enumerate(answers)]
@@ -0,0 +1,35 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+# One token bucket per key (a client address, a username), kept in memory:
+# a key may spend `burst` tokens at once, refilled at `rate` per second. At
+# most `maxsize` keys are tracked, the least recently used dropped first; a
+# dropped key starts over with a full bucket. A rate of 0 turns the limit off.
+class TokenBuckets:
+    def __init__(self, rate, burst, maxsize=100000):
+        self.rate = rate
+        self.burst = burst
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key):
+        # Spends a token; returns 0 if there was one, otherwise the seconds
+        # until there will be
+        if self.rate <= 0:
+            return 0.0
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated) * self.rate)
+            if tokens >= 1:
+                tokens -= 1
+                wait = 0.0
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return wait
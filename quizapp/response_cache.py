@@ -0,0 +1,73 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# A rendered page, stored once and served to every request with the same key
+CachedPage = namedtuple('CachedPage', ['body', 'etag', 'last_modified'])
+
+
+# Content version per module. Cache keys include the versions of the modules
+# a page shows, so bumping one makes every page built from the old content
+# unreachable; those entries then age out of the cache.
+class ContentVersions:
+    def __init__(self):
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, module_id):
+        return self._versions.get(module_id, 0)
+
+    def bump(self, *module_ids):
+        with self._lock:
+            for module_id in module_ids:
+                self._versions[module_id] = self._versions.get(module_id, 0) + 1
+
+
+# LRU cache of rendered pages bounded by the total size of their bodies
+# rather than by entry count, so a few large pages cannot crowd out memory.
+# Bodies larger than max_entry_bytes are not cached at all.
+class ResponseCache:
+    def __init__(self, max_bytes=16 * 1024 * 1024, max_entry_bytes=256 * 1024):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            page = self._entries.get(key)
+            if page is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return page
+
+    def put(self, key, body):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        page = CachedPage(body, hashlib.sha1(body).hexdigest(), int(time.time()))
+        if len(body) > self.max_entry_bytes:
+            return page
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous.body)
+            self._entries[key] = page
+            self.size += len(body)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted.body)
+        return page
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        return {'entries': len(self._entries), 'bytes': self.size, 'hits': self.hits, 'misses': self.misses}
@@ -0,0 +1,100 @@
+import codecs
+import csv
+import json
+
+# Roster files list students by username or by numeric id. CSV files may
+# have a header naming a username and/or id (or student_id) column; without
+# one the first column is used and digits-only values are treated as ids.
+# JSON files hold a list of usernames/ids/objects, or an object with
+# "usernames" and "student_ids" lists.
+
+ID_COLUMNS = ('id', 'student_id')
+
+
+class RosterError(ValueError):
+    pass
+
+
+def _add(value, usernames, student_ids):
+    if isinstance(value, int) and not isinstance(value, bool):
+        student_ids.append(value)
+    elif isinstance(value, str) and value.strip():
+        value = value.strip()
+        if value.isdigit():
+            student_ids.append(int(value))
+        else:
+            usernames.append(value)
+    elif isinstance(value, dict):
+        if value.get('username'):
+            if not isinstance(value['username'], str):
+                raise RosterError(f'Roster username must be a string: {value!r}')
+            usernames.append(value['username'].strip())
+        elif value.get('id') is not None or value.get('student_id') is not None:
+            student_ids.append(int(value.get('id', value.get('student_id'))))
+        else:
+            raise RosterError(f'Roster entry has no username or id: {value!r}')
+    else:
+        raise RosterError(f'Unsupported roster entry: {value!r}')
+
+
+def _json_list(data, key, kinds, description):
+    # The list under `key`, checked to hold only values of the given types
+    values = data.get(key, [])
+    if not isinstance(values, list) or not all(
+            isinstance(value, kinds) and not isinstance(value, bool) for value in values):
+        raise RosterError(f'"{key}" must be a list of {description}.')
+    return values
+
+
+def parse_json_roster(data):
+    usernames, student_ids = [], []
+    try:
+        if isinstance(data, dict):
+            if 'usernames' not in data and 'student_ids' not in data:
+                raise RosterError('A JSON roster object needs a "usernames" or "student_ids" list.')
+            usernames.extend(name.strip() for name in _json_list(data, 'usernames', str, 'strings') if name.strip())
+            student_ids.extend(int(student_id) for student_id in _json_list(data, 'student_ids', (int, str), 'numeric ids'))
+        elif isinstance(data, list):
+            for value in data:
+                _add(value, usernames, student_ids)
+        else:
+            raise RosterError('A JSON roster must be a list or an object.')
+    except (TypeError, ValueError) as error:
+        if isinstance(error, RosterError):
+            raise
+        raise RosterError(f'Invalid roster entry: {error}') from error
+    return usernames, student_ids
+
+
+def parse_csv_roster(lines):
+    usernames, student_ids = [], []
+    reader = csv.reader(lines)
+    header = next(reader, None)
+    if header is None:
+        return usernames, student_ids
+    columns = [column.strip().lower() for column in header]
+    if 'username' in columns or any(column in columns for column in ID_COLUMNS):
+        username_at = columns.index('username') if 'username' in columns else None
+        id_at = next((columns.index(column) for column in ID_COLUMNS if column in columns), None)
+        for row in reader:
+            if username_at is not None and username_at < len(row) and row[username_at].strip():
+                usernames.append(row[username_at].strip())
+            elif id_at is not None and id_at < len(row) and row[id_at].strip():
+                student_ids.append(int(row[id_at]))
+    else:
+        for row in [header, *reader]:
+            if row:
+                _add(row[0], usernames, student_ids)
+    return usernames, student_ids
+
+
+def parse_roster(stream, filename):
+    # stream yields bytes, e.g. an uploaded FileStorage or a file opened 'rb'
+    try:
+        if filename.lower().endswith('.json'):
+            return parse_json_roster(json.load(codecs.getreader('utf-8-sig')(stream)))
+        return parse_csv_roster(codecs.iterdecode(stream, 'utf-8-sig'))
+    except RosterError:
+        raise
+    except ValueError as error:
+        raise RosterError(f'Could not read roster {filename}: {error}') from error
@@ -0,0 +1,766 @@
+import atexit
+import os
+import threading
+import time
+import weakref
+from datetime import datetime, timezone
+
+from flask import current_app, render_template, request, Response
+from flask_wtf import FlaskForm
+from wtforms import SubmitField
+from sqlalchemy import func, select, bindparam, event, tuple_
+from markupsafe import Markup
+
+from .answer_log import decode_answer, encode_answers, iter_answer_batches, merge_answers
+from .attempts import AttemptIndex, AutosaveBuffer, OpenAttempt, PeriodicSweeper
+from .coordination import LocalBackend, SQLiteBackend
+from .database import read_execute
+from .extensions import db
+from .gradebook import module_gradebook, quiz_attempts
+from .grading import UNANSWERED, grade_batch
+from .identity import IdentityCache
+from .instrumentation import EndpointMetrics
+from .live_leaderboard import LeaderboardHub, Standing
+from .models import student_module, User, Module, Quiz, Question, QuizResult, QuizAttempt, ModuleScore
+from .passwords import PasswordHasher
+from .question_bank import QuestionBankError, export_jsonl, export_csv
+from .quiz_cache import QuizCache, compile_quiz
+from .quiz_variants import build_variant, mark_unpresented, variant_seed
+from .rate_limit import TokenBuckets
+from .response_cache import ContentVersions, ResponseCache
+from .submissions import WriteBehindQueue
+
+# Caches, queues and background workers shared by the blueprints and CLI
+# commands, one set per application (see Services at the end of this
+# module); state() returns the current application's.
+def state():
+    return current_app.extensions['quizapp']
+
+def in_app_context(app, function):
+    # For callbacks run on background threads and at exit
+    def run(*args):
+        with app.app_context():
+            return function(*args)
+    return run
+
+# Changes that make cached state stale are applied here and published to
+# the other worker processes, which apply them as they arrive (see
+# on_coordination_message)
+def broadcast(channel, *args):
+    coordination_handlers[channel](*args)
+    state().coordination.publish(channel, args)
+
+def on_coordination_message(channel, args):
+    coordination_handlers[channel](*args)
+
+coordination_handlers = {
+    'quiz': lambda quiz_id: forget_quiz(quiz_id),
+    'identities': lambda *user_ids: state().identity_cache.invalidate(*user_ids),
+    'pages': lambda *module_ids: state().content_versions.bump(*module_ids),
+    'leaderboards': lambda *module_ids: state().leaderboard_hub.reset(*module_ids),
+    'standings': lambda module_id, standings: apply_standings(module_id, standings),
+    'attempts': lambda *attempts: forget_attempts(*attempts),
+    'submitted attempts': lambda *attempts: forget_submitted_attempts(*attempts),
+}
+
+# Logged-in user identities, so most requests load no User row at all
+def invalidate_identities(*user_ids):
+    if user_ids:
+        broadcast('identities', *user_ids)
+
+# Drop cached identities when a user's role or name changes
+@event.listens_for(User, 'after_update')
+def invalidate_user_identity(mapper, connection, user):
+    invalidate_identities(user.id)
+
+# Base form; compile_quiz subclasses it with one RadioField per question
+class QuizForm(FlaskForm):
+    submit = SubmitField('Submit Quiz')
+
+# Compiled quizzes, keyed by quiz id and checked against Quiz.version
+def get_compiled_quiz(quiz):
+    quiz_cache = state().quiz_cache
+    compiled = quiz_cache.get(quiz.id, quiz.version)
+    if compiled is None:
+        questions = Question.query.filter_by(quiz_id=quiz.id).order_by(Question.id).all()
+        compiled = compile_quiz(quiz, questions, QuizForm)
+        quiz_cache.put(compiled)
+    return compiled
+
+def render_question_block(compiled):
+    if compiled.question_block is None:
+        compiled.question_block = Markup(render_template(
+            '_quiz_questions.html', questions=compiled.questions, form=compiled.form_class(formdata=None)
+        ))
+    return compiled.question_block
+
+# The questions and choice order one attempt sees. Derived from a keyed hash
+# of its ids, so it is never stored and costs O(questions) to rebuild; None
+# when the quiz is served as written
+def quiz_variant(quiz, compiled, student_id, attempt):
+    # Drawn with the settings the attempt started with, not the quiz's current ones
+    if not attempt.shuffle and not (attempt.pool_size and attempt.pool_size < len(compiled)):
+        return None
+    seed = variant_seed(current_app.config['SECRET_KEY'], student_id, quiz.id, attempt.id)
+    return build_variant(compiled, attempt.pool_size, attempt.shuffle, seed)
+
+def invalidate_quiz(quiz_id):
+    broadcast('quiz', quiz_id)
+
+def forget_quiz(quiz_id):
+    # Item statistics go too: a deleted quiz's id is reused by the next one,
+    # which starts again at version 1
+    state().quiz_cache.invalidate(quiz_id)
+    state().item_stats_cache.invalidate(quiz_id)
+
+def bump_quiz_version(quiz):
+    quiz.version = (quiz.version or 0) + 1
+    invalidate_quiz(quiz.id)
+
+# Rendered student pages, keyed by route, viewer and module content version.
+# Teacher routes that change what students see bump the module's version.
+def invalidate_module_pages(*module_ids):
+    broadcast('pages', *module_ids)
+
+def cached_page(key, render):
+    response_cache = state().response_cache
+    page = response_cache.get(key)
+    if page is None:
+        page = response_cache.put(key, render())
+    response = Response(page.body, mimetype='text/html')
+    response.set_etag(page.etag)
+    response.last_modified = page.last_modified
+    # Browsers may keep the page but must revalidate it, getting a 304 while it is current
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+# Leaderboard summary maintenance
+def record_module_score(module_id, student_id, score):
+    # Only a student's first attempt at a quiz counts towards the module total
+    db.session.info.setdefault('changed_standings', set()).add((module_id, student_id))
+    module_score = db.session.get(ModuleScore, (module_id, student_id))
+    if module_score is None:
+        module_score = ModuleScore(module_id=module_id, student_id=student_id, total_score=0, quizzes_completed=0)
+        db.session.add(module_score)
+    module_score.total_score += score
+    module_score.quizzes_completed += 1
+
+def rebuild_module_scores(module_ids=None):
+    # Recompute module_score from quiz_result with a single grouped query
+    first_attempts = (
+        select(func.min(QuizResult.id).label('id'))
+        .group_by(QuizResult.student_id, QuizResult.quiz_id)
+        .subquery()
+    )
+    totals = (
+        select(Quiz.module_id, QuizResult.student_id, func.sum(QuizResult.score), func.count(QuizResult.id))
+        .join(Quiz, Quiz.id == QuizResult.quiz_id)
+        .join(first_attempts, first_attempts.c.id == QuizResult.id)
+        .where(QuizResult.student_id.isnot(None))
+        .group_by(Quiz.module_id, QuizResult.student_id)
+    )
+    stale = ModuleScore.query
+    if module_ids is not None:
+        totals = totals.where(Quiz.module_id.in_(module_ids))
+        stale = stale.filter(ModuleScore.module_id.in_(module_ids))
+    stale.delete(synchronize_session=False)
+    db.session.execute(ModuleScore.__table__.insert().from_select(
+        ['module_id', 'student_id', 'total_score', 'quizzes_completed'], totals
+    ))
+
+# Live leaderboards: standings are loaded per module on first use, then
+# moved one student at a time as results are committed
+def load_standings(module_id):
+    total_score = func.coalesce(ModuleScore.total_score, 0)
+    quizzes_completed = func.coalesce(ModuleScore.quizzes_completed, 0)
+    rows = read_execute(db,
+        select(User.id, User.username, total_score, quizzes_completed)
+        .join(student_module, student_module.c.student_id == User.id)
+        .outerjoin(ModuleScore, (ModuleScore.module_id == module_id) & (ModuleScore.student_id == User.id))
+        .where(student_module.c.module_id == module_id)
+    ).all()
+    return [Standing(*row) for row in rows]
+
+def reset_leaderboards(*module_ids):
+    broadcast('leaderboards', *module_ids)
+
+def apply_standings(module_id, standings):
+    state().leaderboard_hub.apply(module_id, [Standing(*standing) for standing in standings])
+
+def publish_standings():
+    # Call after a commit that may have run record_module_score. Boards
+    # loaded by other processes are unknown here, so with a shared backend
+    # every changed module is published
+    changed = db.session.info.pop('changed_standings', set())
+    watched = {module_id for module_id, _ in changed
+               if state().coordination.shared or state().leaderboard_hub.loaded(module_id)}
+    if not watched:
+        return
+    rows = db.session.execute(
+        select(ModuleScore.module_id, User.id, User.username, ModuleScore.total_score, ModuleScore.quizzes_completed)
+        .join(User, User.id == ModuleScore.student_id)
+        .join(student_module, (student_module.c.student_id == User.id) & (student_module.c.module_id == ModuleScore.module_id))
+        .where(ModuleScore.module_id.in_(watched), ModuleScore.student_id.in_({student_id for _, student_id in changed}))
+    ).all()
+    by_module = {}
+    for module_id, *standing in rows:
+        if (module_id, standing[0]) in changed:
+            by_module.setdefault(module_id, []).append(Standing(*standing))
+    for module_id, standings in by_module.items():
+        broadcast('standings', module_id, standings)
+
+# Write-behind result pipeline
+def utc_datetime(timestamp):
+    return datetime.fromtimestamp(timestamp, timezone.utc).replace(tzinfo=None)
+
+def write_results(records):
+    # A crash between commit and deleting the journal segment replays it
+    submission_ids = [record['submission_id'] for record in records]
+    written = set(db.session.scalars(
+        select(QuizResult.submission_id).where(QuizResult.submission_id.in_(submission_ids))
+    ))
+    records = [record for record in records if record['submission_id'] not in written]
+    if not records:
+        return
+
+    quiz_modules = dict(db.session.execute(
+        select(Quiz.id, Quiz.module_id).where(Quiz.id.in_({record['quiz_id'] for record in records}))
+    ).all())
+    # Results for a quiz deleted while they waited in the journal are
+    # dropped; kept, they would be inherited by the next quiz given its id
+    records = [record for record in records if record['quiz_id'] in quiz_modules]
+    if not records:
+        return
+
+    student_ids = {record['student_id'] for record in records}
+    quiz_ids = {record['quiz_id'] for record in records}
+    attempted = set(db.session.execute(
+        select(QuizResult.student_id, QuizResult.quiz_id).distinct()
+        .where(QuizResult.student_id.in_(student_ids), QuizResult.quiz_id.in_(quiz_ids))
+    ).tuples())
+    # Load the affected summary rows up front so record_module_score
+    # finds them in the identity map instead of querying one by one
+    ModuleScore.query.filter(
+        ModuleScore.module_id.in_(set(quiz_modules.values())), ModuleScore.student_id.in_(student_ids)
+    ).all()
+
+    rows = []
+    for record in records:
+        pair = (record['student_id'], record['quiz_id'])
+        if pair not in attempted:
+            attempted.add(pair)
+            record_module_score(quiz_modules[record['quiz_id']], record['student_id'], record['score'])
+        rows.append({
+            'student_id': record['student_id'],
+            'quiz_id': record['quiz_id'],
+            'attempt_id': record.get('attempt_id'),
+            'score': record['score'],
+            'answers': encode_answers(record['answers']),
+            'submission_id': record['submission_id'],
+            'submitted_at': utc_datetime(record['submitted_at']),
+        })
+    db.session.execute(QuizResult.__table__.insert(), rows)
+
+    # Close the attempts these results belong to
+    attempts = QuizAttempt.__table__
+    finished = [
+        {'finished_attempt_id': record['attempt_id'], 'finished': utc_datetime(record['submitted_at'])}
+        for record in records if record.get('attempt_id')
+    ]
+    if finished:
+        db.session.execute(
+            attempts.update()
+            .where(attempts.c.id == bindparam('finished_attempt_id'), attempts.c.status == 'open')
+            .values(status='submitted', finished_at=bindparam('finished')),
+            finished,
+        )
+
+def flush_results(records):
+    write_results(records)
+    db.session.commit()
+    publish_standings()
+
+def start_background_workers():
+    state().start()
+
+def submit_result(record):
+    if current_app.config['RESULT_WRITE_BEHIND']:
+        state().result_queue.submit(record)
+    else:
+        flush_results([record])
+
+# Server-side quiz timing
+
+def discard_attempts(*attempts):
+    # (student_id, quiz_id, attempt_id) of attempts that are no longer open
+    if attempts:
+        broadcast('attempts', *attempts)
+
+def forget_attempts(*attempts):
+    for student_id, quiz_id, attempt_id in attempts:
+        state().attempt_index.discard(student_id, quiz_id, attempt_id)
+
+def close_attempts(*attempts):
+    # (student_id, quiz_id, attempt_id, deadline) of attempts just submitted,
+    # whose rows stay open until their results are written
+    if attempts:
+        broadcast('submitted attempts', *attempts)
+
+def forget_submitted_attempts(*attempts):
+    # Remembered as closed for as long as the sweeper waits for those writes
+    delay = current_app.config['ATTEMPT_GRACE_PERIOD'] + current_app.config['ATTEMPT_SWEEP_DELAY']
+    for student_id, quiz_id, attempt_id, deadline in attempts:
+        state().attempt_index.close(student_id, quiz_id, attempt_id, deadline + delay)
+
+def utc_timestamp(value):
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+def open_attempt(student_id, quiz):
+    # Reuse the running attempt so reloading the page does not reset the timer
+    now = time.time()
+    attempt = find_open_attempt(student_id, quiz.id)
+    if attempt is not None:
+        if now <= attempt.deadline:
+            return attempt
+        # Abandoned past its deadline; finalize it before starting over
+        expire_attempts(QuizAttempt.__table__.c.id == attempt.id)
+        db.session.commit()
+        publish_standings()
+        discard_attempts((student_id, quiz.id, attempt.id))
+
+    new_attempt = QuizAttempt(
+        student_id=student_id,
+        quiz_id=quiz.id,
+        started_at=utc_datetime(now),
+        deadline=utc_datetime(now + (quiz.time_limit or 300)),
+        status='open',
+        pool_size=quiz.pool_size,
+        shuffle=quiz.shuffle,
+    )
+    db.session.add(new_attempt)
+    db.session.commit()
+    attempt = OpenAttempt(new_attempt.id, now, utc_timestamp(new_attempt.deadline), quiz.pool_size, quiz.shuffle)
+    state().attempt_index.put(student_id, quiz.id, attempt)
+    return attempt
+
+def find_open_attempt(student_id, quiz_id):
+    attempt_index = state().attempt_index
+    attempt = attempt_index.get(student_id, quiz_id)
+    if attempt is None:
+        # Started in another process or before a restart
+        row = db.session.execute(
+            select(QuizAttempt.id, QuizAttempt.started_at, QuizAttempt.deadline, QuizAttempt.pool_size,
+                   QuizAttempt.shuffle)
+            .where(QuizAttempt.student_id == student_id, QuizAttempt.quiz_id == quiz_id, QuizAttempt.status == 'open')
+            .order_by(QuizAttempt.id.desc())
+        ).first()
+        if row is not None and not attempt_index.is_closed(row.id):
+            attempt = OpenAttempt(row.id, utc_timestamp(row.started_at), utc_timestamp(row.deadline), row.pool_size,
+                                  row.shuffle)
+            attempt_index.put(student_id, quiz_id, attempt)
+    return attempt
+
+def expire_attempts(condition):
+    # Claiming with UPDATE ... RETURNING keeps other processes off these
+    # rows; each claimed attempt is graded on its autosaved answers
+    attempts = QuizAttempt.__table__
+    claimed = db.session.execute(
+        attempts.update()
+        .where(attempts.c.status == 'open', condition)
+        .values(status='expired', finished_at=attempts.c.deadline)
+        .returning(attempts.c.id, attempts.c.student_id, attempts.c.quiz_id, attempts.c.deadline,
+                   attempts.c.draft_answers, attempts.c.pool_size, attempts.c.shuffle)
+    ).all()
+    if not claimed:
+        return []
+    quizzes = {quiz.id: quiz for quiz in Quiz.query.filter(Quiz.id.in_({attempt.quiz_id for attempt in claimed}))}
+    compiled_quizzes = {quiz_id: get_compiled_quiz(quiz) for quiz_id, quiz in quizzes.items()}
+    records = []
+    for attempt in claimed:
+        compiled = compiled_quizzes.get(attempt.quiz_id)
+        if compiled is None:
+            continue
+        answers = draft_answers(attempt.id, attempt.draft_answers, len(compiled))
+        variant = quiz_variant(quizzes[attempt.quiz_id], compiled, attempt.student_id, attempt)
+        if variant is not None:
+            answers = mark_unpresented(answers, variant.questions)
+        state().autosave_buffer.discard(attempt.id)
+        records.append({
+            'submission_id': f'expired-{attempt.id}',
+            'student_id': attempt.student_id,
+            'quiz_id': attempt.quiz_id,
+            'attempt_id': attempt.id,
+            'score': int(grade_batch(compiled.answer_key, [answers]).scores[0]) if len(compiled) else 0,
+            'answers': answers,
+            'submitted_at': utc_timestamp(attempt.deadline),
+        })
+    write_results(records)
+    return claimed
+
+def sweep_expired_attempts():
+    # The delay leaves journaled submissions time to be flushed first
+    config = current_app.config
+    cutoff = utc_datetime(time.time() - config['ATTEMPT_GRACE_PERIOD'] - config['ATTEMPT_SWEEP_DELAY'])
+    swept = 0
+    # Unflushed autosaves of this process would otherwise be graded from the buffer
+    flush_autosaves()
+    attempts = QuizAttempt.__table__
+    while True:
+        batch = (
+            select(attempts.c.id)
+            .where(attempts.c.status == 'open', attempts.c.deadline < cutoff)
+            .limit(config['ATTEMPT_SWEEP_BATCH_SIZE'])
+        )
+        claimed = expire_attempts(attempts.c.id.in_(batch.scalar_subquery()))
+        db.session.commit()
+        publish_standings()
+        if not claimed:
+            break
+        discard_attempts(*((attempt.student_id, attempt.quiz_id, attempt.id) for attempt in claimed))
+        swept += len(claimed)
+    return swept
+
+# Autosave: the quiz page posts answer changes every few seconds. They are
+# merged in memory and written to quiz_attempt.draft_answers in batches.
+def draft_answers(attempt_id, blob, question_count):
+    # Stored draft with this process's unflushed changes applied on top
+    pending = state().autosave_buffer.pending(attempt_id)
+    if pending:
+        blob = merge_answers(blob, pending)
+    if not blob:
+        return [UNANSWERED] * question_count
+    return [int(choice) for choice in decode_answer(blob, question_count)]
+
+def write_autosaves(changes):
+    # changes maps attempt id -> {question index: choice index}
+    drafts = db.session.execute(
+        select(QuizAttempt.id, QuizAttempt.draft_answers)
+        .where(QuizAttempt.id.in_(list(changes)), QuizAttempt.status == 'open')
+    ).all()
+    if not drafts:
+        return
+    saved_at = utc_datetime(time.time())
+    attempts = QuizAttempt.__table__
+    db.session.execute(
+        attempts.update()
+        .where(attempts.c.id == bindparam('draft_attempt_id'), attempts.c.status == 'open')
+        .values(draft_answers=bindparam('draft'), saved_at=saved_at),
+        [{'draft_attempt_id': draft.id, 'draft': merge_answers(draft.draft_answers, changes[draft.id])}
+         for draft in drafts],
+    )
+
+def flush_autosaves():
+    autosave_buffer = state().autosave_buffer
+    while True:
+        changes = autosave_buffer.take(current_app.config['AUTOSAVE_FLUSH_BATCH_SIZE'])
+        if not changes:
+            return
+        try:
+            write_autosaves(changes)
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            autosave_buffer.restore(changes)
+            raise
+
+# Re-score every stored result of a quiz against its current answer key
+def regrade_quiz(quiz_id, batch_size=50000):
+    quiz = db.session.get(Quiz, quiz_id)
+    # The key was changed behind the cache's back, so a new version makes
+    # this and every other process compile it afresh and regrade new
+    # submissions and item statistics with it; committed with the rescore
+    bump_quiz_version(quiz)
+    compiled = get_compiled_quiz(quiz)
+    if not compiled.questions:
+        db.session.commit()
+        return 0
+
+    changed = []
+    batches = iter_answer_batches(db.session, QuizResult.__table__, quiz_id, len(compiled), batch_size)
+    for batch in batches:
+        scores = grade_batch(compiled.answer_key, batch.responses).scores
+        moved = scores != batch.scores
+        changed.extend(
+            {'result_id': result_id, 'new_score': score}
+            for result_id, score in zip(batch.result_ids[moved].tolist(), scores[moved].tolist())
+        )
+
+    # Plain executemany; the ORM bulk update path is several times slower here
+    results = QuizResult.__table__
+    rescore = results.update().where(results.c.id == bindparam('result_id')).values(score=bindparam('new_score'))
+    for start in range(0, len(changed), batch_size):
+        db.session.execute(rescore, changed[start:start + batch_size])
+    if changed:
+        rebuild_module_scores([quiz.module_id])
+    db.session.commit()
+    if changed:
+        reset_leaderboards(quiz.module_id)
+    return len(changed)
+
+# Per-question analytics, kept per quiz version and brought up to date with
+# only the results added since the previous read
+def quiz_item_analysis(quiz):
+    from .item_analysis import ItemStats
+
+    item_stats_cache = state().item_stats_cache
+    compiled = get_compiled_quiz(quiz)
+    stats = item_stats_cache.get(quiz.id, compiled.version)
+    if stats is None:
+        stats = ItemStats(quiz.id, compiled.version, compiled.answer_key,
+                          [len(question.choices) for question in compiled.questions])
+        item_stats_cache.put(stats)
+    with stats.lock:
+        batches = iter_answer_batches(db.session, QuizResult.__table__, quiz.id, len(compiled),
+                                      after_id=stats.last_result_id)
+        for batch in batches:
+            stats.add(batch.result_ids, batch.responses)
+        return stats.summary(compiled.questions)
+
+# Bulk enrollment
+def enroll_students(module_id, usernames=(), student_ids=(), chunk_size=10000):
+    usernames = list(dict.fromkeys(usernames))
+    student_ids = list(dict.fromkeys(student_ids))
+    found = {}
+    for start in range(0, max(len(usernames), len(student_ids)), chunk_size):
+        name_chunk = usernames[start:start + chunk_size]
+        id_chunk = student_ids[start:start + chunk_size]
+        found.update(db.session.execute(
+            select(User.id, User.username)
+            .where(User.role == 'student', User.username.in_(name_chunk) | User.id.in_(id_chunk))
+        ).all())
+
+    already_enrolled = set(db.session.scalars(
+        select(student_module.c.student_id).where(student_module.c.module_id == module_id)
+    ))
+    new_ids = sorted(set(found) - already_enrolled)
+    if new_ids:
+        # OR IGNORE keeps a concurrent enrollment of the same pair harmless
+        db.session.execute(
+            student_module.insert().prefix_with('OR IGNORE', dialect='sqlite'),
+            [{'student_id': student_id, 'module_id': module_id} for student_id in new_ids],
+        )
+    db.session.commit()
+    invalidate_identities(*new_ids)
+    if new_ids:
+        reset_leaderboards(module_id)
+
+    found_names = set(found.values())
+    return {
+        'enrolled': len(new_ids),
+        'already_enrolled': len(set(found) & already_enrolled),
+        'unknown_usernames': [name for name in usernames if name not in found_names],
+        'unknown_ids': [student_id for student_id in student_ids if student_id not in found],
+    }
+
+# Question bank import/export
+def import_questions(quiz, questions, chunk_size=1000, max_errors=100):
+    imported = 0
+    errors = []
+    chunk = []
+    insert_questions = Question.__table__.insert()
+    for question in questions:
+        if isinstance(question, QuestionBankError):
+            if len(errors) < max_errors:
+                errors.append(str(question))
+            continue
+        question['quiz_id'] = quiz.id
+        chunk.append(question)
+        if len(chunk) >= chunk_size:
+            db.session.execute(insert_questions, chunk)
+            imported += len(chunk)
+            chunk = []
+    if chunk:
+        db.session.execute(insert_questions, chunk)
+        imported += len(chunk)
+    if imported:
+        bump_quiz_version(quiz)
+    db.session.commit()
+    return imported, errors
+
+def iter_quiz_questions(quiz_id, batch_size=1000):
+    rows = db.session.execute(
+        select(Question.question_text, Question.choices, Question.correct_answer)
+        .where(Question.quiz_id == quiz_id)
+        .order_by(Question.id)
+        .execution_options(yield_per=batch_size)
+    )
+    for row in rows:
+        yield {'question_text': row.question_text, 'choices': row.choices, 'correct_answer': row.correct_answer}
+
+def export_questions(quiz_id, export_format):
+    if export_format == 'csv':
+        choice_count = db.session.scalar(
+            select(func.max(func.json_array_length(Question.choices))).where(Question.quiz_id == quiz_id)
+        ) or 2
+        return export_csv(iter_quiz_questions(quiz_id), choice_count)
+    return export_jsonl(iter_quiz_questions(quiz_id))
+
+# Gradebook exports. Rows are read in index order (enrolled students by id
+# with each one's results, or a quiz's results by id), so the database
+# never sorts the result set and the first rows arrive at once.
+def export_module_gradebook(module_id, batch_size=1000):
+    quizzes = db.session.execute(
+        select(Quiz.id, Quiz.title).where(Quiz.module_id == module_id).order_by(Quiz.id)
+    ).all()
+    results = read_execute(db,
+        select(student_module.c.student_id, User.username, QuizResult.quiz_id, QuizResult.score,
+               QuizResult.submitted_at)
+        .join(User, User.id == student_module.c.student_id)
+        .outerjoin(QuizResult, (QuizResult.student_id == student_module.c.student_id)
+                   & QuizResult.quiz_id.in_([quiz.id for quiz in quizzes]))
+        .where(student_module.c.module_id == module_id)
+        .order_by(student_module.c.student_id, QuizResult.quiz_id, QuizResult.id)
+        .execution_options(yield_per=batch_size)
+    )
+    return module_gradebook(quizzes, results)
+
+def export_quiz_attempts(quiz_id, batch_size=1000):
+    results = read_execute(db,
+        select(QuizResult.student_id, User.username, QuizResult.score, QuizAttempt.started_at,
+               QuizResult.submitted_at, QuizAttempt.status)
+        .join(User, User.id == QuizResult.student_id)
+        .outerjoin(QuizAttempt, QuizAttempt.id == QuizResult.attempt_id)
+        .where(QuizResult.quiz_id == quiz_id)
+        .order_by(QuizResult.student_id, QuizResult.id)
+        .execution_options(yield_per=batch_size)
+    )
+    return quiz_attempts(results)
+
+# One page of students not enrolled in a module, ordered by username. Uses
+# an anti-join so only id/username of the matching page are loaded.
+def unassigned_students_page(module_id, search='', after=None, per_page=50):
+    enrolled = (
+        select(student_module.c.student_id)
+        .where(student_module.c.module_id == module_id, student_module.c.student_id == User.id)
+        .exists()
+    )
+    query = select(User.id, User.username).where(User.role == 'student', ~enrolled)
+    if search:
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        query = query.where(User.username.like(f'{escaped}%', escape='\\'))
+    if after:
+        query = query.where(User.username > after)
+    students = db.session.execute(query.order_by(User.username).limit(per_page + 1)).all()
+    next_after = students[per_page - 1].username if len(students) > per_page else None
+    return students[:per_page], next_after
+
+# One page of modules ordered by (title, id), with the number of quizzes,
+# questions and enrolled students of each, in a single statement
+def modules_page(search='', after=None, per_page=50):
+    page = select(Module.id, Module.title)
+    if search:
+        escaped = search.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+        page = page.where(Module.title.like(f'%{escaped}%', escape='\\'))
+    if after:
+        page = page.where(tuple_(Module.title, Module.id) > tuple_(*after))
+    page = page.order_by(Module.title, Module.id).limit(per_page + 1).cte('page')
+
+    quiz_counts = (
+        select(Quiz.module_id, func.count(Quiz.id).label('quizzes'))
+        .where(Quiz.module_id.in_(select(page.c.id)))
+        .group_by(Quiz.module_id)
+        .subquery()
+    )
+    question_counts = (
+        select(Quiz.module_id, func.count(Question.id).label('questions'))
+        .join(Question, Question.quiz_id == Quiz.id)
+        .where(Quiz.module_id.in_(select(page.c.id)))
+        .group_by(Quiz.module_id)
+        .subquery()
+    )
+    student_counts = (
+        select(student_module.c.module_id, func.count().label('students'))
+        .where(student_module.c.module_id.in_(select(page.c.id)))
+        .group_by(student_module.c.module_id)
+        .subquery()
+    )
+    modules = read_execute(db,
+        select(
+            page.c.id, page.c.title,
+            func.coalesce(quiz_counts.c.quizzes, 0).label('quizzes'),
+            func.coalesce(question_counts.c.questions, 0).label('questions'),
+            func.coalesce(student_counts.c.students, 0).label('students'),
+        )
+        .outerjoin(quiz_counts, quiz_counts.c.module_id == page.c.id)
+        .outerjoin(question_counts, question_counts.c.module_id == page.c.id)
+        .outerjoin(student_counts, student_counts.c.module_id == page.c.id)
+        .order_by(page.c.title, page.c.id)
+    ).all()
+    next_after = (modules[per_page - 1].title, modules[per_page - 1].id) if len(modules) > per_page else None
+    return modules[:per_page], next_after
+
+# Everything above that is held in memory, for one application. Workers
+# start once per process, on its first request or when serve.py forks it.
+class Services:
+    def __init__(self, app):
+        config = app.config
+        self.app = app
+        self.endpoint_metrics = EndpointMetrics()
+        if config['COORDINATION_BACKEND'] == 'sqlite':
+            self.coordination = SQLiteBackend(config['COORDINATION_PATH'],
+                                              poll_interval=config['COORDINATION_POLL_INTERVAL'])
+        elif config['COORDINATION_BACKEND'] == 'local':
+            self.coordination = LocalBackend()
+        else:
+            raise ValueError(f"Unknown COORDINATION_BACKEND {config['COORDINATION_BACKEND']!r}")
+        self.identity_cache = IdentityCache(maxsize=config['IDENTITY_CACHE_SIZE'], ttl=config['IDENTITY_CACHE_TTL'])
+        # Logins: hashing is capped per process and attempts are throttled per
+        # client address and per username before any hashing is done
+        self.password_hasher = PasswordHasher(config['PASSWORD_HASH_METHOD'], config['PASSWORD_HASH_CONCURRENCY'],
+                                              config['PASSWORD_HASH_TIMEOUT'])
+        self.login_ip_buckets = TokenBuckets(config['LOGIN_IP_RATE'], config['LOGIN_IP_BURST'])
+        self.login_username_buckets = TokenBuckets(config['LOGIN_USERNAME_RATE'], config['LOGIN_USERNAME_BURST'])
+        self.quiz_cache = QuizCache(maxsize=config['QUIZ_CACHE_SIZE'])
+        self.item_stats_cache = QuizCache(maxsize=config['ITEM_STATS_CACHE_SIZE'])
+        self.response_cache = ResponseCache(config['RESPONSE_CACHE_MAX_BYTES'],
+                                            config['RESPONSE_CACHE_MAX_ENTRY_BYTES'])
+        self.content_versions = ContentVersions()
+        self.leaderboard_hub = LeaderboardHub(load_standings, queue_size=config['LEADERBOARD_QUEUE_SIZE'],
+                                              ttl=config['LEADERBOARD_TTL'])
+        self.result_queue = WriteBehindQueue(
+            config['RESULT_JOURNAL_DIR'],
+            in_app_context(app, flush_results),
+            batch_size=config['RESULT_FLUSH_BATCH_SIZE'],
+            interval=config['RESULT_FLUSH_INTERVAL'],
+        )
+        self.attempt_index = AttemptIndex()
+        self.autosave_buffer = AutosaveBuffer()
+        self.autosave_writer = PeriodicSweeper(config['AUTOSAVE_FLUSH_INTERVAL'], in_app_context(app, flush_autosaves),
+                                               name='autosave-writer')
+        self.attempt_sweeper = PeriodicSweeper(config['ATTEMPT_SWEEP_INTERVAL'],
+                                               in_app_context(app, sweep_expired_attempts))
+        self._started = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        # Also flushes journals left over from a previous run
+        if self._started == os.getpid():
+            return
+        with self._lock:
+            if self._started == os.getpid():
+                return
+            self._started = os.getpid()
+            self.coordination.listen(in_app_context(self.app, on_coordination_message))
+            if self.app.config['RESULT_WRITE_BEHIND']:
+                self.result_queue.start()
+            self.attempt_sweeper.start()
+            self.autosave_writer.start()
+
+    def close(self):
+        self.result_queue.close()
+        in_app_context(self.app, flush_autosaves)()
+        self.coordination.close()
+
+# Closed at exit, each flushing what it still holds
+_instances = weakref.WeakSet()
+
+@atexit.register
+def close_all():
+    for instance in list(_instances):
+        instance.close()
+
+def init_app(app):
+    app.extensions['quizapp'] = Services(app)
+    _instances.add(app.extensions['quizapp'])
+    app.before_request(start_background_workers)
@@ -0,0 +1,206 @@
+import logging
+import time
+import uuid
+
+from flask import Blueprint, current_app, render_template, redirect, url_for, request, flash, jsonify, make_response
+from flask_login import login_required, current_user
+from flask_wtf.csrf import validate_csrf
+from wtforms import ValidationError
+from sqlalchemy import select
+
+from . import services
+from .database import read_execute
+from .extensions import db
+from .grading import UNANSWERED, grade_batch
+from .instrumentation import log_event
+from .models import Module, Quiz, QuizAttempt
+from .quiz_variants import read_answers, render_variant
+
+bp = Blueprint('student', __name__)
+logger = logging.getLogger('quizapp')
+
+# Student Dashboard Route
+@bp.route('/student_dashboard')
+@login_required
+def student_dashboard_view():
+    if current_user.role != 'student':
+        return redirect(url_for('teacher.teacher_dashboard'))
+
+    def render():
+        # Fetch the modules assigned to the student
+        assigned_modules = read_execute(db, select(Module).where(Module.id.in_(module_ids))).scalars().all()
+        return render_template('student_dashboard.html', modules=assigned_modules)
+
+    module_ids = tuple(current_user.module_ids)
+    versions = tuple(services.state().content_versions.get(module_id) for module_id in module_ids)
+    return services.cached_page(('student_dashboard', current_user.id, current_user.username, module_ids, versions), render)
+
+# View Module
+@bp.route('/student/module/<int:module_id>', methods=['GET', 'POST'])
+@login_required
+def view_module(module_id):
+    if current_user.role != 'student':
+        return redirect(url_for('teacher.teacher_dashboard'))
+
+    if request.method == 'POST':
+        quiz = Quiz.query.filter_by(module_id=module_id).order_by(Quiz.id).first()
+        if quiz:
+            return redirect(url_for('student.start_quiz', quiz_id=quiz.id))
+        else:
+            flash("No quizzes found for this module.", "error")
+            return redirect(url_for('student.student_dashboard_view'))
+
+    # Logged before the cache lookup so cached views count too; the module's
+    # quizzes are left out, as listing them would cost a query per view
+    log_event(logger, 'module_viewed', rate=current_app.config['LOG_SAMPLE_RATE'],
+              module_id=module_id, student_id=current_user.id)
+
+    def render():
+        module = Module.query.get(module_id)
+
+        quizzes = module.quizzes
+        if not quizzes or len(quizzes) == 0:
+            flash("No quiz is available for this module yet. Please check back later.", "info")
+            return render_template('student_module_view.html', module=module, quizzes=[])
+
+        return render_template('student_module_view.html', module=module, quizzes=quizzes)
+
+    return services.cached_page(('view_module', module_id, services.state().content_versions.get(module_id)), render)
+
+#start quiz route
+@bp.route('/student/quiz/<int:quiz_id>', methods=['GET', 'POST'])
+@login_required
+def start_quiz(quiz_id):
+
+    quiz = Quiz.query.get_or_404(quiz_id)
+    compiled = services.get_compiled_quiz(quiz)
+
+    if not compiled.questions:
+        flash("No questions available for this quiz.", "error")
+        return redirect(url_for('student.student_dashboard_view'))
+
+    # The module page's Start Quiz button also POSTs here; only the quiz
+    # form carries the attempt it was served for
+    answering = request.method == 'POST' and 'attempt_id' in request.form
+    if answering:
+        # The deadline is checked here, not trusted to the page's timer
+        attempt = services.find_open_attempt(current_user.id, quiz.id)
+        if (attempt is None or request.form['attempt_id'] != str(attempt.id)
+                or time.time() > attempt.deadline + current_app.config['ATTEMPT_GRACE_PERIOD']):
+            flash("Time is up for this quiz; your answers were not accepted.", "error")
+            return redirect(url_for('student.student_dashboard_view'))
+    else:
+        attempt = services.open_attempt(current_user.id, quiz)
+
+    variant = services.quiz_variant(quiz, compiled, current_user.id, attempt)
+    presented = range(len(compiled)) if variant is None else variant.questions
+    # A variant is validated by hand: its form checks only the CSRF token
+    form = compiled.form_class() if variant is None else services.QuizForm()
+    if answering:
+        choice_indices = read_answers(compiled, request.form, presented)
+
+    submitted = answering and form.validate_on_submit()
+    if submitted and variant is not None:
+        submitted = all(choice_indices[index] != UNANSWERED for index in presented)
+    if not submitted and answering and time.time() >= attempt.deadline:
+        # The timer ran out: grade whatever was answered, provided only the
+        # question fields failed validation
+        submitted = not any(not name.startswith('question_') for name in form.errors)
+
+    if submitted:
+        # Questions outside the variant are NOT_PRESENTED, so the full answer
+        # key grades it and the stored answers line up with every other result
+        graded = grade_batch(compiled.answer_key, [choice_indices])
+        score = int(graded.scores[0])
+        user_answers = []
+
+        for index in presented:
+            question, choice_index = compiled.questions[index], choice_indices[index]
+            user_answers.append({
+                'question': question.text,
+                'user_answer': question.choices[choice_index] if choice_index != UNANSWERED else None,
+                'correct_answer': question.choices[question.correct_index] if question.correct_index >= 0 else None,
+                'is_correct': bool(graded.correct[0][index])
+            })
+
+        # The result is committed by the background writer; the page does not wait for it
+        services.submit_result({
+            'submission_id': uuid.uuid4().hex,
+            'student_id': current_user.id,
+            'quiz_id': quiz.id,
+            'attempt_id': attempt.id,
+            'score': score,
+            'answers': choice_indices,
+            'submitted_at': time.time(),
+        })
+        services.close_attempts((current_user.id, quiz.id, attempt.id, attempt.deadline))
+        services.state().autosave_buffer.discard(attempt.id)
+
+        return render_template('student_result.html', score=score, total=len(presented), user_answers=user_answers)
+
+    if variant is not None:
+        question_block = render_variant(compiled, variant)
+    else:
+        # A partial submission re-renders the live form so the chosen answers are kept
+        has_answers = any(key.startswith('question_') for key in request.form)
+        question_block = None if has_answers else services.render_question_block(compiled)
+    time_left = max(0, int(attempt.deadline - time.time()))
+    saved_answers = services.draft_answers(
+        attempt.id, db.session.scalar(select(QuizAttempt.draft_answers).where(QuizAttempt.id == attempt.id)),
+        len(compiled),
+    )
+    if answering:
+        # Answers just posted win over the saved draft
+        saved_answers = [posted if posted != UNANSWERED else saved for posted, saved in zip(choice_indices, saved_answers)]
+    # The page embeds the attempt's deadline and CSRF token, so it is never
+    # cached whole; the question markup inside it comes from the quiz cache
+    response = make_response(render_template(
+        'start_quiz.html', quiz=quiz, time_limit=quiz.time_limit, time_left=time_left, form=form,
+        attempt_id=attempt.id, questions=compiled.questions, question_block=question_block,
+        saved_answers=saved_answers, autosave_interval=current_app.config['AUTOSAVE_INTERVAL'],
+    ))
+    response.cache_control.no_store = True
+    return response
+
+# Autosave in-progress answers (JSON)
+@bp.route('/student/quiz/<int:quiz_id>/autosave', methods=['POST'])
+@login_required
+def autosave_quiz(quiz_id):
+    if current_user.role != 'student':
+        return jsonify(error='Access denied.'), 403
+    if current_app.config['WTF_CSRF_ENABLED']:
+        try:
+            validate_csrf(request.headers.get('X-CSRFToken'))
+        except ValidationError as error:
+            return jsonify(error=str(error)), 400
+
+    attempt = services.find_open_attempt(current_user.id, quiz_id)
+    if attempt is None or time.time() > attempt.deadline + current_app.config['ATTEMPT_GRACE_PERIOD']:
+        return jsonify(error='This quiz attempt is no longer open.'), 409
+
+    # Body: {"answers": {"<question index>": <choice index or null>, ...}}
+    body = request.get_json(silent=True)
+    answers = body.get('answers') if isinstance(body, dict) else None
+    if not isinstance(answers, dict):
+        return jsonify(error='Expected an "answers" object.'), 400
+    quiz = db.session.get(Quiz, quiz_id)
+    compiled = services.get_compiled_quiz(quiz)
+    variant = services.quiz_variant(quiz, compiled, current_user.id, attempt)
+    # Only questions this attempt was shown can be answered
+    presented = range(len(compiled)) if variant is None else frozenset(variant.questions)
+    changes = {}
+    for index, choice in answers.items():
+        try:
+            index = int(index)
+        except ValueError:
+            return jsonify(error=f'Invalid answer {index!r}: {choice!r}'), 400
+        if choice is None:
+            choice = UNANSWERED
+        # Whole JSON numbers only: 1.7 is not rounded down, nor true taken for 1
+        if (type(choice) is not int or index not in presented
+                or not UNANSWERED <= choice < len(compiled.questions[index].choices)):
+            return jsonify(error=f'Invalid answer {index!r}: {choice!r}'), 400
+        changes[index] = choice
+
+    services.state().autosave_buffer.update(attempt.id, changes)
+    return jsonify(saved=len(changes), time_left=max(0, int(attempt.deadline - time.time())))
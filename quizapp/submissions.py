@@ -0,0 +1,143 @@
+import glob
+import json
+import logging
+import os
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def _process_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+# Durable write-behind queue for graded quiz results.
+#
+# submit() appends the record to a per-process journal file and fsyncs it, so
+# a submission survives a crash as soon as submit() returns. A daemon worker
+# rotates the journal into a segment every `interval` seconds (or once
+# `batch_size` records are waiting) and hands each segment to `flush`, which
+# is expected to commit it in a single transaction. Segments are only deleted
+# after `flush` returns, so `flush` must tolerate replays.
+class WriteBehindQueue:
+    def __init__(self, directory, flush, batch_size=500, interval=0.5, fsync=True):
+        self.directory = directory
+        self.flush = flush
+        self.batch_size = batch_size
+        self.interval = interval
+        self.fsync = fsync
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._pid = None
+
+    def _reset(self):
+        # Called on first use and again in a forked child, which must not
+        # share the parent's journal file or worker thread
+        os.makedirs(self.directory, exist_ok=True)
+        self._pid = os.getpid()
+        self._journal_path = os.path.join(self.directory, f'results-{self._pid}.journal')
+        self._journal = open(self._journal_path, 'a', encoding='utf-8')
+        self._waiting = 0
+        self._sequence = 0
+        self._worker = threading.Thread(target=self._run, name='result-writer', daemon=True)
+        self._worker.start()
+
+    def _ensure_started(self):
+        if self._pid != os.getpid():
+            self._reset()
+
+    def start(self):
+        with self._lock:
+            self._ensure_started()
+
+    def close(self):
+        # Flush what this process journaled; used on interpreter exit
+        if self._pid == os.getpid():
+            self.drain()
+
+    def submit(self, record):
+        with self._lock:
+            self._ensure_started()
+            self._journal.write(json.dumps(record, separators=(',', ':')) + '\n')
+            self._journal.flush()
+            if self.fsync:
+                os.fsync(self._journal.fileno())
+            self._waiting += 1
+            if self._waiting >= self.batch_size:
+                self._wakeup.set()
+
+    def _rotate(self):
+        with self._lock:
+            if not self._waiting:
+                return
+            self._journal.close()
+            self._sequence += 1
+            os.replace(self._journal_path, os.path.join(
+                self.directory, f'results-{self._pid}-{self._sequence:08d}.segment'
+            ))
+            self._journal = open(self._journal_path, 'a', encoding='utf-8')
+            self._waiting = 0
+
+    def _adopt_orphans(self):
+        # Journals left behind by processes that have exited are turned into
+        # segments so their submissions are flushed here
+        for path in glob.glob(os.path.join(self.directory, 'results-*.journal')):
+            pid = int(os.path.basename(path)[len('results-'):-len('.journal')])
+            if pid != self._pid and not _process_alive(pid):
+                try:
+                    os.replace(path, f'{path[:-len(".journal")]}-orphan.segment')
+                except FileNotFoundError:
+                    pass
+        # Segments claimed by a process that died while flushing them
+        for path in glob.glob(os.path.join(self.directory, 'results-*.segment.*')):
+            segment, pid = path.rsplit('.', 1)
+            if int(pid) != self._pid and not _process_alive(int(pid)):
+                try:
+                    os.replace(path, segment)
+                except FileNotFoundError:
+                    pass
+
+    def _flush_segments(self):
+        for path in sorted(glob.glob(os.path.join(self.directory, 'results-*.segment'))):
+            # Renaming claims the segment, so concurrent workers in other
+            # processes never flush the same one twice
+            claimed = f'{path}.{self._pid}'
+            try:
+                os.replace(path, claimed)
+            except FileNotFoundError:
+                continue
+            with open(claimed, encoding='utf-8') as segment:
+                records = [json.loads(line) for line in segment if line.strip()]
+            try:
+                if records:
+                    self.flush(records)
+            except Exception:
+                os.replace(claimed, path)
+                raise
+            os.remove(claimed)
+
+    def drain(self):
+        # Synchronously flush everything journaled so far
+        self.start()
+        self._rotate()
+        self._adopt_orphans()
+        self._flush_segments()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            if self._pid != os.getpid():
+                return
+            try:
+                self.drain()
+            except Exception:
+                logger.exception('Flushing quiz results failed, retrying in %ss', self.interval)
+                time.sleep(self.interval)
@@ -0,0 +1,523 @@
+import logging
+import queue
+
+from flask import Blueprint, current_app, render_template, redirect, url_for, request, flash, jsonify, Response, stream_with_context
+from flask_login import login_required, current_user
+from sqlalchemy import select, delete
+
+from . import services
+from .extensions import db
+from .instrumentation import log_event
+from .models import student_module, User, Module, Quiz, Question, QuizResult, QuizAttempt, ModuleScore
+from .question_bank import QuestionBankError, iter_questions, validate_question
+from .roster import RosterError, parse_roster, parse_json_roster
+
+bp = Blueprint('teacher', __name__)
+logger = logging.getLogger('quizapp')
+
+# Teacher Dashboard Route
+@bp.route('/teacher_dashboard')
+@login_required
+def teacher_dashboard():
+    if current_user.role != 'teacher':
+        flash('Access denied!')
+        return redirect(url_for('auth.teacher_login'))
+
+    search = request.args.get('q', '').strip()
+    after = None
+    if request.args.get('after_id', type=int) is not None:
+        after = (request.args.get('after_title', ''), request.args.get('after_id', type=int))
+    modules, next_after = services.modules_page(search, after, current_app.config['DASHBOARD_PAGE_SIZE'])
+    return render_template('teacher_dashboard.html', modules=modules, search=search, next_after=next_after)
+
+# Create a New Module (Teacher Action)
+@bp.route('/teacher/add-module', methods=['POST'])
+@login_required
+def add_module():
+    if current_user.role != 'teacher':
+        return redirect(url_for('student.student_dashboard_view'))
+    module_title = request.form['module_title']
+    terms_conditions = request.form['terms_conditions']
+    new_module = Module(title=module_title, terms_conditions=terms_conditions)
+    db.session.add(new_module)
+    db.session.commit()
+    services.invalidate_module_pages(new_module.id)
+    flash('Module created successfully!', 'success')
+    return redirect(url_for('teacher.teacher_dashboard'))
+
+# Set Terms and Conditions for a Module
+@bp.route('/teacher/module/<int:module_id>/set-terms-conditions', methods=['POST'])
+@login_required
+def set_terms_conditions(module_id):
+    if current_user.role != 'teacher':
+        flash('Access denied!', 'error')
+        return redirect(url_for('teacher.teacher_dashboard'))
+    
+    module = Module.query.get_or_404(module_id)
+    
+    terms_conditions = request.form['terms_conditions']
+    
+    if terms_conditions:
+        module.terms_conditions = terms_conditions
+        db.session.commit()
+        services.invalidate_module_pages(module.id)
+        flash('Terms and conditions updated successfully!', 'success')
+    else:
+        flash('Please enter valid terms and conditions.', 'error')
+    
+    return redirect(url_for('teacher.manage_module', module_id=module.id))
+
+# Delete Module (Teacher)
+@bp.route('/teacher/module/<int:module_id>/delete', methods=['POST'])
+@login_required
+def delete_module(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+
+    if db.session.get(Module, module_id) is None:
+        flash('Module not found.', 'error')
+        return redirect(url_for('teacher.teacher_dashboard'))
+
+    # Set-based: one DELETE per table, children first. Results still in the
+    # write-behind journal are dropped when flushed, and module and quiz ids
+    # are never reused, so none of them can turn up under a later quiz
+    quiz_ids = list(db.session.scalars(select(Quiz.id).where(Quiz.module_id == module_id)))
+    enrolled_ids = list(db.session.scalars(
+        select(student_module.c.student_id).where(student_module.c.module_id == module_id)
+    ))
+    for statement in (
+        delete(Question).where(Question.quiz_id.in_(quiz_ids)),
+        delete(QuizResult).where(QuizResult.quiz_id.in_(quiz_ids)),
+        delete(QuizAttempt).where(QuizAttempt.quiz_id.in_(quiz_ids)),
+        delete(Quiz).where(Quiz.module_id == module_id),
+        delete(ModuleScore).where(ModuleScore.module_id == module_id),
+        student_module.delete().where(student_module.c.module_id == module_id),
+        delete(Module).where(Module.id == module_id),
+    ):
+        db.session.execute(statement, execution_options={'synchronize_session': False})
+    db.session.commit()
+    for quiz_id in quiz_ids:
+        services.invalidate_quiz(quiz_id)
+    services.invalidate_identities(*enrolled_ids)
+    services.invalidate_module_pages(module_id)
+    services.reset_leaderboards(module_id)
+
+    flash('Module and associated quizzes and questions deleted successfully!', 'success')
+    return redirect(url_for('teacher.teacher_dashboard'))
+
+# Manage Module (Teacher)
+@bp.route('/teacher/module/<int:module_id>', methods=['GET', 'POST'])
+@login_required
+def manage_module(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+
+    module = Module.query.get(module_id)
+    
+    # If no quiz exists for this module, create one
+    quiz = Quiz.query.filter_by(module_id=module_id).first()
+    if not quiz:
+        quiz = Quiz(title=f"{module.title} Quiz", module_id=module_id)
+        db.session.add(quiz)
+        db.session.commit()
+        log_event(logger, 'quiz_created', quiz_id=quiz.id, module_id=quiz.module_id, title=quiz.title)
+
+    if request.method == 'POST':
+        # Logic for updating terms, adding/removing students, and adding questions
+        if 'add_question' in request.form:
+            add_question_from_form(quiz, 'choices')
+        elif 'set_timer' in request.form:
+            time_limit = request.form['time_limit']
+            quiz = Quiz.query.filter_by(module_id=module_id).first()
+            if quiz:
+                quiz.time_limit = int(time_limit)
+                db.session.commit()
+                services.invalidate_module_pages(module_id)
+                flash(f'Timer set to {time_limit} seconds for the quiz.', 'success')
+        elif 'remove_student' in request.form:
+            student_id = request.form.get('student_id', type=int)
+            removed = db.session.execute(student_module.delete().where(
+                student_module.c.module_id == module_id, student_module.c.student_id == student_id
+            )).rowcount
+            db.session.commit()
+            if removed:
+                services.invalidate_identities(student_id)
+                services.reset_leaderboards(module_id)
+                flash(f'Student removed from module {module.title}', 'info')
+        return redirect(url_for('teacher.manage_module', module_id=module_id))
+
+    assigned_students = db.session.execute(
+        select(User.id, User.username)
+        .join(student_module, student_module.c.student_id == User.id)
+        .where(student_module.c.module_id == module_id)
+        .order_by(User.username)
+    ).all()
+    search = request.args.get('q', '').strip()
+    unassigned_students, next_after = services.unassigned_students_page(module_id, search, request.args.get('after'))
+    
+    return render_template('manage_module.html', module=module, assigned_students=assigned_students,
+                           unassigned_students=unassigned_students, search=search, next_after=next_after)
+
+# Unassigned students as JSON, for search-as-you-type on the manage page
+@bp.route('/teacher/module/<int:module_id>/unassigned-students')
+@login_required
+def unassigned_students(module_id):
+    if current_user.role != 'teacher':
+        return jsonify(error='Access denied!'), 403
+
+    students, next_after = services.unassigned_students_page(module_id, request.args.get('q', '').strip(), request.args.get('after'))
+    return jsonify(students=[{'id': student.id, 'username': student.username} for student in students], next_after=next_after)
+
+# Assign Students to a Module
+@bp.route('/teacher/module/<int:module_id>/assign-students', methods=['POST'])
+@login_required
+def assign_students(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+    
+    module = Module.query.get(module_id)
+    if not module:
+        flash('Module not found.', 'error')
+        return redirect(url_for('teacher.teacher_dashboard'))
+    
+    student_id = request.form.get('student_id', type=int)
+    summary = services.enroll_students(module.id, student_ids=[student_id] if student_id else [])
+    
+    if summary['enrolled']:
+        flash('Student assigned successfully!', 'success')
+    else:
+        flash('Student not found or already assigned.', 'error')
+    
+    return redirect(url_for('teacher.manage_module', module_id=module_id))
+
+# Bulk enrollment from a JSON body or an uploaded CSV/JSON roster
+@bp.route('/teacher/module/<int:module_id>/enroll', methods=['POST'])
+@login_required
+def enroll_roster(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+
+    module = Module.query.get_or_404(module_id)
+    roster = request.files.get('roster')
+    try:
+        if roster:
+            usernames, student_ids = parse_roster(roster.stream, roster.filename or '')
+        else:
+            usernames, student_ids = parse_json_roster(request.get_json(silent=True) or {})
+    except RosterError as error:
+        if roster:
+            flash(str(error), 'error')
+            return redirect(url_for('teacher.manage_module', module_id=module.id))
+        return jsonify(error=str(error)), 400
+
+    summary = services.enroll_students(module.id, usernames, student_ids)
+    if roster:
+        flash(f"Enrolled {summary['enrolled']} student(s), {summary['already_enrolled']} already enrolled, "
+              f"{len(summary['unknown_usernames']) + len(summary['unknown_ids'])} not found.", 'success')
+        return redirect(url_for('teacher.manage_module', module_id=module.id))
+    return jsonify(summary)
+
+# Remove Student from Module
+@bp.route('/teacher/module/<int:module_id>/student/<int:student_id>/remove', methods=['POST'])
+@login_required
+def remove_student(module_id, student_id):
+    if current_user.role != 'teacher':
+        flash('Access denied!', 'error')
+        return redirect(url_for('auth.teacher_login'))
+
+    module = Module.query.get(module_id)
+    student = User.query.get(student_id)
+    if student in module.students:
+        module.students.remove(student)
+        db.session.commit()
+        services.invalidate_identities(student.id)
+        services.reset_leaderboards(module_id)
+
+    flash(f'Student {student.username} removed from module {module.title}', 'info')
+    return redirect(url_for('teacher.manage_module', module_id=module_id))
+
+# Assign Quiz to a Module
+@bp.route('/teacher/module/<int:module_id>/assign-quiz', methods=['POST'])
+@login_required
+def assign_quiz(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+
+    quiz_id = request.form.get('quiz_id')
+    module = Module.query.get(module_id)
+    quiz = Quiz.query.get(quiz_id)
+    previous_module_id = quiz.module_id
+    module.quizzes.append(quiz)
+    db.session.flush()
+    # Moving a quiz changes which module its results count towards
+    services.rebuild_module_scores([previous_module_id, module.id])
+    db.session.commit()
+    services.invalidate_module_pages(previous_module_id, module.id)
+    services.reset_leaderboards(previous_module_id, module.id)
+    flash(f"Quiz '{quiz.title}' assigned to module '{module.title}'", 'success')
+    return redirect(url_for('teacher.manage_module', module_id=module_id))
+
+# Add Question to a Quiz
+@bp.route('/teacher/module/<int:module_id>/add-question', methods=['POST'])
+@login_required
+def add_question(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+    
+    quiz = Quiz.query.filter_by(module_id=module_id).first()
+    if not quiz:
+        flash('Quiz not found for this module.', 'error')
+        return redirect(url_for('teacher.manage_module', module_id=module_id))
+
+    add_question_from_form(quiz, 'choices[]')
+    return redirect(url_for('teacher.manage_module', module_id=module_id))
+
+# Both question forms are held to the rules a question bank import follows
+def add_question_from_form(quiz, choices_field):
+    try:
+        question = validate_question({
+            'question_text': request.form.get('question_text'),
+            'choices': request.form.getlist(choices_field),
+            'correct_answer': request.form.get('correct_answer'),
+        }, line=1)
+    except QuestionBankError as error:
+        flash(error.message, 'error')
+        return
+    db.session.add(Question(quiz_id=quiz.id, **question))
+    services.bump_quiz_version(quiz)
+    db.session.commit()
+    services.invalidate_module_pages(quiz.module_id)
+    flash('Question added successfully!', 'success')
+
+# Identity cache counters
+@bp.route('/debug_identity_cache')
+@login_required
+def debug_identity_cache():
+    if current_user.role != 'teacher':
+        return redirect(url_for('student.student_dashboard_view'))
+    return services.state().identity_cache.stats()
+
+# Response cache counters
+@bp.route('/debug_response_cache')
+@login_required
+def debug_response_cache():
+    if current_user.role != 'teacher':
+        return redirect(url_for('student.student_dashboard_view'))
+    return services.state().response_cache.stats()
+
+# Import a question bank file into the module's quiz
+@bp.route('/teacher/module/<int:module_id>/questions/import', methods=['POST'])
+@login_required
+def import_question_bank(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+
+    quiz = Quiz.query.filter_by(module_id=module_id).first()
+    bank = request.files.get('question_bank')
+    if not quiz or not bank:
+        flash('Quiz not found or no file uploaded.', 'error')
+        return redirect(url_for('teacher.manage_module', module_id=module_id))
+
+    imported, errors = services.import_questions(quiz, iter_questions(bank.stream, bank.filename or ''))
+    services.invalidate_module_pages(module_id)
+    flash(f'Imported {imported} question(s).', 'success')
+    for error in errors[:10]:
+        flash(f'Skipped {error}', 'error')
+    return redirect(url_for('teacher.manage_module', module_id=module_id))
+
+# Download the module's quiz questions as JSONL or CSV
+@bp.route('/teacher/module/<int:module_id>/questions/export')
+@login_required
+def export_question_bank(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+
+    quiz = Quiz.query.filter_by(module_id=module_id).first_or_404()
+    export_format = 'csv' if request.args.get('format') == 'csv' else 'jsonl'
+    mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+    return Response(
+        stream_with_context(services.export_questions(quiz.id, export_format)),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=quiz-{quiz.id}-questions.{export_format}'},
+    )
+
+def csv_download(chunks, filename):
+    return Response(
+        stream_with_context(chunks),
+        mimetype='text/csv',
+        headers={'Content-Disposition': f'attachment; filename={filename}'},
+    )
+
+# Download the module's gradebook: one row per enrolled student with the
+# score, attempt count and submission times of each quiz
+@bp.route('/teacher/module/<int:module_id>/gradebook.csv')
+@login_required
+def export_gradebook(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+
+    module = Module.query.get_or_404(module_id)
+    return csv_download(services.export_module_gradebook(module.id), f'module-{module.id}-gradebook.csv')
+
+# Download every attempt at one of the module's quizzes
+@bp.route('/teacher/module/<int:module_id>/quiz/<int:quiz_id>/attempts.csv')
+@login_required
+def export_quiz_attempts(module_id, quiz_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+
+    quiz = Quiz.query.filter_by(id=quiz_id, module_id=module_id).first_or_404()
+    return csv_download(services.export_quiz_attempts(quiz.id), f'quiz-{quiz.id}-attempts.csv')
+
+# Add a debug route
+@bp.route('/debug_quizzes')
+def debug_quizzes():
+    quizzes = Quiz.query.all() 
+    result = []
+    for quiz in quizzes:
+        questions = [{'question_text': q.question_text, 'choices': q.choices, 'correct_answer': q.correct_answer} for q in quiz.questions]
+        result.append({
+            'quiz_title': quiz.title,
+            'module_id': quiz.module_id,
+            'questions': questions
+        })
+    return {'quizzes': result}
+
+#timer handle
+@bp.route('/teacher/module/<int:module_id>/set-timer', methods=['POST'])
+@login_required
+def set_timer(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+
+    # Fetch the module by ID
+    module = Module.query.get(module_id)
+    if not module:
+        flash('Module not found.', 'error')
+        return redirect(url_for('teacher.teacher_dashboard'))
+
+    # Fetch the quiz related to this module (assuming only one quiz per module)
+    quiz = Quiz.query.filter_by(module_id=module.id).first()
+    if not quiz:
+        flash('No quiz found for this module.', 'error')
+        return redirect(url_for('teacher.manage_module', module_id=module.id))
+
+    # Get the time limit from the form and update the quiz's time limit
+    time_limit = request.form['time_limit']
+    try:
+        quiz.time_limit = int(time_limit) 
+        db.session.commit()
+        services.invalidate_module_pages(module.id)
+        flash(f'Timer set to {time_limit} seconds for the quiz.', 'success')
+    except ValueError:
+        flash('Invalid timer value.', 'error')
+
+    return redirect(url_for('teacher.manage_module', module_id=module.id))  # Correct redirect
+
+# Question pool and shuffling
+@bp.route('/teacher/module/<int:module_id>/set-question-pool', methods=['POST'])
+@login_required
+def set_question_pool(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('auth.teacher_login'))
+
+    quiz = Quiz.query.filter_by(module_id=module_id).first()
+    if not quiz:
+        flash('No quiz found for this module.', 'error')
+        return redirect(url_for('teacher.manage_module', module_id=module_id))
+
+    # Blank or 0 draws every question; attempts already open keep the
+    # settings they started with
+    pool_size = request.form.get('pool_size', '').strip()
+    try:
+        pool_size = int(pool_size) if pool_size else 0
+    except ValueError:
+        flash('Invalid number of questions.', 'error')
+        return redirect(url_for('teacher.manage_module', module_id=module_id))
+    if pool_size < 0:
+        flash('Invalid number of questions.', 'error')
+        return redirect(url_for('teacher.manage_module', module_id=module_id))
+
+    quiz.pool_size = pool_size or None
+    quiz.shuffle = 'shuffle' in request.form
+    db.session.commit()
+    if quiz.pool_size:
+        flash(f'Each attempt draws {quiz.pool_size} questions.', 'success')
+    else:
+        flash('Each attempt gets every question.', 'success')
+    return redirect(url_for('teacher.manage_module', module_id=module_id))
+
+# Leaderboard (Teacher)
+@bp.route('/teacher/module/<int:module_id>/leaderboard')
+@login_required
+def leaderboard(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('student.student_dashboard_view'))
+    
+    module = Module.query.get(module_id)
+    if not module:
+        flash('Module not found.', 'error')
+        return redirect(url_for('teacher.teacher_dashboard'))
+
+    # Served from the live standings; only the first view loads them
+    results = [
+        {'student': standing, 'total_score': standing.total_score, 'quizzes_completed': standing.quizzes_completed}
+        for standing in services.state().leaderboard_hub.standings(module_id)
+    ]
+    return render_template('leaderboard.html', results=results, module=module, enumerate=enumerate)
+
+# Live leaderboard updates (Server-Sent Events)
+@bp.route('/teacher/module/<int:module_id>/leaderboard/stream')
+@login_required
+def leaderboard_stream(module_id):
+    if current_user.role != 'teacher':
+        return jsonify(error='Access denied!'), 403
+    Module.query.get_or_404(module_id)
+
+    # Load the standings so committed results start flowing into them
+    hub = services.state().leaderboard_hub
+    hub.standings(module_id, 0)
+    subscriber = hub.subscribe(module_id)
+    heartbeat = current_app.config['LEADERBOARD_HEARTBEAT']
+
+    def events():
+        try:
+            yield 'retry: 3000\n\n'
+            while not subscriber.dropped:
+                try:
+                    yield subscriber.events.get(timeout=heartbeat)
+                except queue.Empty:
+                    yield ': keepalive\n\n'
+        finally:
+            hub.unsubscribe(module_id, subscriber)
+
+    response = Response(events(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+# Item analysis (Teacher)
+@bp.route('/teacher/module/<int:module_id>/analytics')
+@login_required
+def item_analysis(module_id):
+    if current_user.role != 'teacher':
+        return redirect(url_for('student.student_dashboard_view'))
+
+    module = Module.query.get_or_404(module_id)
+    quiz = Quiz.query.filter_by(module_id=module.id).first()
+    if not quiz or not services.get_compiled_quiz(quiz).questions:
+        flash('This module has no quiz questions to analyse yet.', 'info')
+        return redirect(url_for('teacher.manage_module', module_id=module.id))
+    return render_template('item_analysis.html', module=module, quiz=quiz, analysis=services.quiz_item_analysis(quiz))
+
+# Item analysis as JSON
+@bp.route('/teacher/module/<int:module_id>/analytics.json')
+@login_required
+def item_analysis_json(module_id):
+    if current_user.role != 'teacher':
+        return jsonify(error='Access denied!'), 403
+
+    quiz = Quiz.query.filter_by(module_id=module_id).first()
+    if not quiz or not services.get_compiled_quiz(quiz).questions:
+        return jsonify(error='No quiz questions for this module.'), 404
+    return jsonify(services.quiz_item_analysis(quiz))
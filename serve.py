@@ -0,0 +1,120 @@
+"""Serve the app from several pre-forked worker processes.
+
+The app is built once, then each worker is forked from it and accepts
+connections on the same listening socket, handling each on its own thread.
+Workers tell each other about cache invalidations and leaderboard updates
+through COORDINATION_BACKEND, which this entry point defaults to 'sqlite'.
+A worker that dies is replaced; SIGTERM or SIGINT stops them all, letting
+each flush its journaled results first.
+
+    python serve.py --workers 4 --bind 0.0.0.0:8000
+"""
+import argparse
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+
+logger = logging.getLogger('quizapp')
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--bind', default='127.0.0.1:8000', help='host:port to listen on')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--backlog', type=int, default=2048, help='listen queue length')
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error('--workers must be at least 1')
+    host, _, port = args.bind.rpartition(':')
+    args.host, args.port = host.strip('[]') or '127.0.0.1', int(port)
+    return args
+
+
+def run_worker(app, listener):
+    from werkzeug.serving import make_server
+
+    from quizapp.extensions import db
+
+    # Pooled database connections must not be shared with the parent
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    # Subscribe before serving: an idle worker would otherwise miss the
+    # invalidations published until its first request, then serve from
+    # caches filled before them
+    app.extensions['quizapp'].start()
+
+    def stop(signum, frame):
+        raise SystemExit(0)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, signal.default_int_handler)
+    host, port = listener.getsockname()[:2]
+    server = make_server(host, port, app, threaded=True, fd=listener.fileno())
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ.setdefault('QUIZAPP_COORDINATION_BACKEND', 'sqlite')
+
+    from quizapp import create_app
+
+    app = create_app()
+    if args.workers > 1 and app.config['COORDINATION_BACKEND'] == 'local':
+        sys.exit('Several workers need a shared COORDINATION_BACKEND, not local')
+    listener = socket.create_server((args.host, args.port), backlog=args.backlog)
+
+    workers = {}  # pid -> start time
+    stopping = False
+
+    def spawn():
+        pid = os.fork()
+        if pid == 0:
+            # sys.exit rather than os._exit, so atexit handlers flush this worker's results
+            try:
+                run_worker(app, listener)
+            except Exception:
+                logger.exception('Worker %s failed', os.getpid())
+                sys.exit(1)
+            sys.exit(0)
+        workers[pid] = time.monotonic()
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in workers:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+    for _ in range(args.workers):
+        spawn()
+    logger.info('Serving on http://%s:%s with %s worker(s)', args.host, args.port, args.workers)
+
+    while workers:
+        pid, status = os.wait()
+        started = workers.pop(pid, None)
+        if started is None or stopping:
+            continue
+        logger.warning('Worker %s exited with status %s, replacing it', pid, os.waitstatus_to_exitcode(status))
+        # Do not spin when workers die straight after starting
+        if time.monotonic() - started < 1:
+            time.sleep(1)
+        spawn()
+    listener.close()
+
+
+if __name__ == '__main__':
+    main()
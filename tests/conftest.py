@@ -0,0 +1,60 @@
+import os
+import re
+
+import pytest
+from werkzeug.security import generate_password_hash
+
+from quizapp import create_app
+from quizapp.extensions import db
+from quizapp.models import User
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    monkeypatch.setenv('QUIZAPP_SQLALCHEMY_DATABASE_URI', f"sqlite:///{os.path.join(tmp_path, 'test.db')}")
+    monkeypatch.setenv('QUIZAPP_RESULT_JOURNAL_DIR', os.path.join(tmp_path, 'result-journal'))
+    monkeypatch.setenv('QUIZAPP_COORDINATION_PATH', os.path.join(tmp_path, 'coordination.db'))
+    monkeypatch.setenv('QUIZAPP_WTF_CSRF_ENABLED', 'false')
+    # Results stay in the journal until a test drains it
+    monkeypatch.setenv('QUIZAPP_RESULT_FLUSH_INTERVAL', '3600')
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        password = generate_password_hash('password', method='pbkdf2:sha256:1000')
+        db.session.add_all([
+            User(username='teacher', password=password, role='teacher'),
+            User(username='student', password=password, role='student'),
+        ])
+        db.session.commit()
+    yield app
+    app.extensions['quizapp'].close()
+    with app.app_context():
+        db.engine.dispose()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def login(client, username):
+    client.get('/logout')
+    response = client.post(f'/{username}_login', data={'username': username, 'password': 'password'})
+    assert response.status_code < 400
+    return response
+
+
+def make_module(client, title='Algebra'):
+    # Adds a module with a two-question quiz and assigns the student to it;
+    # returns the module id
+    login(client, 'teacher')
+    client.post('/teacher/add-module', data={'module_title': title, 'terms_conditions': ''})
+    module_id = max(int(found) for found in re.findall(r'/teacher/module/(\d+)', client.get('/teacher_dashboard').text))
+    # The module's quiz is created the first time its page is opened
+    client.get(f'/teacher/module/{module_id}')
+    for text, choices, correct in (('2 + 2?', ['3', '4'], '4'), ('1 + 1?', ['2', '5'], '2')):
+        client.post(f'/teacher/module/{module_id}/add-question', data={
+            'question_text': text, 'choices[]': choices, 'correct_answer': correct,
+        })
+    client.post(f'/teacher/module/{module_id}/assign-students', data={'student_id': '2'})
+    return module_id
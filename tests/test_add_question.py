@@ -0,0 +1,50 @@
+import pytest
+from sqlalchemy import func, select
+
+from conftest import make_module
+from quizapp.extensions import db
+from quizapp.models import Question
+
+# The manage page's form and the add-question endpoint name their choices differently
+FORMS = [('', 'choices', {'add_question': '1'}), ('/add-question', 'choices[]', {})]
+
+
+def post_question(client, module_id, form, fields):
+    path, choices_field, extra = form
+    data = {name: value for name, value in fields.items() if name != 'choices'}
+    data.update(extra, **{choices_field: fields['choices']})
+    return client.post(f'/teacher/module/{module_id}{path}', data=data)
+
+
+def question_count(app):
+    with app.app_context():
+        return db.session.scalar(select(func.count()).select_from(Question))
+
+
+@pytest.mark.parametrize('form', FORMS)
+@pytest.mark.parametrize('fields, error', [
+    ({'question_text': '', 'choices': ['1', '2'], 'correct_answer': '1'}, 'question_text is required'),
+    ({'question_text': 'Pick one', 'choices': ['1'], 'correct_answer': '1'}, 'at least two choices are required'),
+    ({'question_text': 'Pick one', 'choices': [], 'correct_answer': '1'}, 'at least two choices are required'),
+    ({'question_text': 'Pick one', 'choices': ['1', ' '], 'correct_answer': '1'}, 'choices cannot be empty'),
+    ({'question_text': 'Pick one', 'choices': [str(n) for n in range(129)], 'correct_answer': '1'}, 'more than 128 choices'),
+    ({'question_text': 'Pick one', 'choices': ['1', '2'], 'correct_answer': '3'}, 'correct_answer must be one of the choices'),
+])
+def test_invalid_questions_are_rejected(app, client, form, fields, error):
+    module_id = make_module(client)
+    before = question_count(app)
+    post_question(client, module_id, form, fields)
+    with client.session_transaction() as session:
+        assert ('error', error) in session['_flashes']
+    assert question_count(app) == before
+
+
+@pytest.mark.parametrize('form', FORMS)
+def test_valid_question_is_added(app, client, form):
+    module_id = make_module(client)
+    before = question_count(app)
+    post_question(client, module_id, form, {'question_text': ' 3 + 3? ', 'choices': ['6', '7'], 'correct_answer': '6'})
+    assert question_count(app) == before + 1
+    with app.app_context():
+        question = db.session.scalars(select(Question).order_by(Question.id.desc())).first()
+        assert (question.question_text, question.choices, question.correct_answer) == ('3 + 3?', ['6', '7'], '6')
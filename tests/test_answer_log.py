@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+
+from quizapp.answer_log import (
+    FORMAT_INT8, FORMAT_NIBBLE, NIBBLE_MAX, decode_answer, decode_answers, encode_answers, merge_answers,
+)
+from quizapp.grading import NOT_PRESENTED, UNANSWERED
+
+
+@pytest.mark.parametrize('answers, format', [
+    ([], FORMAT_NIBBLE),
+    ([0, 1, UNANSWERED], FORMAT_NIBBLE),
+    ([NIBBLE_MAX, 0], FORMAT_NIBBLE),
+    ([NIBBLE_MAX + 1, 0], FORMAT_INT8),
+    ([127, UNANSWERED], FORMAT_INT8),
+    ([NOT_PRESENTED, 3], FORMAT_INT8),
+])
+def test_round_trip(answers, format):
+    blob = encode_answers(answers)
+    assert blob[0] == format
+    assert decode_answer(blob, len(answers)).tolist() == answers
+
+
+def test_nibbles_pack_two_answers_per_byte():
+    assert encode_answers([NIBBLE_MAX, UNANSWERED, 0]) == bytes([FORMAT_NIBBLE, 0x0F, 0x01])
+
+
+def test_choice_beyond_a_signed_byte_is_refused():
+    # MAX_CHOICES keeps choice indices at 127 or below; nothing may wrap
+    with pytest.raises(OverflowError):
+        encode_answers([128])
+
+
+def test_decode_pads_with_unanswered():
+    assert decode_answer(encode_answers([2]), 3).tolist() == [2, UNANSWERED, UNANSWERED]
+
+
+@pytest.mark.parametrize('rows', [
+    [[1, 2, 3], [UNANSWERED, NIBBLE_MAX, 0]],
+    [[1, 20, 3], [UNANSWERED, NIBBLE_MAX, 0]],
+    [[NOT_PRESENTED, 20, 3], [127, 0, 0]],
+])
+def test_decode_answers_matches_one_at_a_time(rows):
+    blobs = [encode_answers(row) for row in rows]
+    decoded = decode_answers(blobs, 3)
+    assert decoded.dtype == np.int8
+    assert decoded.tolist() == rows
+
+
+def test_merge_answers():
+    blob = merge_answers(None, {2: 1})
+    assert decode_answer(blob, 3).tolist() == [UNANSWERED, UNANSWERED, 1]
+    blob = merge_answers(blob, {0: 40, 2: UNANSWERED})
+    assert blob[0] == FORMAT_INT8
+    assert decode_answer(blob, 3).tolist() == [40, UNANSWERED, UNANSWERED]
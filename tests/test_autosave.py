@@ -0,0 +1,28 @@
+import pytest
+
+from conftest import login, make_module
+
+
+@pytest.fixture
+def quiz_url(client):
+    make_module(client)
+    login(client, 'student')
+    assert client.get('/student/quiz/1').status_code == 200
+    return '/student/quiz/1/autosave'
+
+
+@pytest.mark.parametrize('body', [
+    [1], 'x', 1, None, {}, {'answers': [1]},
+    {'answers': {'0': 1.7}}, {'answers': {'0': True}}, {'answers': {'0': '1'}},
+    {'answers': {'0': 2}}, {'answers': {'0': -2}}, {'answers': {'5': 0}}, {'answers': {'a': 0}},
+])
+def test_malformed_answers_are_rejected(client, quiz_url, body):
+    response = client.post(quiz_url, json=body)
+    assert response.status_code == 400
+    assert 'error' in response.json
+
+
+def test_answers_are_saved(client, quiz_url):
+    response = client.post(quiz_url, json={'answers': {'0': 1, '1': None}})
+    assert response.status_code == 200
+    assert response.json['saved'] == 2
@@ -0,0 +1,22 @@
+import pytest
+
+from quizapp import create_app
+
+
+@pytest.mark.parametrize('secret_key', [None, '', 'supersecretkey'])
+def test_production_requires_a_secret_key(monkeypatch, secret_key):
+    monkeypatch.setenv('QUIZAPP_CONFIG', 'production')
+    if secret_key is None:
+        monkeypatch.delenv('QUIZAPP_SECRET_KEY', raising=False)
+    else:
+        monkeypatch.setenv('QUIZAPP_SECRET_KEY', secret_key)
+    with pytest.raises(RuntimeError, match='QUIZAPP_SECRET_KEY'):
+        create_app()
+
+
+def test_production_uses_the_secret_key_from_the_environment(tmp_path, monkeypatch):
+    monkeypatch.setenv('QUIZAPP_CONFIG', 'production')
+    monkeypatch.setenv('QUIZAPP_SECRET_KEY', 'f3a1c9e07b5d')
+    monkeypatch.setenv('QUIZAPP_SQLALCHEMY_DATABASE_URI', f"sqlite:///{tmp_path / 'test.db'}")
+    monkeypatch.setenv('QUIZAPP_RESULT_JOURNAL_DIR', str(tmp_path / 'result-journal'))
+    assert create_app().config['SECRET_KEY'] == 'f3a1c9e07b5d'
@@ -0,0 +1,81 @@
+import csv
+import io
+from datetime import datetime
+
+from sqlalchemy import select
+
+from conftest import login, make_module
+from quizapp import services
+from quizapp.extensions import db
+from quizapp.gradebook import BOM, module_gradebook, quiz_attempts
+from quizapp.models import Quiz, User
+
+T1, T2, T3 = (datetime(2026, 1, day, 9, 30) for day in (1, 2, 3))
+
+
+def read(chunks):
+    text = ''.join(chunks)
+    assert text.startswith(BOM)
+    return list(csv.reader(io.StringIO(text[len(BOM):])))
+
+
+def test_quiz_attempts_are_numbered_per_student():
+    rows = read(quiz_attempts([
+        (1, 'ann', 2, T1, T1, 'submitted'),
+        (1, 'ann', 3, T2, T2, 'submitted'),
+        (2, 'bob', 1, None, T1, None),
+        (3, '=cmd', 0, T3, T3, 'submitted'),
+    ]))
+    assert rows == [
+        ['student_id', 'username', 'attempt', 'score', 'started (UTC)', 'submitted (UTC)', 'status'],
+        ['1', 'ann', '1', '2', '2026-01-01 09:30:00', '2026-01-01 09:30:00', 'submitted'],
+        ['1', 'ann', '2', '3', '2026-01-02 09:30:00', '2026-01-02 09:30:00', 'submitted'],
+        ['2', 'bob', '1', '1', '', '2026-01-01 09:30:00', ''],
+        ["3", "'=cmd", '1', '0', '2026-01-03 09:30:00', '2026-01-03 09:30:00', 'submitted'],
+    ]
+
+
+def test_quiz_attempts_stream_in_chunks():
+    def results():
+        for student_id in range(2000):
+            yield from [(student_id, f'student{student_id}', 1, T1, T2, 'submitted')] * 3
+    chunks = list(quiz_attempts(results()))
+    assert len(chunks) > 2
+    rows = read(chunks)
+    assert len(rows) == 6001
+    assert [row[2] for row in rows[1:4]] == ['1', '2', '3']
+
+
+def test_module_gradebook_scores_first_attempts():
+    rows = read(module_gradebook([(10, 'Quiz A'), (11, 'Quiz B')], [
+        (1, 'ann', 10, 2, T1),
+        (1, 'ann', 10, 5, T2),
+        (1, 'ann', 11, 1, T3),
+        (2, 'bob', None, None, None),
+    ]))
+    assert rows[0][:7] == ['student_id', 'username', 'total_score', 'Quiz A score', 'Quiz A attempts',
+                           'Quiz A first submitted (UTC)', 'Quiz A last submitted (UTC)']
+    assert rows[1] == ['1', 'ann', '3', '2', '2', '2026-01-01 09:30:00', '2026-01-02 09:30:00',
+                       '1', '1', '2026-01-03 09:30:00', '2026-01-03 09:30:00']
+    assert rows[2] == ['2', 'bob', '0', '', '0', '', '', '', '0', '', '']
+
+
+def test_attempts_export_groups_interleaved_submissions(app, client):
+    module_id = make_module(client)
+    with app.app_context():
+        quiz_id = db.session.scalar(select(Quiz.id).where(Quiz.module_id == module_id))
+        db.session.add(User(username='cat', password='x', role='student'))
+        db.session.flush()
+        student_ids = [2, 3, 2, 3, 2]
+        services.write_results([
+            {'submission_id': f'{n:032x}', 'student_id': student_id, 'quiz_id': quiz_id,
+             'score': n % 3, 'answers': [0, 1], 'submitted_at': 1767260000 + n}
+            for n, student_id in enumerate(student_ids)
+        ])
+        db.session.commit()
+    login(client, 'teacher')
+    rows = read(client.get(f'/teacher/module/{module_id}/quiz/{quiz_id}/attempts.csv').text)
+    assert [row[:4] for row in rows[1:]] == [
+        ['2', 'student', '1', '0'], ['2', 'student', '2', '2'], ['2', 'student', '3', '1'],
+        ['3', 'cat', '1', '1'], ['3', 'cat', '2', '0'],
+    ]
@@ -0,0 +1,33 @@
+import numpy as np
+
+from quizapp.grading import NOT_PRESENTED, UNANSWERED, grade_batch, responses_array
+
+
+def test_grade_batch_scores_each_submission():
+    graded = grade_batch([1, 0, 2], [[1, 0, 2], [1, 1, 1], [0, 0, 0]])
+    assert graded.scores.tolist() == [3, 1, 1]
+    assert graded.correct.tolist() == [[True, True, True], [True, False, False], [False, True, False]]
+
+
+def test_sentinels_are_never_correct():
+    graded = grade_batch([1, 0, 2], [[UNANSWERED, NOT_PRESENTED, 2], [NOT_PRESENTED, UNANSWERED, UNANSWERED]])
+    assert graded.scores.tolist() == [1, 0]
+    assert not graded.correct[:, :2].any()
+
+
+def test_unmatched_key_marks_nothing_correct():
+    # A key of UNANSWERED is a question whose stored answer matches no choice
+    graded = grade_batch([UNANSWERED, 0], [[UNANSWERED, 0], [0, 0]])
+    assert graded.scores.tolist() == [1, 1]
+    assert not graded.correct[:, 0].any()
+
+
+def test_grade_batch_accepts_a_single_flat_response():
+    graded = grade_batch([1, 0], [1, 0])
+    assert graded.scores.tolist() == [2]
+
+
+def test_responses_array_pads_and_truncates():
+    rows = responses_array([[1], [0, 1, 2, 3], []], 3)
+    assert rows.dtype == np.int8
+    assert rows.tolist() == [[1, UNANSWERED, UNANSWERED], [0, 1, 2], [UNANSWERED] * 3]
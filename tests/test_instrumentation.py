@@ -0,0 +1,32 @@
+import pytest
+from flask import g
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+from quizapp.extensions import db
+from quizapp.instrumentation import RequestProfile
+
+
+@pytest.fixture(autouse=True)
+def instrumentation_enabled(monkeypatch):
+    monkeypatch.setenv('QUIZAPP_INSTRUMENTATION_ENABLED', 'true')
+
+
+def test_failed_statements_do_not_leak_into_later_timings(app):
+    with app.test_request_context():
+        g.profile = RequestProfile()
+        with db.engine.connect() as connection:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    connection.execute(text('SELECT * FROM no_such_table'))
+            connection.execute(text('SELECT 1'))
+            assert not any(isinstance(value, list) for value in connection.info.values())
+        statements = [statement for statement, _ in g.profile.statements]
+        assert statements == ['SELECT 1']
+        assert 0 <= g.profile.sql_time < 1
+
+
+def test_requests_are_profiled(app, client):
+    client.get('/')
+    metrics = client.get(app.config['METRICS_PATH']).text
+    assert 'quizapp_requests_total{endpoint="auth.home"} 1' in metrics
@@ -0,0 +1,69 @@
+import json
+import random
+
+import pytest
+
+from quizapp.live_leaderboard import LeaderboardHub, ModuleStandings, RankedList, Standing
+
+
+def test_ranked_list_matches_a_sorted_list():
+    rng = random.Random(7)
+    ranked, expected = RankedList(), []
+    for _ in range(2000):
+        if expected and rng.random() < 0.4:
+            key = rng.choice(expected)
+            ranked.remove(key)
+            expected.remove(key)
+        else:
+            key = rng.random()
+            expected.append(key)
+            expected.sort()
+            assert ranked.insert(key) == expected.index(key)
+    assert len(ranked) == len(expected)
+    assert list(ranked) == expected
+    assert ranked.head(5) == expected[:5]
+    assert [ranked.rank(key) for key in expected] == list(range(len(expected)))
+
+
+def test_missing_keys_raise_key_error():
+    ranked = RankedList()
+    ranked.insert(1)
+    with pytest.raises(KeyError):
+        ranked.rank(2)
+    with pytest.raises(KeyError):
+        ranked.remove(0)
+
+
+def test_module_standings_update_moves_one_student():
+    standings = ModuleStandings([
+        Standing(1, 'ann', 5, 1), Standing(2, 'bob', 3, 1), Standing(3, 'cat', 3, 1),
+    ])
+    assert [standing.username for standing in standings.top()] == ['ann', 'bob', 'cat']
+    # Ties are broken by username
+    assert standings.update(Standing(3, 'cat', 6, 2)) == 0
+    assert standings.update(Standing(1, 'ann', 3, 2)) == 1
+    assert [standing.username for standing in standings.top()] == ['cat', 'ann', 'bob']
+    assert len(standings) == 3
+    assert standings.top(1) == [Standing(3, 'cat', 6, 2)]
+
+
+def test_hub_publishes_new_ranks():
+    hub = LeaderboardHub(lambda module_id: [Standing(1, 'ann', 5, 1), Standing(2, 'bob', 3, 1)])
+    assert [standing.student_id for standing in hub.standings(1)] == [1, 2]
+    subscriber = hub.subscribe(1)
+    hub.apply(1, [Standing(2, 'bob', 9, 2)])
+    assert [standing.student_id for standing in hub.standings(1)] == [2, 1]
+    event = json.loads(subscriber.events.get_nowait().split('data: ', 1)[1])
+    assert event == {'type': 'update', 'standings': [
+        {'student_id': 2, 'username': 'bob', 'total_score': 9, 'quizzes_completed': 2, 'rank': 1},
+    ]}
+
+
+def test_hub_drops_watchers_that_fall_behind():
+    hub = LeaderboardHub(lambda module_id: [], queue_size=1)
+    hub.board(1)
+    subscriber = hub.subscribe(1)
+    hub.apply(1, [Standing(1, 'ann', 1, 1)])
+    hub.apply(1, [Standing(1, 'ann', 2, 2)])
+    assert subscriber.dropped
+    assert hub.watchers(1) == 0
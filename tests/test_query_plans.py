@@ -0,0 +1,9 @@
+import check_query_plans
+
+
+def test_routes_do_not_scan_whole_tables(tmp_path, monkeypatch):
+    for name, value in check_query_plans.environment(str(tmp_path)).items():
+        monkeypatch.setenv(name, value)
+    statements, violations = check_query_plans.find_violations()
+    assert statements
+    assert violations == []
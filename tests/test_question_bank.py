@@ -0,0 +1,74 @@
+import io
+
+import pytest
+
+from quizapp.question_bank import MAX_CHOICES, QuestionBankError, iter_questions, validate_question
+
+
+def read(data, filename):
+    results = list(iter_questions(io.BytesIO(data), filename))
+    questions = [result for result in results if not isinstance(result, QuestionBankError)]
+    errors = [(error.line, error.message) for error in results if isinstance(error, QuestionBankError)]
+    return questions, errors
+
+
+def test_jsonl_reports_bad_lines_and_keeps_going():
+    data = b'\n'.join([
+        b'{"question_text": "2 + 2?", "choices": ["3", "4"], "correct_answer": "4"}',
+        b'',
+        b'{"question_text": "oops"',
+        b'[1, 2]',
+        b'{"question_text": "1 + 1?", "choices": ["2"], "correct_answer": "2"}',
+        b'{"question_text": " 3 + 3? ", "choices": [" 6", "7"], "correct_answer": "6"}',
+    ])
+    questions, errors = read(data, 'bank.jsonl')
+    assert questions == [
+        {'question_text': '2 + 2?', 'choices': ['3', '4'], 'correct_answer': '4'},
+        {'question_text': '3 + 3?', 'choices': ['6', '7'], 'correct_answer': '6'},
+    ]
+    assert [line for line, _ in errors] == [3, 4, 5]
+    assert errors[0][1].startswith('invalid JSON')
+    assert errors[1:] == [(4, 'expected an object'), (5, 'at least two choices are required')]
+
+
+def test_csv_rows_are_numbered_by_file_line():
+    data = b'question_text,correct_answer,choice_1,choice_2,choice_10\n2 + 2?,4,3,4,\n,1,1,2,\nPick,9,1,2,9\n'
+    questions, errors = read(data, 'bank.csv')
+    assert questions == [
+        {'question_text': '2 + 2?', 'choices': ['3', '4'], 'correct_answer': '4'},
+        {'question_text': 'Pick', 'choices': ['1', '2', '9'], 'correct_answer': '9'},
+    ]
+    assert errors == [(3, 'question_text is required')]
+
+
+def test_non_utf8_file_ends_with_an_error():
+    questions, errors = read(b'{"question_text": "a", "choices": ["a", "b"], "correct_answer": "a"}\n\xff\n', 'bank.jsonl')
+    assert len(questions) == 1
+    assert errors == [(2, 'the file is not UTF-8 text')]
+
+
+def test_broken_csv_ends_with_an_error():
+    # A field over csv.field_size_limit() stops the reader
+    _, errors = read(b'question_text,correct_answer,choice_1\n"' + b'x' * 200000 + b'",4,4\n', 'bank.csv')
+    assert [line for line, _ in errors] == [2]
+    assert errors[0][1].startswith('invalid CSV')
+
+
+@pytest.mark.parametrize('raw, message', [
+    ({'question_text': 'q' * 256, 'choices': ['a', 'b'], 'correct_answer': 'a'}, 'question_text is longer than 255 characters'),
+    ({'question_text': 'q', 'choices': 'ab', 'correct_answer': 'a'}, 'at least two choices are required'),
+    ({'question_text': 'q', 'choices': [str(n) for n in range(MAX_CHOICES + 1)], 'correct_answer': '1'}, 'more than 128 choices'),
+    ({'question_text': 'q', 'choices': ['a', ''], 'correct_answer': 'a'}, 'choices cannot be empty'),
+    ({'question_text': 'q', 'choices': ['a', 'b'], 'correct_answer': 'a' * 101}, 'correct_answer is longer than 100 characters'),
+    ({'question_text': 'q', 'choices': ['a', 'b'], 'correct_answer': 'c'}, 'correct_answer must be one of the choices'),
+])
+def test_validate_question_errors(raw, message):
+    with pytest.raises(QuestionBankError) as error:
+        validate_question(raw, 7)
+    assert (error.value.line, error.value.message) == (7, message)
+    assert str(error.value) == f'line 7: {message}'
+
+
+def test_maximum_choices_are_accepted():
+    choices = [str(n) for n in range(MAX_CHOICES)]
+    assert validate_question({'question_text': 'q', 'choices': choices, 'correct_answer': '127'}, 1)['choices'] == choices
@@ -0,0 +1,46 @@
+from types import SimpleNamespace
+
+import pytest
+
+from quizapp import rate_limit
+from quizapp.rate_limit import TokenBuckets
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit, 'time', SimpleNamespace(monotonic=lambda: now[0]))
+    return now
+
+
+def test_burst_then_exhaustion(clock):
+    buckets = TokenBuckets(rate=0.5, burst=3)
+    assert [buckets.take('a') for _ in range(3)] == [0, 0, 0]
+    assert buckets.take('a') == pytest.approx(2)
+    # Keys are limited independently
+    assert buckets.take('b') == 0
+
+
+def test_refill(clock):
+    buckets = TokenBuckets(rate=2, burst=2)
+    buckets.take('a'), buckets.take('a')
+    assert buckets.take('a') == pytest.approx(0.5)
+    clock[0] += 0.5
+    assert buckets.take('a') == 0
+    assert buckets.take('a') > 0
+    # Never refilled past the burst
+    clock[0] += 60
+    assert [buckets.take('a') for _ in range(3)][-1] > 0
+
+
+def test_least_recently_used_keys_are_dropped(clock):
+    buckets = TokenBuckets(rate=1, burst=1, maxsize=2)
+    for key in 'abc':
+        buckets.take(key)
+    assert buckets.take('a') == 0
+    assert buckets.take('c') > 0
+
+
+def test_rate_zero_turns_the_limit_off(clock):
+    buckets = TokenBuckets(rate=0, burst=1)
+    assert [buckets.take('a') for _ in range(5)] == [0] * 5
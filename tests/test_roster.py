@@ -0,0 +1,52 @@
+import io
+
+import pytest
+
+from quizapp.roster import RosterError, parse_json_roster, parse_roster
+
+
+def parse(text, filename):
+    return parse_roster(io.BytesIO(text.encode()), filename)
+
+
+def test_csv_with_header():
+    assert parse('username,id\nann,\n,7\nbob,8\n', 'roster.csv') == (['ann', 'bob'], [7])
+
+
+def test_csv_without_header_reads_the_first_column():
+    assert parse('\ufeffann,x\n12\n\n bob \n', 'roster.csv') == (['ann', 'bob'], [12])
+
+
+def test_json_forms():
+    assert parse('["ann", 3, "4", {"username": "bob"}, {"student_id": 5}]', 'r.json') == (['ann', 'bob'], [3, 4, 5])
+    assert parse('{"usernames": ["ann", " "], "student_ids": [1, "2"]}', 'r.json') == (['ann'], [1, 2])
+
+
+@pytest.mark.parametrize('text, filename', [
+    ('student_id\nabc\n', 'roster.csv'),
+    ('[1, ', 'roster.json'),
+    ('"ann"', 'roster.json'),
+    ('{"names": []}', 'roster.json'),
+    ('{"usernames": "ann"}', 'roster.json'),
+    ('{"usernames": [1]}', 'roster.json'),
+    ('{"student_ids": [true]}', 'roster.json'),
+    ('{"student_ids": ["x"]}', 'roster.json'),
+    ('[null]', 'roster.json'),
+    ('[true]', 'roster.json'),
+    ('[{}]', 'roster.json'),
+    ('[{"username": 5}]', 'roster.json'),
+    ('[{"id": "x"}]', 'roster.json'),
+])
+def test_malformed_rosters_raise_roster_error(text, filename):
+    with pytest.raises(RosterError):
+        parse(text, filename)
+
+
+def test_invalid_utf8_raises_roster_error():
+    with pytest.raises(RosterError):
+        parse_roster(io.BytesIO(b'ann\n\xff\xfe\n'), 'roster.csv')
+
+
+def test_json_roster_from_a_request_body():
+    with pytest.raises(RosterError):
+        parse_json_roster(None)
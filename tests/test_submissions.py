@@ -0,0 +1,89 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+
+from quizapp.submissions import WriteBehindQueue
+
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+        self.failing = False
+        self.flushed = threading.Event()
+
+    def __call__(self, records):
+        if self.failing:
+            raise RuntimeError('database is locked')
+        self.batches.append(records)
+        self.flushed.set()
+
+
+@pytest.fixture
+def flush():
+    return Recorder()
+
+
+@pytest.fixture
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def make_queue(tmp_path, flush, **kwargs):
+    # The worker only flushes on demand unless batch_size is reached
+    return WriteBehindQueue(str(tmp_path), flush, interval=3600, fsync=False, **kwargs)
+
+
+def test_drain_flushes_everything_submitted(tmp_path, flush):
+    queue = make_queue(tmp_path, flush)
+    queue.submit({'submission_id': 'a'})
+    queue.submit({'submission_id': 'b'})
+    queue.drain()
+    assert flush.batches == [[{'submission_id': 'a'}, {'submission_id': 'b'}]]
+    queue.drain()
+    assert len(flush.batches) == 1
+    assert not [name for name in os.listdir(tmp_path) if name.endswith('.segment')]
+
+
+def test_failed_flush_is_replayed(tmp_path, flush):
+    queue = make_queue(tmp_path, flush)
+    queue.submit({'submission_id': 'a'})
+    flush.failing = True
+    with pytest.raises(RuntimeError):
+        queue.drain()
+    assert flush.batches == []
+    flush.failing = False
+    queue.submit({'submission_id': 'b'})
+    queue.drain()
+    # The failed segment goes first, then the one rotated after it
+    assert flush.batches == [[{'submission_id': 'a'}], [{'submission_id': 'b'}]]
+
+
+def test_batch_size_wakes_the_worker(tmp_path, flush):
+    queue = make_queue(tmp_path, flush, batch_size=2)
+    queue.submit({'submission_id': 'a'})
+    queue.submit({'submission_id': 'b'})
+    assert flush.flushed.wait(5)
+    assert flush.batches == [[{'submission_id': 'a'}, {'submission_id': 'b'}]]
+
+
+def test_work_left_by_dead_processes_is_adopted(tmp_path, flush, dead_pid):
+    with open(tmp_path / f'results-{dead_pid}.journal', 'w') as journal:
+        journal.write(json.dumps({'submission_id': 'journaled'}) + '\n')
+    with open(tmp_path / f'results-{dead_pid}-00000001.segment.{dead_pid}', 'w') as segment:
+        segment.write(json.dumps({'submission_id': 'claimed'}) + '\n')
+    make_queue(tmp_path, flush).drain()
+    assert sorted(record['submission_id'] for batch in flush.batches for record in batch) == ['claimed', 'journaled']
+    assert [name for name in os.listdir(tmp_path)] == [f'results-{os.getpid()}.journal']
+
+
+def test_close_drains(tmp_path, flush):
+    queue = make_queue(tmp_path, flush)
+    queue.submit({'submission_id': 'a'})
+    queue.close()
+    assert flush.batches == [[{'submission_id': 'a'}]]
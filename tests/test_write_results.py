@@ -0,0 +1,73 @@
+import glob
+import os
+import re
+import shutil
+
+from sqlalchemy import func, select
+
+from conftest import login, make_module
+from quizapp.extensions import db
+from quizapp.models import ModuleScore, Quiz, QuizResult
+
+
+def submit_quiz(client, quiz_id):
+    login(client, 'student')
+    page = client.get(f'/student/quiz/{quiz_id}').text
+    attempt_id = re.search(r'name="attempt_id" value="(\d+)"', page).group(1)
+    response = client.post(f'/student/quiz/{quiz_id}', data={
+        'attempt_id': attempt_id, 'question_0': '1', 'question_1': '0',
+    })
+    assert response.status_code == 200
+
+
+def test_results_for_a_deleted_quiz_are_dropped(app, client):
+    module_id = make_module(client)
+    with app.app_context():
+        quiz_id = db.session.scalar(select(Quiz.id).where(Quiz.module_id == module_id))
+    submit_quiz(client, quiz_id)
+
+    # The result is still in the journal when its module goes
+    login(client, 'teacher')
+    assert client.post(f'/teacher/module/{module_id}/delete').status_code < 400
+
+    with app.app_context():
+        app.extensions['quizapp'].result_queue.drain()
+        assert db.session.scalar(select(func.count()).select_from(QuizResult)) == 0
+        assert db.session.scalar(select(func.count()).select_from(ModuleScore)) == 0
+
+
+def test_a_new_module_does_not_inherit_journaled_results(app, client):
+    module_id = make_module(client)
+    with app.app_context():
+        quiz_id = db.session.scalar(select(Quiz.id).where(Quiz.module_id == module_id))
+    submit_quiz(client, quiz_id)
+
+    login(client, 'teacher')
+    assert client.post(f'/teacher/module/{module_id}/delete').status_code < 400
+    new_module_id = make_module(client, 'Geometry')
+
+    with app.app_context():
+        new_quiz_id = db.session.scalar(select(Quiz.id).where(Quiz.module_id == new_module_id))
+        assert new_module_id != module_id and new_quiz_id != quiz_id
+        app.extensions['quizapp'].result_queue.drain()
+        assert db.session.scalar(select(func.count()).select_from(QuizResult)) == 0
+        assert db.session.scalar(select(func.count()).select_from(ModuleScore)) == 0
+
+
+def test_replayed_segment_is_written_once(app, client, tmp_path):
+    module_id = make_module(client)
+    with app.app_context():
+        quiz_id = db.session.scalar(select(Quiz.id).where(Quiz.module_id == module_id))
+    submit_quiz(client, quiz_id)
+
+    # A crash after the commit but before the segment is deleted
+    queue = app.extensions['quizapp'].result_queue
+    with app.app_context():
+        queue._rotate()
+        segment, = glob.glob(os.path.join(app.config['RESULT_JOURNAL_DIR'], '*.segment'))
+        shutil.copy(segment, tmp_path / 'segment')
+        queue.drain()
+        shutil.copy(tmp_path / 'segment', segment)
+        queue.drain()
+        assert db.session.scalar(select(func.count()).select_from(QuizResult)) == 1
+        assert db.session.scalars(select(ModuleScore.quizzes_completed)).all() == [1]